@@ -0,0 +1,4 @@
+## The scripts in read_data import each other by name, so pytest puts that directory on the path
+## for their tests; read_data/read_data.py would then be found instead of the read_data directory.
+## The Django apps import from that directory as a package, so it is imported before any test.
+import read_data.dialect_hierarchy  # noqa: F401
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from rest_framework.test import APIClient
+
+from read_data.dialect_hierarchy import DialectHierarchy
+
+HIERARCHY_TREE = {'Nederfrankisch': {'Brabants': {'Noord-Brabants': {}}, 'Hollands': {}}}
+HIERARCHY = DialectHierarchy(HIERARCHY_TREE)
+
+
+def question(tag, index, question, prompt, chapter, answers, cleaned=False, subtags=None):
+    ## A question with all the fields written by read_questionnaire.py
+    return {
+        'tag': tag, 'index': index, 'question': question, 'type': 'Translation', 'prompt': prompt,
+        'cleaned': cleaned, 'split_item': 'NA', 'chapter': chapter, 'subtags': subtags, 'en_translation': 'NA',
+        'gloss': 'NA', 'answers': [dict(answer, tag=tag) for answer in answers]
+    }
+
+
+def answer(text, participant_id, dialect, dialect_ids):
+    return {
+        'answer': text, 'dialect': dialect, 'country': ['Nederland'], 'participant_id': participant_id,
+        'dialect_ids': dialect_ids
+    }
+
+
+QUESTIONS = {
+    'D1Z1[SQ001]': question(
+        'D1Z1[SQ001]', 3, 'D1Z1[SQ001]. Vertaal: [Hij loopt snel naar huis.]', 'Hij loopt snel naar huis',
+        'Hoofdstuk 1', [
+            answer('Hij loapt snel noar huus', 'p1', ['Brabants'], [1]),
+            answer('unattested', 'p2', ['Hollands'], [3]),
+            answer('Hij loopt, snel (naar) huis', 'p3', ['Hollands'], [3]),
+            answer('hij lópt snel nor hoes|unattested', 'p4', ['Noord-Brabants'], [2]),
+        ], cleaned=True, subtags=['snel']),
+    'D1Z2[SQ002]': question(
+        'D1Z2[SQ002]', 5, 'D1Z2[SQ002]. Vertaal: [Zij praat zacht.]', 'Zij praat zacht', 'Hoofdstuk 1', [
+            answer('Zie proat zacht|Zij praot zachjes', 'p6', ['Brabants', 'Noord-Brabants'], [1, 2]),
+            answer('Zij\tpraat\\zacht', 'p3', ['Hollands'], [3]),
+        ]),
+    'D2Z1[SQ001]': question(
+        'D2Z1[SQ001]', 7, 'D2Z1[SQ001]. Vertaal: [De kat slaapt.]', 'De kat slaapt', 'Hoofdstuk 2', []),
+    'D2Z2[SQ001]': question(
+        'D2Z2[SQ001]', 9, 'D2Z2[SQ001]. Opmerking', '', 'Hoofdstuk 2', [answer('-', 'p2', ['Hollands'], [3])]),
+}
+
+JUDGMENTS = {
+    'J1Z0[SQ001]': {
+        'main_question': 'Hij … loopt snel naar huis', 'main_question_id': 'J1Z0', 'sub_question': 'goed',
+        'sub_question_id': 'SQ001', 'sub_question_text_id': 'ST000',
+        'responses': [
+            {'participant_id': 'p1', 'dialects': ['Brabants'], 'country': ['Nederland'], 'score': '4',
+             'dialect_ids': [1]},
+            {'participant_id': 'p5', 'dialects': ['"Zeeuws"'], 'country': ['België'], 'score': '', 'dialect_ids': []},
+        ]
+    },
+}
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def output_files(tmp_path, settings):
+    ## The questions and judgments as written by the readers
+    settings.QUESTIONS_PATH = str(tmp_path / 'cleaned_translation_questions.json')
+    settings.JUDGMENTS_PATH = str(tmp_path / 'likert_scales_test.json')
+    for filepath, entries in [(settings.QUESTIONS_PATH, QUESTIONS), (settings.JUDGMENTS_PATH, JUDGMENTS)]:
+        with open(filepath, 'w', encoding='utf8') as file:
+            json.dump(entries, file)
+    return settings.QUESTIONS_PATH, settings.JUDGMENTS_PATH
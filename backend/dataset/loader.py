@@ -0,0 +1,206 @@
+"""
+Loads the outputs of read_questionnaire.py and read_likert.py (or ingest.py) into the database.
+
+All the rows are streamed to PostgreSQL with COPY instead of being inserted one by one,
+and the tables are replaced in a single transaction, so a failed load keeps the previous
+data. The indexes of the models and the foreign keys are dropped during the load and created
+again afterwards; as TRUNCATE and these changes lock the tables, any queries on them wait
+until the whole dataset has been loaded.
+"""
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from read_data.dialect_hierarchy import DialectHierarchy
+from search.expression import normalize_text
+
+from .models import Answer, Dialect, JudgmentItem, Participant, Question, Response
+from .search import normalize_answer
+
+QUESTION_COLUMNS = [
+    'tag', 'index', 'question', 'type', 'prompt', 'cleaned', 'split_item', 'chapter', 'subtags', 'en_translation',
+    'gloss'
+]
+JUDGMENT_COLUMNS = ['main_question', 'main_question_id', 'sub_question', 'sub_question_id', 'sub_question_text_id']
+
+## number of rows formatted at once, and of characters sent to the database at once
+COPY_BATCH_SIZE = 1000
+COPY_BLOCK_SIZE = 1 << 16
+
+## in the order they are loaded, so every foreign key refers to a row which is already there
+MODELS = [Dialect, Dialect.parents.through, Participant, Question, Answer, JudgmentItem, Response]
+
+Row = Sequence[object]
+
+
+## backslashes and the separators of COPY have to be escaped in text values
+copy_escapes = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+array_escapes = str.maketrans({'\\': '\\\\', '"': '\\"'})
+
+
+def copy_text(value) -> str:
+    ## A value in the text format of COPY
+    if isinstance(value, str):
+        return value.translate(copy_escapes)
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (list, tuple)):
+        return ('{' + ','.join('"' + str(item).translate(array_escapes) + '"' for item in value) + '}').translate(
+            copy_escapes)
+    return str(value)
+
+
+class CopyStream:
+    """A file-like object reading the rows as lines of tab-separated values, as they are generated."""
+
+    def __init__(self, rows: Iterable[Row]):
+        self.rows = iter(rows)
+        self.buffer = ''
+        self.count = 0
+
+    def read(self, size=-1) -> str:
+        chunks = [self.buffer]
+        length = len(self.buffer)
+        while size < 0 or length < size:
+            rows = list(islice(self.rows, COPY_BATCH_SIZE))
+            if not rows:
+                break
+            chunk = ''.join('\t'.join(map(copy_text, row)) + '\n' for row in rows)
+            chunks.append(chunk)
+            length += len(chunk)
+            self.count += len(rows)
+        self.buffer = ''.join(chunks)
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def copy_rows(cursor, model, columns: List[str], rows: Iterable[Row]) -> int:
+    stream = CopyStream(rows)
+    cursor.copy_expert(
+        'COPY {} ({}) FROM STDIN'.format(
+            connection.ops.quote_name(model._meta.db_table),
+            ', '.join(connection.ops.quote_name(column) for column in columns)),
+        stream, COPY_BLOCK_SIZE)
+    return stream.count
+
+
+def parse_score(score) -> Optional[int]:
+    try:
+        return int(score)
+    except (TypeError, ValueError):
+        return None
+
+
+class Participants:
+    """Numbers the participants in the order they first occur, with the metadata of their first answer or response."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.rows: List[Row] = []
+
+    def __call__(self, participant_id: str, dialect, country, dialect_ids) -> int:
+        try:
+            return self.ids[participant_id]
+        except KeyError:
+            pass
+        pk = self.ids[participant_id] = len(self.rows) + 1
+        self.rows.append((pk, participant_id, list(dialect or []), list(country or []), list(dialect_ids or [])))
+        return pk
+
+
+def answer_rows(questions: Dict[str, dict], participants: Participants):
+    pk = 0
+    normalized: Dict[str, str] = {}  # many participants give the same answer
+    for tag, question in questions.items():
+        for position, answer in enumerate(question.get('answers') or []):
+            pk += 1
+            participant = participants(
+                answer['participant_id'], answer.get('dialect'), answer.get('country'), answer.get('dialect_ids'))
+            text = answer['answer']
+            try:
+                normalized_text = normalized[text]
+            except KeyError:
+                normalized_text = normalized[text] = normalize_answer(text)
+            yield pk, question.get('tag', tag), position, participant, text, normalized_text
+
+
+def response_rows(judgments: Dict[str, dict], participants: Participants):
+    pk = 0
+    for key, item in judgments.items():
+        for position, response in enumerate(item.get('responses') or []):
+            pk += 1
+            participant = participants(
+                response['participant_id'], response.get('dialects'), response.get('country'),
+                response.get('dialect_ids'))
+            yield pk, key, position, participant, parse_score(response.get('score'))
+
+
+def load_dataset(
+        questions: Dict[str, dict],
+        judgments: Dict[str, dict],
+        hierarchy: Optional[DialectHierarchy] = None) -> List[Tuple[str, int]]:
+    """Replaces the dataset in the database with these questions, judgments and dialects;
+    returns the number of rows loaded per model."""
+    participants = Participants()
+    # the answers and responses are numbered while their participants are collected,
+    # so they are read once and kept until the participants have been written
+    answers = list(answer_rows(questions, participants))
+    responses = list(response_rows(judgments, participants))
+    counts = []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('TRUNCATE {} RESTART IDENTITY CASCADE'.format(
+            ', '.join(connection.ops.quote_name(model._meta.db_table) for model in MODELS)))
+        # building the (trigram) indexes once after loading is much faster than updating them for every row,
+        # and adding the foreign keys again checks them in a single query instead of a trigger per row
+        indexes = [(model, index) for model in MODELS for index in model._meta.indexes]
+        with connection.schema_editor(atomic=False) as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        cursor.execute(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE contype = 'f' AND conrelid = ANY(%s::regclass[])",
+            [[model._meta.db_table for model in MODELS]])
+        foreign_keys = cursor.fetchall()
+        for table, name, definition in foreign_keys:
+            cursor.execute('ALTER TABLE {} DROP CONSTRAINT {}'.format(table, connection.ops.quote_name(name)))
+
+        def copy(model, columns, rows):
+            counts.append((model.__name__, copy_rows(cursor, model, columns, rows)))
+
+        if hierarchy is not None:
+            copy(Dialect, ['id', 'name'], enumerate(hierarchy.names))
+            copy(Dialect.parents.through, ['from_dialect_id', 'to_dialect_id'], (
+                (node, parent) for node, parents in enumerate(hierarchy.parents) for parent in parents
+            ))
+        copy(Participant, ['id', 'participant_id', 'dialect', 'country', 'dialect_ids'], participants.rows)
+        copy(Question, QUESTION_COLUMNS + ['prompt_normalized'], (
+            [question.get('tag', tag)] + [question.get(column) for column in QUESTION_COLUMNS[1:]] +
+            [normalize_text(question.get('prompt') or '')]
+            for tag, question in questions.items()
+        ))
+        copy(Answer, ['id', 'question_id', 'position', 'participant_id', 'answer', 'answer_normalized'], answers)
+        copy(JudgmentItem, ['key'] + JUDGMENT_COLUMNS, (
+            [key] + [item.get(column) for column in JUDGMENT_COLUMNS] for key, item in judgments.items()
+        ))
+        copy(Response, ['id', 'item_id', 'position', 'participant_id', 'score'], responses)
+        with connection.schema_editor(atomic=False) as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+        for table, name, definition in foreign_keys:
+            cursor.execute('ALTER TABLE {} ADD CONSTRAINT {} {}'.format(
+                table, connection.ops.quote_name(name), definition))
+
+        # the IDs were given explicitly, continue numbering after them
+        for statement in connection.ops.sequence_reset_sql(no_style(), [Participant, Answer, Response]):
+            cursor.execute(statement)
+        cursor.execute('ANALYZE {}'.format(
+            ', '.join(connection.ops.quote_name(model._meta.db_table) for model in MODELS)))
+
+    return counts
@@ -0,0 +1,107 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from .conftest import HIERARCHY, HIERARCHY_TREE, JUDGMENTS, QUESTIONS
+from .loader import COPY_BATCH_SIZE, CopyStream, copy_text, load_dataset
+from .models import Answer, Dialect, JudgmentItem, Participant, Question, Response
+
+
+def test_copy_text():
+    assert copy_text('a\tb\nc\rd\\e') == 'a\\tb\\nc\\rd\\\\e'
+    assert copy_text('\\N') == '\\\\N'
+    assert copy_text(None) == '\\N'
+    assert (copy_text(True), copy_text(False)) == ('t', 'f')
+    assert copy_text(3) == '3'
+    assert copy_text([]) == '{}'
+    # the items of an array are quoted, and the escapes of the array are escaped again for COPY
+    assert copy_text(['a', 'b,c', '"d"', 'e\\f', 'g\th', 'NULL']) == \
+        '{"a","b,c","\\\\"d\\\\"","e\\\\\\\\f","g\\th","NULL"}'
+    assert copy_text((1, 2)) == '{"1","2"}'
+
+
+def test_copy_stream():
+    rows = [(i, 'row\t{}'.format(i), None) for i in range(COPY_BATCH_SIZE * 2 + 10)]
+    lines = ''.join('{}\trow\\t{}\t\\N\n'.format(i, i) for i in range(len(rows)))
+    stream = CopyStream(rows)
+    assert ''.join(iter(lambda: stream.read(100), '')) == lines
+    assert stream.count == len(rows)
+    stream = CopyStream(rows)
+    assert stream.read(5) + stream.read() == lines
+    assert stream.read() == ''
+    assert CopyStream([]).read(10) == ''
+
+
+def constraints(model):
+    with connection.cursor() as cursor:
+        return connection.introspection.get_constraints(cursor, model._meta.db_table)
+
+
+@pytest.mark.django_db
+def test_load_dataset():
+    counts = load_dataset(QUESTIONS, JUDGMENTS, HIERARCHY)
+    assert counts == [
+        ('Dialect', 4), ('Dialect_parents', 3), ('Participant', 6), ('Question', 4), ('Answer', 7),
+        ('JudgmentItem', 1), ('Response', 2)
+    ]
+
+    assert [(dialect.id, dialect.name, [parent.name for parent in dialect.parents.all()])
+            for dialect in Dialect.objects.order_by('id')] == [
+        (0, 'Nederfrankisch', []), (1, 'Brabants', ['Nederfrankisch']), (2, 'Noord-Brabants', ['Brabants']),
+        (3, 'Hollands', ['Nederfrankisch'])
+    ]
+    # the texts are read back as they were written, whatever characters they contain
+    for tag, question in QUESTIONS.items():
+        row = Question.objects.get(tag=tag)
+        assert {field: getattr(row, field) for field in question if field != 'answers'} == \
+            {field: value for field, value in question.items() if field != 'answers'}
+        assert [
+            {'tag': tag, 'answer': answer.answer, 'dialect': answer.participant.dialect,
+             'country': answer.participant.country, 'participant_id': answer.participant.participant_id,
+             'dialect_ids': answer.participant.dialect_ids}
+            for answer in row.answers.select_related('participant')
+        ] == question['answers']
+    assert Question.objects.get(tag='D1Z1[SQ001]').prompt_normalized == 'hij loopt snel naar huis'
+    assert Answer.objects.get(question='D1Z1[SQ001]', position=3).answer_normalized == 'hij lopt snel nor hoes'
+    assert Answer.objects.get(question='D1Z2[SQ002]', position=1).answer_normalized == 'zij praat\\zacht'
+
+    item = JudgmentItem.objects.get()
+    assert item.main_question == JUDGMENTS['J1Z0[SQ001]']['main_question']
+    assert [(response.participant.participant_id, response.participant.dialect, response.score)
+            for response in item.responses.select_related('participant')] == [
+        ('p1', ['Brabants'], 4), ('p5', ['"Zeeuws"'], None)
+    ]
+    # every participant is stored once
+    assert Participant.objects.get(participant_id='p1').answers.count() == 1
+    assert Participant.objects.get(participant_id='p1').responses.count() == 1
+
+    # the indexes and foreign keys are there again, and new rows are numbered after the loaded ones
+    assert 'answer_trigrams' in constraints(Answer)
+    assert any(constraint['foreign_key'] for constraint in constraints(Response).values())
+    assert Participant.objects.create(participant_id='p7').id == 7
+
+
+@pytest.mark.django_db
+def test_load_dataset_replaces():
+    load_dataset(QUESTIONS, JUDGMENTS, HIERARCHY)
+    assert load_dataset({}, JUDGMENTS) == [('Participant', 2), ('Question', 0), ('Answer', 0), ('JudgmentItem', 1),
+                                           ('Response', 2)]
+    assert list(Participant.objects.values_list('id', 'participant_id')) == [(1, 'p1'), (2, 'p5')]
+    assert not Dialect.objects.exists()
+    assert not Question.objects.exists()
+
+
+@pytest.mark.django_db
+def test_load_dataset_command(tmp_path, output_files):
+    hierarchy_filepath = tmp_path / 'dialect_hierarchy.json'
+    hierarchy_filepath.write_text(json.dumps(HIERARCHY_TREE), encoding='utf8')
+    stdout = io.StringIO()
+    call_command('load_dataset', hierarchy=str(hierarchy_filepath), stdout=stdout)
+    assert stdout.getvalue().splitlines()[:7] == [
+        'Dialect: 4 rows', 'Dialect_parents: 3 rows', 'Participant: 6 rows', 'Question: 4 rows', 'Answer: 7 rows',
+        'JudgmentItem: 1 rows', 'Response: 2 rows'
+    ]
+    assert Answer.objects.count() == 7
@@ -0,0 +1,94 @@
+import json
+import random
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from dataset.models import Answer
+
+INDEX_NAME = 'answer_trigrams'
+
+
+def plan_indexes(plan: dict):
+    ## The names of the indexes scanned in a plan (and its subplans)
+    if 'Index Name' in plan:
+        yield plan['Index Name']
+    for subplan in plan.get('Plans', []):
+        yield from plan_indexes(subplan)
+
+
+def explain(queryset):
+    ## Runs the query with EXPLAIN ANALYZE: the number of rows, the execution time in ms and the scanned indexes
+    result = json.loads(queryset.explain(analyze=True, format='json'))[0]
+    return int(result['Plan']['Actual Rows']), result['Execution Time'], list(plan_indexes(result['Plan']))
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares searching the answers in the database using the normalized, trigram indexed column with icontains '
+        'on the original answers, and checks with EXPLAIN ANALYZE that the trigram index is used. Load a (synthetic) '
+        'dataset first: python read_data/synthetic.py, read_data/ingest.py and manage.py load_dataset.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--needles', type=int, default=20, help='number of substrings of the answers to search')
+        parser.add_argument('--length', type=int, default=4, help='length of the substrings')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--words', nargs='+', help='search these (normalized) words instead')
+
+    def sample_words(self, count, length, seed):
+        ## Substrings of words of random answers, with the words they are part of
+        rng = random.Random(seed)
+        last = Answer.objects.aggregate(last=Max('pk'))['last']
+        if last is None:
+            raise CommandError('No answers in the database, load them with manage.py load_dataset')
+        answers = Answer.objects.filter(pk__in=rng.sample(range(1, last + 1), min(last, count * 10)))
+        words = sorted({
+            word for text in answers.values_list('answer_normalized', flat=True)
+            for word in text.split() if len(word) >= length
+        })
+        rng.shuffle(words)
+        for word in words[:count]:
+            start = rng.randrange(len(word) - length + 1)
+            yield word[start:start + length], word
+
+    def handle(self, *args, **options):
+        if options['words']:
+            needles = [(word, word) for word in options['words']]
+        else:
+            needles = list(self.sample_words(options['needles'], options['length'], options['seed']))
+        if not needles:
+            raise CommandError('No words of at least {} characters to search for'.format(options['length']))
+
+        times = {'icontains': [], 'trigram': [], 'similar': []}
+        unindexed = []
+        self.stdout.write('{:<14} {:<10} {:>8} {:>10}  {}'.format('needle', 'query', 'rows', 'ms', 'indexes'))
+        for needle, word in needles:
+            queries = {
+                'icontains': Answer.objects.filter(answer__icontains=needle),
+                'trigram': Answer.objects.filter(answer_normalized__contains=needle),
+                'similar': Answer.objects.filter(answer_normalized__trigram_word_similar=word),
+            }
+            for query, queryset in queries.items():
+                rows, milliseconds, indexes = explain(queryset)
+                times[query].append(milliseconds)
+                if query != 'icontains' and INDEX_NAME not in indexes:
+                    unindexed.append((needle, query, rows))
+                self.stdout.write('{:<14} {:<10} {:>8} {:>10.2f}  {}'.format(
+                    needle if query != 'similar' else word, query, rows, milliseconds, ', '.join(indexes) or '-'))
+
+        self.stdout.write('')
+        for query, milliseconds in times.items():
+            self.stdout.write('{:<10} median {:8.2f} ms, max {:8.2f} ms'.format(
+                query, statistics.median(milliseconds), max(milliseconds)))
+        self.stdout.write('median speed-up of trigram over icontains: {:.1f}x'.format(
+            statistics.median(times['icontains']) / statistics.median(times['trigram'])))
+        if unindexed:
+            # the planner rightly prefers a sequential scan for needles occurring in a large part of the answers
+            self.stdout.write(self.style.WARNING('Not using {}: {}'.format(INDEX_NAME, ', '.join(
+                '{} ({}, {} rows)'.format(needle, query, rows) for needle, query, rows in unindexed))))
+        checked = 2 * len(needles) - len(unindexed)
+        if not checked:
+            raise CommandError('None of the queries used {}'.format(INDEX_NAME))
+        self.stdout.write(self.style.SUCCESS('{} of {} queries used {}'.format(checked, 2 * len(needles), INDEX_NAME)))
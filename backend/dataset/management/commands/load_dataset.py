@@ -0,0 +1,38 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from read_data.dialect_hierarchy import load_hierarchy
+
+from dataset.loader import load_dataset
+from dataset.store import judgments_path, load_entries, questions_path
+
+
+class Command(BaseCommand):
+    help = 'Replaces the questions, answers, judgments and dialects in the database with the outputs of the readers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', help='Translation questions (default: QUESTIONS_PATH)')
+        parser.add_argument('--judgments', help='Likert judgments (default: JUDGMENTS_PATH)')
+        parser.add_argument('--hierarchy', help='Dialect hierarchy (default: DIALECT_HIERARCHY_PATH)')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        questions_filepath = options['questions'] or questions_path()
+        judgments_filepath = options['judgments'] or judgments_path()
+        hierarchy_filepath = options['hierarchy'] or settings.DIALECT_HIERARCHY_PATH
+        for filepath in [questions_filepath, judgments_filepath, hierarchy_filepath]:
+            if not os.path.exists(filepath):
+                raise CommandError('File not found: {}'.format(filepath))
+
+        questions = load_entries(questions_filepath)
+        judgments = load_entries(judgments_filepath)
+        hierarchy = load_hierarchy(hierarchy_filepath)
+        read = time.perf_counter()
+
+        for model, count in load_dataset(questions, judgments, hierarchy):
+            self.stdout.write('{}: {} rows'.format(model, count))
+        self.stdout.write(self.style.SUCCESS('Read in {:.1f}s, loaded in {:.1f}s'.format(
+            read - start, time.perf_counter() - read)))
@@ -0,0 +1,118 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:54
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Answer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.IntegerField()),
+                ('answer', models.TextField()),
+            ],
+            options={
+                'ordering': ['question', 'position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Dialect',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.TextField(unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JudgmentItem',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('main_question', models.TextField()),
+                ('main_question_id', models.CharField(db_index=True, max_length=64)),
+                ('sub_question', models.TextField()),
+                ('sub_question_id', models.CharField(max_length=64)),
+                ('sub_question_text_id', models.CharField(max_length=64)),
+            ],
+            options={
+                'ordering': ['key'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Participant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('participant_id', models.CharField(max_length=64, unique=True)),
+                ('dialect', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), default=list, size=None)),
+                ('country', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), default=list, size=None)),
+                ('dialect_ids', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Question',
+            fields=[
+                ('tag', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('index', models.IntegerField()),
+                ('question', models.TextField()),
+                ('type', models.CharField(default='NA', max_length=64)),
+                ('prompt', models.TextField(default='NA')),
+                ('cleaned', models.BooleanField(default=False)),
+                ('split_item', models.TextField(default='NA')),
+                ('chapter', models.CharField(db_index=True, default='NA', max_length=255)),
+                ('subtags', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, null=True, size=None)),
+                ('en_translation', models.TextField(default='NA')),
+                ('gloss', models.TextField(default='NA')),
+            ],
+            options={
+                'ordering': ['tag'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Response',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.IntegerField()),
+                ('score', models.SmallIntegerField(null=True)),
+                ('item', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='dataset.judgmentitem')),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='dataset.participant')),
+            ],
+            options={
+                'ordering': ['item', 'position'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['dialect_ids'], name='participant_dialect_ids'),
+        ),
+        migrations.AddField(
+            model_name='dialect',
+            name='parents',
+            field=models.ManyToManyField(blank=True, related_name='children', to='dataset.dialect'),
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='participant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='dataset.participant'),
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='question',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='dataset.question'),
+        ),
+        migrations.AddConstraint(
+            model_name='response',
+            constraint=models.UniqueConstraint(fields=('item', 'position'), name='response_item_position'),
+        ),
+        migrations.AddConstraint(
+            model_name='answer',
+            constraint=models.UniqueConstraint(fields=('question', 'position'), name='answer_question_position'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:57
+
+import django.contrib.postgres.indexes
+import re
+import unicodedata
+from itertools import islice
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+## The normalization of search.expression.normalize_text and dataset.search.normalize_answer
+## as it was when these columns were added, so this migration doesn't change with them
+ignore_pattern = re.compile(r"[\-'\.\,\(\)\s]")
+
+
+def normalize_text(text):
+    return ' '.join(filter(None, (
+        ''.join(
+            char for char in unicodedata.normalize('NFD', ignore_pattern.sub('', token).lower())
+            if not '\u0300' <= char <= '\u036f')
+        for token in text.split()
+    )))
+
+
+def normalize_answer(answer):
+    return ' '.join(filter(None, (
+        normalize_text(example) for example in answer.split('|') if example != 'unattested'
+    )))
+
+
+def normalize_column(model, field, normalize):
+    ## fill the normalized column of the rows loaded before this migration, a batch of rows at a time
+    rows = model.objects.only(field).order_by('pk').iterator(chunk_size=BATCH_SIZE)
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            break
+        for row in batch:
+            setattr(row, field + '_normalized', normalize(getattr(row, field)))
+        model.objects.bulk_update(batch, [field + '_normalized'])
+
+
+def normalize_texts(apps, schema_editor):
+    normalize_column(apps.get_model('dataset', 'Question'), 'prompt', normalize_text)
+    normalize_column(apps.get_model('dataset', 'Answer'), 'answer', normalize_answer)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dataset', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='answer',
+            name='answer_normalized',
+            field=models.TextField(default=''),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='prompt_normalized',
+            field=models.TextField(default=''),
+        ),
+        migrations.RunPython(normalize_texts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='answer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['answer_normalized'], name='answer_trigrams', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['prompt_normalized'], name='question_prompt_trigrams', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,101 @@
+"""
+The translation questions and Likert judgments in the database, as loaded by `manage.py load_dataset`.
+
+The JSON outputs of the readers repeat the metadata of a participant with each of their
+answers and responses; here it is stored once per participant. The dialects are the nodes
+of the dialect hierarchy, with the same IDs as the dialect_ids of the readers.
+
+The prompts and answers are also stored normalized as the search expressions of the frontend
+compare them (see dataset.search), with a trigram index for substring and similarity queries.
+"""
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+
+class Dialect(models.Model):
+    id = models.IntegerField(primary_key=True)  # node of read_data.dialect_hierarchy
+    name = models.TextField(unique=True)
+    parents = models.ManyToManyField('self', symmetrical=False, related_name='children', blank=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Participant(models.Model):
+    participant_id = models.CharField(max_length=64, unique=True)
+    dialect = ArrayField(models.TextField(), default=list)  # as given by the participant
+    country = ArrayField(models.TextField(), default=list)
+    dialect_ids = ArrayField(models.IntegerField(), default=list)  # resolved to the dialect hierarchy
+
+    class Meta:
+        indexes = [GinIndex(fields=['dialect_ids'], name='participant_dialect_ids')]
+
+    def __str__(self):
+        return self.participant_id
+
+
+class Question(models.Model):
+    tag = models.CharField(max_length=64, primary_key=True)
+    index = models.IntegerField()
+    question = models.TextField()
+    type = models.CharField(max_length=64, default='NA')
+    prompt = models.TextField(default='NA')
+    prompt_normalized = models.TextField(default='')
+    cleaned = models.BooleanField(default=False)
+    split_item = models.TextField(default='NA')
+    chapter = models.CharField(max_length=255, default='NA', db_index=True)
+    subtags = ArrayField(models.TextField(), null=True, blank=True)
+    en_translation = models.TextField(default='NA')
+    gloss = models.TextField(default='NA')
+
+    class Meta:
+        ordering = ['tag']
+        indexes = [GinIndex(fields=['prompt_normalized'], name='question_prompt_trigrams', opclasses=['gin_trgm_ops'])]
+
+    def __str__(self):
+        return 'Question {}: {}'.format(self.tag, self.question)
+
+
+class Answer(models.Model):
+    # the unique constraint on (question, position) also indexes the answers of a question
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='answers', db_index=False)
+    position = models.IntegerField()  # in the answers of the question
+    participant = models.ForeignKey(Participant, on_delete=models.CASCADE, related_name='answers')
+    answer = models.TextField()
+    answer_normalized = models.TextField(default='')
+
+    class Meta:
+        ordering = ['question', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['question', 'position'], name='answer_question_position')
+        ]
+        indexes = [GinIndex(fields=['answer_normalized'], name='answer_trigrams', opclasses=['gin_trgm_ops'])]
+
+
+class JudgmentItem(models.Model):
+    key = models.CharField(max_length=64, primary_key=True)  # e.g. J100Z0[SQ001]
+    main_question = models.TextField()
+    main_question_id = models.CharField(max_length=64, db_index=True)
+    sub_question = models.TextField()
+    sub_question_id = models.CharField(max_length=64)
+    sub_question_text_id = models.CharField(max_length=64)
+
+    class Meta:
+        ordering = ['key']
+
+    def __str__(self):
+        return self.key
+
+
+class Response(models.Model):
+    item = models.ForeignKey(JudgmentItem, on_delete=models.CASCADE, related_name='responses', db_index=False)
+    position = models.IntegerField()  # in the responses to the item
+    participant = models.ForeignKey(Participant, on_delete=models.CASCADE, related_name='responses')
+    score = models.SmallIntegerField(null=True)  # empty when the participant gave no score
+
+    class Meta:
+        ordering = ['item', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'position'], name='response_item_position')
+        ]
@@ -0,0 +1,92 @@
+import base64
+import binascii
+from typing import Optional, Sequence
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class KeysetPagination(BasePagination):
+    """Pages of entries ordered by their key; the cursor is the key of the last entry on the previous page.
+
+    A page is found directly from the cursor (without counting the entries before it), and
+    doesn't shift when entries are added or removed before it. The answers or responses
+    of an entry are paged with their position as the key.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.request = None
+        self.next_cursor = None
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request) -> Optional[str]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            return base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf8')
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, key: str) -> str:
+        return base64.urlsafe_b64encode(key.encode('utf8')).decode('ascii')
+
+    def start(self, collection, request) -> int:
+        ## The position of the first entry after the cursor
+        return collection.after(self.decode_cursor(request))
+
+    def paginate_keys(self, collection, request) -> Sequence[str]:
+        self.request = request
+        start = self.start(collection, request)
+        end = start + self.get_page_size(request)
+        page = collection.keys[start:end]
+        self.next_cursor = page[-1] if end < len(collection.keys) else None
+        return page
+
+    def start_position(self, request) -> int:
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            return 0
+        try:
+            position = int(cursor)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        # a cursor is the position of an entry, or -1 before the first one
+        if position < -1:
+            raise NotFound(self.invalid_cursor_message)
+        return position + 1
+
+    def paginate_positions(self, count, request) -> range:
+        self.request = request
+        start = self.start_position(request)
+        end = min(start + self.get_page_size(request), count)
+        self.next_cursor = str(end - 1) if end < count else None
+        return range(start, end)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_cursor))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
@@ -0,0 +1,64 @@
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from .pagination import MAX_PAGE_SIZE, PAGE_SIZE, KeysetPagination
+from .store import Collection
+
+
+def request(**query):
+    return Request(APIRequestFactory().get('/api/questions/', query))
+
+
+def cursor(key):
+    return KeysetPagination().encode_cursor(key)
+
+
+def test_page_size():
+    paginator = KeysetPagination()
+    assert paginator.get_page_size(request()) == PAGE_SIZE
+    assert paginator.get_page_size(request(page_size='10')) == 10
+    assert paginator.get_page_size(request(page_size='0')) == 1
+    assert paginator.get_page_size(request(page_size='100000')) == MAX_PAGE_SIZE
+    assert paginator.get_page_size(request(page_size='many')) == PAGE_SIZE
+
+
+def test_paginate_keys():
+    collection = Collection({key: {} for key in ['c', 'a', 'b', 'd']})
+    paginator = KeysetPagination()
+    assert paginator.paginate_keys(collection, request(page_size='3')) == ['a', 'b', 'c']
+    assert paginator.next_cursor == 'c'
+    assert paginator.paginate_keys(collection, request(page_size='3', cursor=cursor('c'))) == ['d']
+    assert paginator.next_cursor is None
+    # a page starts after the key of the cursor, even if that entry is gone
+    assert paginator.paginate_keys(collection, request(page_size='2', cursor=cursor('aa'))) == ['b', 'c']
+
+
+def test_paginate_positions():
+    paginator = KeysetPagination()
+    assert paginator.paginate_positions(5, request(page_size='2')) == range(0, 2)
+    assert paginator.next_cursor == '1'
+    assert paginator.paginate_positions(5, request(page_size='2', cursor=cursor('1'))) == range(2, 4)
+    assert paginator.paginate_positions(5, request(page_size='2', cursor=cursor('3'))) == range(4, 5)
+    assert paginator.next_cursor is None
+    assert paginator.paginate_positions(5, request(cursor=cursor('-1'))) == range(0, 5)
+    assert paginator.paginate_positions(5, request(cursor=cursor('9'))) == range(10, 5)
+
+
+@pytest.mark.parametrize('encoded', [
+    cursor('-5'), cursor('-2'), cursor('x'), cursor(''), 'not base64', 'é'
+])
+def test_invalid_position_cursor(encoded):
+    with pytest.raises(NotFound):
+        KeysetPagination().paginate_positions(5, request(cursor=encoded))
+
+
+def test_next_link():
+    paginator = KeysetPagination()
+    paginator.paginate_positions(5, request(page_size='2', fields='answer'))
+    link = urlsplit(paginator.get_paginated_response([]).data['next'])
+    assert link.path == '/api/questions/'
+    assert parse_qs(link.query) == {'page_size': ['2'], 'fields': ['answer'], 'cursor': [cursor('1')]}
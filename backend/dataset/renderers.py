@@ -0,0 +1,14 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline delimited JSON: the views stream their entries with this format (?format=ndjson)
+    themselves, this renders anything else (e.g. errors) as a single line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (json.dumps(data) + '\n').encode(self.charset)
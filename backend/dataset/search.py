@@ -0,0 +1,160 @@
+"""
+Searches the prompts and answers in the database with the filters of the frontend, like search.engine.
+
+The normalized columns hold the texts as the search expressions compare them (lowercase,
+without diacritics and the ignored characters), so every word of an expression becomes a
+LIKE '%word%' condition which PostgreSQL answers from the trigram indexes instead of
+scanning all the rows. As in the in-memory engine, expressions with &, phrases or
+diacritics are then checked with SearchExpression on the rows found that way.
+"""
+from functools import reduce
+from operator import and_, or_
+from typing import Dict, List, Set, Tuple
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Count, Max, Q, QuerySet
+
+from search.engine import OPERATORS, Filter
+from search.expression import SearchExpression, normalize_needle, normalize_text, query_groups, remove_diacritics
+
+from .models import Answer, Question
+
+FIELDS = ['prompt', 'answer']
+
+
+def answer_examples(answer: str) -> List[str]:
+    ## The translations of an answer (separated by |) are separate texts for the frontend; an unattested answer has no text
+    return ['' if example == 'unattested' else example for example in answer.split('|')]
+
+
+def normalize_answer(answer: str) -> str:
+    ## The normalized translations, separated by a space so a needle never matches across them
+    return ' '.join(filter(None, (normalize_text(example) for example in answer_examples(answer))))
+
+
+def texts(field: str, text: str) -> List[str]:
+    return answer_examples(text) if field == 'answer' else [text]
+
+
+def search_texts(queryset: QuerySet, field: str, filter: Filter, question: str) -> Dict[Tuple[object, int], str]:
+    ## The texts matching any of the search expressions of the filter, as (row, translation), with their question
+    found = {}
+    for query in filter.content:
+        whole = False  # does every row found by the database match, if it has a single text?
+        if filter.only_full_match:
+            # a text equal to the query is normalized to the normalized query, which is therefore
+            # part of the normalized column
+            needle = normalize_text(query)
+            if needle:
+                candidates = queryset.filter(**{field + '_normalized__contains': needle})
+            else:
+                # only the texts without any characters to search for (e.g. unattested answers) can match,
+                # as the whole text or as one of the translations of an answer
+                condition = Q(**{field + '_normalized': ''})
+                if field == 'answer':
+                    condition |= Q(answer__contains='|')
+                candidates = queryset.filter(condition)
+                if query:
+                    candidates = candidates.filter(**{field + '__contains': query})
+
+            def matches(text, query=query):
+                return text == query
+        else:
+            groups = [[normalize_needle(word) for word in group] for group in query_groups(query)]
+            conditions = [
+                reduce(and_, (Q(**{field + '_normalized__contains': remove_diacritics(needle)}) for needle in needles))
+                # a word without any characters to search for never matches
+                for needles in groups if all(needles)
+            ]
+            if not conditions:
+                continue
+            candidates = queryset.filter(reduce(or_, conditions))
+            if '&' not in query and '"' not in query and all(
+                    needles[0] == remove_diacritics(needles[0]) for needles in groups):
+                # any of the words matches: the normalized texts containing them are exactly the matches
+                whole = True
+                words = [needles[0] for needles in groups if needles[0]]
+
+                def matches(text, words=words):
+                    normalized = normalize_text(text)
+                    return any(word in normalized for word in words)
+            else:
+                # the diacritics of a needle have to match, and & and phrases need the positions of the words
+                def matches(text, expression=SearchExpression(query)):
+                    return bool(expression.search(text))
+
+        for pk, tag, text in candidates.values_list('pk', question, field):
+            examples = texts(field, text)
+            if whole and len(examples) == 1:
+                found[pk, 0] = tag
+            else:
+                found.update(((pk, index), tag) for index, example in enumerate(examples) if matches(example))
+    return found
+
+
+class DatabaseSearch:
+    """The filters on the prompts and answers of search.engine.SearchEngine, answered by the database.
+
+    As in SearchEngine, every translation of an answer is matched as a separate answer.
+    """
+
+    def question_matches(self, filter: Filter) -> Set[str]:
+        if not filter.applies_to('prompt'):
+            return set()
+        if filter.empty:
+            return set(Question.objects.values_list('tag', flat=True))
+        return set(search_texts(Question.objects.all(), 'prompt', filter, 'tag').values())
+
+    def answer_matches(self, filter: Filter) -> Dict[Tuple[int, int], str]:
+        ## The matching translations of the answers, with their question
+        if filter.empty:
+            return {
+                (pk, index): tag
+                for pk, tag, text in Answer.objects.values_list('pk', 'question_id', 'answer')
+                for index in range(len(answer_examples(text)))
+            }
+        return search_texts(Answer.objects.all(), 'answer', filter, 'question_id')
+
+    def search(self, filters: List[Filter], operator: str = 'or') -> List[str]:
+        ## The tags of the matching questions
+        if operator not in OPERATORS:
+            raise ValueError('Unknown operator: {}'.format(operator))
+        for filter in filters:
+            if filter.field not in FIELDS:
+                raise ValueError('Only the {} can be searched in the database'.format(' and '.join(FIELDS)))
+        if not filters:
+            return list(Question.objects.values_list('tag', flat=True))
+
+        question_matches = [self.question_matches(filter) for filter in filters]
+        answer_filters = [filter for filter in filters if filter.applies_to('answer')]
+        answer_matches = [self.answer_matches(filter) for filter in answer_filters]
+
+        if operator == 'or':
+            matched = set().union(*question_matches)
+            for answers in answer_matches:
+                matched.update(answers.values())
+        else:
+            # as in SearchEngine: the filters on the answers should all match the same answer
+            matched = set.intersection(*question_matches)
+            if answer_matches:
+                complete = {
+                    answer_matches[0][answer] for answer in set.intersection(*(set(answers) for answers in answer_matches))
+                }
+                other_matches = [
+                    questions for filter, questions in zip(filters, question_matches)
+                    if filter not in answer_filters
+                ]
+                if other_matches:
+                    complete &= set.intersection(*other_matches)
+                matched |= complete
+        return sorted(matched)
+
+
+def similar_answers(text: str, limit: int = 20) -> QuerySet:
+    ## The answers with a word most similar to the text (e.g. other spellings of a word), each spelling once
+    ## with the number of answers with it; found using the trigram index
+    needle = normalize_text(text)
+    return Answer.objects.filter(answer_normalized__trigram_word_similar=needle).values('answer').annotate(
+        similarity=Max(TrigramWordSimilarity(needle, 'answer_normalized')),
+        count=Count('pk')
+    ).order_by('-similarity', 'answer')[:limit]
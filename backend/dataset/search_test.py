@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from search.engine import Filter, SearchEngine
+
+from .conftest import HIERARCHY, JUDGMENTS, QUESTIONS
+from .loader import load_dataset
+from .search import DatabaseSearch, normalize_answer, similar_answers
+
+
+@pytest.fixture
+def database(db):
+    load_dataset(QUESTIONS, JUDGMENTS, HIERARCHY)
+    return DatabaseSearch()
+
+
+def test_normalize_answer():
+    assert normalize_answer('Hij loopt, snel (naar) huis') == 'hij loopt snel naar huis'
+    # the translations are separated, and unattested has no text
+    assert normalize_answer('Zie proat|zachjes') == 'zie proat zachjes'
+    assert normalize_answer('hij lópt|unattested') == 'hij lopt'
+    assert normalize_answer('-') == ''
+
+
+@pytest.mark.parametrize('filters,operator', [
+    ([('prompt', ['snel'])], 'or'),
+    ([('prompt', ['kat & snel', 'slaapt'])], 'or'),
+    ([('prompt', ['"praat zacht"', '"zacht praat"'])], 'or'),
+    ([('answer', ['zachjes', 'huus'])], 'or'),
+    ([('answer', ['lopt'])], 'or'),
+    ([('answer', ['lópt', 'lopt & hoes'])], 'or'),
+    ([('answer', ['unattested'])], 'or'),
+    ([('answer', ['']), ('prompt', ['kat'])], 'and'),
+    ([('answer', ['-', "'", '('])], 'or'),
+    ([('answer', ['proat']), ('answer', ['zachjes'])], 'and'),
+    ([('answer', ['praot']), ('prompt', ['zacht'])], 'and'),
+    ([('answer', ['noar']), ('prompt', ['kat'])], 'or'),
+    # only the whole text (or translation) matches, with the spaces and ignored characters of the query
+    ([('answer', ['Hij loopt, snel (naar) huis'], True)], 'or'),
+    ([('answer', ['Hij loopt snel naar huis', 'hij loopt, snel (naar) huis'], True)], 'or'),
+    ([('answer', ['Zij praot zachjes', 'hij lópt snel nor hoes'], True)], 'or'),
+    ([('answer', ['Zij\tpraat\\zacht'], True)], 'or'),
+    ([('answer', [''], True)], 'or'),
+    ([('answer', ['x', ''], True)], 'or'),
+    ([('answer', ['-', 'unattested'], True)], 'or'),
+    ([('prompt', ['Zij praat', ''], True)], 'or'),
+    ([('prompt', ['De kat slaapt'], True), ('answer', ['-'], True)], 'or'),
+])
+def test_search(database, filters, operator):
+    filters = [Filter(*filter) for filter in filters]
+    assert database.search(filters, operator) == SearchEngine(QUESTIONS, HIERARCHY).search(filters, operator)
+
+
+def test_search_fields(database):
+    assert database.search([]) == sorted(QUESTIONS)
+    with pytest.raises(ValueError):
+        database.search([Filter('dialects', ['Hollands'])])
+    with pytest.raises(ValueError):
+        database.search([Filter('prompt', ['kat'])], 'xor')
+
+
+def test_full_match_uses_normalized_column(database):
+    # so the trigram index can find the candidates
+    with CaptureQueriesContext(connection) as queries:
+        database.search([Filter('answer', ['Hij loopt, snel (naar) huis'], True)])
+    assert [query['sql'] for query in queries if '"answer_normalized"::text LIKE' in query['sql']]
+
+
+def test_similar_answers(database):
+    answers = list(similar_answers('lopt'))
+    assert answers[0]['answer'] == 'hij lópt snel nor hoes|unattested'
+    assert answers[0]['count'] == 1
+    assert [answer['similarity'] for answer in answers] == sorted((answer['similarity'] for answer in answers),
+                                                                   reverse=True)
+    assert list(similar_answers('xyzzy')) == []
+
+
+def test_search_view(api_client, database):
+    response = api_client.post('/api/questions/search/', {
+        'database': True, 'filters': [{'field': 'answer', 'content': ['zachjes', 'huus']}], 'operator': 'or'
+    }, format='json')
+    assert response.json()['ids'] == ['D1Z1[SQ001]', 'D1Z2[SQ002]']
+    for data in [['database'], {'database': True, 'filters': 'snel'}, {'database': True, 'filters': [],
+                                                                       'operator': 'xor'},
+                 {'database': True, 'filters': [{'field': 'dialects', 'content': ['Hollands']}]}]:
+        assert api_client.post('/api/questions/search/', data, format='json').status_code == 400
+
+
+def test_similar_answers_view(api_client, database):
+    response = api_client.get('/api/questions/similar-answers/?text=huus&limit=1')
+    assert response.json() == [{'answer': 'Hij loapt snel noar huus', 'similarity': 1.0, 'count': 1}]
+    assert api_client.get('/api/questions/similar-answers/?text=%20').status_code == 400
+    assert api_client.get('/api/questions/similar-answers/?text=huus&limit=many').status_code == 400
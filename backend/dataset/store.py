@@ -0,0 +1,72 @@
+"""
+The outputs of read_questionnaire.py and read_likert.py (or ingest.py), loaded once per process.
+
+Both are JSON objects of key -> entry; they are read in any of the formats the readers can
+write (regular, compact or NDJSON) and loaded again when the file is written anew.
+"""
+import json
+import os
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from read_data.compact import load_questionnaires
+
+
+def output_path(setting, name):
+    ## The configured path, or the output of the readers in the output folder
+    if setting:
+        return setting
+    filepath = os.path.join(settings.OUTPUT_PATH, name + '.json')
+    ndjson_filepath = os.path.join(settings.OUTPUT_PATH, name + '.ndjson')
+    return ndjson_filepath if not os.path.exists(filepath) and os.path.exists(ndjson_filepath) else filepath
+
+
+def questions_path():
+    return output_path(settings.QUESTIONS_PATH, 'cleaned_translation_questions')
+
+
+def judgments_path():
+    return output_path(settings.JUDGMENTS_PATH, 'likert_scales_test')
+
+
+def load_entries(filepath) -> Dict[str, dict]:
+    with open(filepath, encoding='utf8') as file:
+        if filepath.endswith('.ndjson'):
+            # every line is an object with a single entry
+            entries = {}
+            for line in file:
+                if line.strip():
+                    entries.update(json.loads(line))
+            return entries
+        return load_questionnaires(file)
+
+
+class Collection:
+    """The entries of an output file, ordered by their key."""
+
+    def __init__(self, entries: Dict[str, dict]):
+        self.entries = entries
+        self.keys: List[str] = sorted(entries)
+        self.search_engine = None  # built on the first search, see dataset.views
+
+    def after(self, key: Optional[str]) -> int:
+        ## The position of the first key after this one
+        return 0 if key is None else bisect_right(self.keys, key)
+
+
+_collections = {}
+
+
+def get_collection(filepath) -> Collection:
+    modified = os.path.getmtime(filepath)
+    try:
+        collection_modified, collection = _collections[filepath]
+        if collection_modified == modified:
+            return collection
+    except KeyError:
+        pass
+    collection = Collection(load_entries(filepath))
+    _collections[filepath] = (modified, collection)
+    return collection
@@ -0,0 +1,195 @@
+import json
+import os
+import time
+from typing import List, Optional
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from read_data.dialect_hierarchy import load_hierarchy
+from search.engine import Filter, SearchEngine
+
+from .pagination import KeysetPagination
+from .renderers import NDJSONRenderer
+from .search import DatabaseSearch, similar_answers
+from .store import Collection, get_collection, judgments_path, questions_path
+
+
+class CollectionViewSet(viewsets.ViewSet):
+    """Read-only access to the entries of an output file of the readers, in pages ordered by their key.
+
+    ?fields=a,b limits the entries to these fields (and their id); by default a list leaves out
+    the answers or responses (items_field) and gives their number instead, they can be
+    fetched per entry in pages of their own. ?format=ndjson streams all the entries (or
+    answers/responses) from the cursor on, one per line, instead of a single page.
+    """
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer]
+    items_field = ''
+    count_field = ''
+
+    def filepath(self) -> str:
+        raise NotImplementedError
+
+    def get_collection(self) -> Collection:
+        try:
+            return get_collection(self.filepath())
+        except FileNotFoundError:
+            raise NotFound('No data available')
+
+    def get_entry(self, collection, pk):
+        try:
+            return collection.entries[pk]
+        except KeyError:
+            raise NotFound()
+
+    def requested_fields(self, request: Request) -> Optional[List[str]]:
+        fields = request.query_params.get('fields')
+        return [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+
+    def project(self, key, entry, fields: Optional[List[str]], summary: bool) -> dict:
+        items = entry.get(self.items_field) or []
+        if fields is None:
+            projected = {'id': key, **entry}
+            if summary:
+                projected.pop(self.items_field, None)
+                projected[self.count_field] = len(items)
+            return projected
+
+        projected = {'id': key}
+        for field in fields:
+            if field == self.count_field:
+                projected[field] = len(items)
+            elif field in entry:
+                projected[field] = entry[field]
+            elif field != 'id':
+                raise ValidationError({'fields': ['Unknown field: {}'.format(field)]})
+        return projected
+
+    def is_ndjson(self, request: Request) -> bool:
+        return request.accepted_renderer.format == NDJSONRenderer.format
+
+    def stream(self, rows) -> StreamingHttpResponse:
+        return StreamingHttpResponse((json.dumps(row) + '\n' for row in rows), content_type=NDJSONRenderer.media_type)
+
+    def list(self, request: Request):
+        collection = self.get_collection()
+        fields = self.requested_fields(request)
+        paginator = KeysetPagination()
+        if self.is_ndjson(request):
+            keys = collection.keys[paginator.start(collection, request):]
+            return self.stream(self.project(key, collection.entries[key], fields, True) for key in keys)
+
+        keys = paginator.paginate_keys(collection, request)
+        return paginator.get_paginated_response([
+            self.project(key, collection.entries[key], fields, True) for key in keys
+        ])
+
+    def retrieve(self, request: Request, pk=None):
+        collection = self.get_collection()
+        return Response(self.project(pk, self.get_entry(collection, pk), self.requested_fields(request), False))
+
+    def list_items(self, request: Request, pk):
+        ## The answers or responses of an entry, in pages of their own
+        items = self.get_entry(self.get_collection(), pk).get(self.items_field) or []
+        fields = self.requested_fields(request)
+
+        def project(item):
+            return item if fields is None else {field: item.get(field) for field in fields}
+
+        paginator = KeysetPagination()
+        if self.is_ndjson(request):
+            return self.stream(project(item) for item in items[paginator.start_position(request):])
+
+        positions = paginator.paginate_positions(len(items), request)
+        return paginator.get_paginated_response([project(items[position]) for position in positions])
+
+
+class QuestionViewSet(CollectionViewSet):
+    """The translation questions (cleaned_translation_questions.json)."""
+    items_field = 'answers'
+    count_field = 'answer_count'
+
+    def filepath(self):
+        return questions_path()
+
+    @action(detail=True)
+    def answers(self, request: Request, pk=None):
+        return self.list_items(request, pk)
+
+    def search_database(self, request: Request):
+        start = time.perf_counter()
+        try:
+            filters = [Filter.from_json(data) for data in request.data.get('filters', [])]
+            ids = DatabaseSearch().search(filters, request.data.get('operator', 'or'))
+        except (AttributeError, TypeError, ValueError) as error:
+            raise ValidationError(str(error))
+        return Response({
+            'ids': ids,
+            'count': len(ids),
+            'milliseconds': round((time.perf_counter() - start) * 1000, 3)
+        })
+
+    @action(detail=False, url_path='similar-answers')
+    def similar_answers(self, request: Request):
+        """The spellings of the answers in the database with a word most similar to ?text=, at most ?limit="""
+        text = request.query_params.get('text', '')
+        if not text.strip():
+            raise ValidationError({'text': ['This parameter is required']})
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), KeysetPagination.max_page_size)
+        except ValueError:
+            raise ValidationError({'limit': ['A number is required']})
+        return Response([
+            {
+                'answer': answer['answer'],
+                'similarity': round(answer['similarity'], 3),
+                'count': answer['count']
+            }
+            for answer in similar_answers(text, limit)
+        ])
+
+    @action(detail=False, methods=['post'])
+    def search(self, request: Request):
+        """Search the questions with the filters of the frontend: {"filters": [Filter, ...], "operator": "and" | "or"}
+        returns the IDs of the matching questions, see search.engine. With "database": true the prompts and
+        answers loaded in the database are searched instead, see dataset.search."""
+        if not isinstance(request.data, dict):
+            raise ValidationError('The search should be a JSON object')
+        if request.data.get('database'):
+            return self.search_database(request)
+        collection = self.get_collection()
+        if collection.search_engine is None:
+            ## the index is built on the first search of every version of the file
+            hierarchy_path = settings.DIALECT_HIERARCHY_PATH
+            hierarchy = load_hierarchy(hierarchy_path) if os.path.exists(hierarchy_path) else None
+            collection.search_engine = SearchEngine(collection.entries, hierarchy)
+        start = time.perf_counter()
+        try:
+            filters = [Filter.from_json(data) for data in request.data.get('filters', [])]
+            ids = collection.search_engine.search(filters, request.data.get('operator', 'or'))
+        except (AttributeError, TypeError, ValueError) as error:
+            raise ValidationError(str(error))
+        return Response({
+            'ids': ids,
+            'count': len(ids),
+            'milliseconds': round((time.perf_counter() - start) * 1000, 3)
+        })
+
+
+class JudgmentViewSet(CollectionViewSet):
+    """The Likert judgment items (likert_scales_test.json)."""
+    items_field = 'responses'
+    count_field = 'response_count'
+
+    def filepath(self):
+        return judgments_path()
+
+    @action(detail=True)
+    def responses(self, request: Request, pk=None):
+        return self.list_items(request, pk)
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from .conftest import JUDGMENTS, QUESTIONS
+from .pagination import KeysetPagination
+
+
+def follow_pages(api_client, url):
+    results = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        results += response.json()['results']
+        url = response.json()['next']
+    return results
+
+
+def test_list_questions(api_client, output_files):
+    questions = follow_pages(api_client, '/api/questions/?page_size=3&fields=prompt,answer_count')
+    assert questions == [
+        {'id': tag, 'prompt': question['prompt'], 'answer_count': len(question['answers'])}
+        for tag, question in sorted(QUESTIONS.items())
+    ]
+
+
+def test_list_answers(api_client, output_files):
+    answers = follow_pages(api_client, '/api/questions/D1Z1[SQ001]/answers/?page_size=3&fields=answer')
+    assert answers == [{'answer': answer['answer']} for answer in QUESTIONS['D1Z1[SQ001]']['answers']]
+    assert follow_pages(api_client, '/api/judgments/J1Z0[SQ001]/responses/') == JUDGMENTS['J1Z0[SQ001]']['responses']
+
+
+def test_retrieve(api_client, output_files):
+    response = api_client.get('/api/judgments/J1Z0[SQ001]/')
+    assert response.json() == {'id': 'J1Z0[SQ001]', **JUDGMENTS['J1Z0[SQ001]']}
+    assert api_client.get('/api/judgments/J2Z0[SQ001]/').status_code == 404
+    assert api_client.get('/api/questions/?fields=bogus').status_code == 400
+
+
+def test_ndjson(api_client, output_files):
+    response = api_client.get('/api/questions/?format=ndjson&fields=prompt')
+    lines = b''.join(response.streaming_content).decode('utf8').splitlines()
+    assert [json.loads(line)['id'] for line in lines] == sorted(QUESTIONS)
+
+
+def test_negative_cursor(api_client, output_files):
+    cursor = KeysetPagination().encode_cursor('-5')
+    assert api_client.get('/api/questions/D1Z1[SQ001]/answers/?cursor=' + cursor).status_code == 404
+
+
+def test_search(api_client, output_files):
+    response = api_client.post('/api/questions/search/', {
+        'filters': [{'field': 'answer', 'content': ['zachjes', 'huus']}], 'operator': 'or'
+    }, format='json')
+    assert response.status_code == 200
+    assert response.json()['ids'] == ['D1Z1[SQ001]', 'D1Z2[SQ002]']
+
+
+@pytest.mark.parametrize('data', [
+    ['D1Z1[SQ001]'], 'snel', 3, {'filters': 'snel'}, {'filters': [{'content': ['snel']}]},
+    {'filters': [], 'operator': 'xor'}
+])
+def test_invalid_search(api_client, output_files, data):
+    response = api_client.post('/api/questions/search/', data, format='json')
+    assert response.status_code == 400
@@ -6,9 +6,11 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'livereload',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'revproxy',
-    'upload'
+    'upload',
+    'dataset'
 ]
 
 MIDDLEWARE = [
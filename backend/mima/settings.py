@@ -104,8 +104,23 @@ ADDITIONAL_DATA_PATH_Q2 = ""
 PARTICIPANTS_PATH_Q1 = ""
 PARTICIPANTS_PATH_Q2 = ""
 
+## Path to the data and participants' data read by read_data.py
+DATA_PATH = ""
+PARTICIPANTS_PATH = ""
+
 ## Path to the output folder
 OUTPUT_PATH = ""
 
+## Path to the dialect hierarchy written by organize_dialects.py
+DIALECT_HIERARCHY_PATH = os.path.join(os.path.dirname(BASE_DIR), 'dialect_hierarchy.json')
+
+## Paths to the translation questions and judgments served by /api/questions/ and /api/judgments/,
+## leave empty to use cleaned_translation_questions.json and likert_scales_test.json in the output folder
+QUESTIONS_PATH = ""
+JUDGMENTS_PATH = ""
+
+## Path to the folder for cached intermediate results of the read_data scripts, leave empty to disable caching
+CACHE_PATH = ""
+
 if os.path.exists(os.path.join(BASE_DIR, 'mima/local_settings.py')):
     from mima.local_settings import *
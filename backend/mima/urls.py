@@ -20,11 +20,14 @@ from django.views.generic import RedirectView
 
 from rest_framework import routers
 
+from dataset.views import JudgmentViewSet, QuestionViewSet
 from .index import index
 from .proxy_frontend import proxy_frontend
 from .i18n import i18n
 
 api_router = routers.DefaultRouter()  # register viewsets with this router
+api_router.register(r'questions', QuestionViewSet, basename='question')
+api_router.register(r'judgments', JudgmentViewSet, basename='judgment')
 
 if settings.PROXY_FRONTEND:
     spa_url = re_path(r'^(?P<path>.*)$', proxy_frontend)
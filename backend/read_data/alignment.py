@@ -0,0 +1,163 @@
+"""
+Finds the manner adverbial (MA) in a translation, by aligning the translation with the MA of the prompt.
+
+The MA is first taken from the same position as in the prompt. Then every word (or window
+of words, for MAs of several words) of the translation is compared with the prompt MA;
+the windows closer to it than the word(s) at the position become the candidates.
+
+Every translation is split into words once. Windows which cannot come closer to the prompt
+MA than the best match so far, because their lengths alone differ too much, are skipped
+without computing their edit distance, and so are windows occurring twice in a translation.
+
+Many participants give the same translation, so the alignments are memoized by
+(words of the translation, prompt MA, MA position) in an AlignmentCache, which can
+be kept on disk between runs.
+"""
+import os
+import pickle
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import editdistance
+
+from cache import PIPELINE_VERSION, write_pickle
+from records import slotted
+
+## number of alignments kept in memory (and on disk) by default; the least recently used ones are evicted first
+ALIGNMENT_CACHE_SIZE = 500000
+
+## (start, end) for an MA of several words
+MAPosition = Union[int, Tuple[int, int]]
+
+
+@slotted
+@dataclass
+class Alignment:
+    ma: str                 # the word(s) at the MA position of the translation
+    prompt_ma: str          # the word(s) at the MA position of the prompt
+    distance: int           # edit distance between the prompt MA and the best match
+    candidates: tuple = ()  # windows closer to the prompt MA than the MA at the position, all at the same distance
+
+    def entry_ma(self):
+        ## The MA as read_data has always stored it: [MA, first candidate] if there is a closer match
+        return [self.ma, self.candidates[0]] if self.candidates else self.ma
+
+
+def positional_ma(tokens, prompt_tokens, ma_position: MAPosition):
+    if type(ma_position) == int:
+        try:
+            ma = tokens[ma_position]
+        except IndexError:
+            return 'NA', 'NA'  # for the idem answers
+        try:
+            return ma, prompt_tokens[ma_position]
+        except IndexError:
+            return ma, 'NA'
+    start, end = ma_position
+    return ' '.join(tokens[start:end]), ' '.join(prompt_tokens[start:end])
+
+
+def windows(tokens, ma_position: MAPosition):
+    if type(ma_position) == int:
+        return tokens
+    length = ma_position[1] - ma_position[0]
+    # the last window of the translation is not compared, as before
+    return [' '.join(tokens[start:start + length]) for start in range(len(tokens) - length)]
+
+
+def align(answer: str, prompt: str, ma_position: MAPosition) -> Alignment:
+    tokens = answer.split()
+    ma, prompt_ma = positional_ma(tokens, prompt.split(), ma_position)
+    best = editdistance.distance(ma, prompt_ma)
+    candidates = []
+    seen = set()
+    prompt_ma_length = len(prompt_ma)
+
+    for window in windows(tokens, ma_position):
+        # the best distance only decreases: a window seen before has been decided already
+        if window in seen:
+            continue
+        seen.add(window)
+        # the difference in length is a lower bound of the edit distance
+        if abs(len(window) - prompt_ma_length) > best:
+            continue
+        distance = editdistance.distance(window, prompt_ma)
+        if distance < best:
+            best = distance
+            candidates = [window]
+        elif distance == best and candidates:
+            candidates.append(window)
+
+    return Alignment(ma, prompt_ma, best, tuple(candidates))
+
+
+def prompt_ma_at(prompt_tokens, ma_position: MAPosition):
+    if type(ma_position) == int:
+        try:
+            return prompt_tokens[ma_position]
+        except IndexError:
+            return 'NA'
+    return ' '.join(prompt_tokens[ma_position[0]:ma_position[1]])
+
+
+class AlignmentCache:
+    """Least recently used cache of alignments, optionally kept in a directory between runs.
+
+    The alignment of a translation only depends on its words, the MA of the prompt and the
+    MA position, so those (with the words joined by single spaces) make up the key.
+    """
+
+    def __init__(self, directory='', maxsize=ALIGNMENT_CACHE_SIZE):
+        self.filepath = os.path.join(directory, 'alignments-{}.pickle'.format(PIPELINE_VERSION)) if directory else None
+        self.maxsize = maxsize
+        self.alignments: 'OrderedDict[tuple, Alignment]' = OrderedDict()
+        self.prompt_mas = {}
+        self.hits = 0
+        self.misses = 0
+        if self.filepath:
+            try:
+                with open(self.filepath, 'rb') as file:
+                    self.alignments = pickle.load(file)
+            except FileNotFoundError:
+                pass
+
+    def key(self, answer: str, prompt: str, ma_position: MAPosition):
+        try:
+            prompt_ma = self.prompt_mas[prompt, ma_position]
+        except KeyError:
+            prompt_ma = self.prompt_mas[prompt, ma_position] = prompt_ma_at(prompt.split(), ma_position)
+        return ' '.join(answer.split()), prompt_ma, ma_position
+
+    def get(self, key) -> Optional[Alignment]:
+        try:
+            self.alignments.move_to_end(key)
+        except KeyError:
+            return None
+        return self.alignments[key]
+
+    def put(self, key, alignment: Alignment):
+        self.alignments[key] = alignment
+        self.alignments.move_to_end(key)
+        while len(self.alignments) > self.maxsize:
+            self.alignments.popitem(last=False)
+
+    def align(self, answer: str, prompt: str, ma_position: MAPosition) -> Alignment:
+        key = self.key(answer, prompt, ma_position)
+        alignment = self.get(key)
+        if alignment is None:
+            self.misses += 1
+            alignment = align(answer, prompt, ma_position)
+            self.put(key, alignment)
+        else:
+            self.hits += 1
+        return alignment
+
+    def save(self):
+        if self.filepath:
+            write_pickle(self.filepath, self.alignments)
+
+    def __str__(self) -> str:
+        lookups = self.hits + self.misses
+        return 'Alignment cache: {} hits, {} misses ({:.1%} hit rate), {} alignments cached'.format(
+            self.hits, self.misses, self.hits / lookups if lookups else 0, len(self.alignments))
@@ -0,0 +1,38 @@
+import random
+
+from alignment import Alignment, AlignmentCache, align
+from benchmark_alignment import generate_translations, reference_detect_ma
+
+
+def test_align():
+    assert align('hij loapt snel noar huus', 'Hij loopt snel naar huis', 2) == Alignment('snel', 'snel', 0)
+    assert align('snel hij loapt noar huus', 'Hij loopt snel naar huis', 2).entry_ma() == ['loapt', 'snel']
+    assert align('idem', 'Hij loopt snel naar huis', 2) == Alignment('NA', 'NA', 0)
+    alignment = align('zie antwoordde hiel beleefd op de vraog', 'Zij antwoordde heel beleefd op de vraag', (2, 4))
+    assert (alignment.entry_ma(), alignment.prompt_ma) == ('hiel beleefd', 'heel beleefd')
+
+
+def test_align_as_before():
+    # the alignment engine finds the same MA as the detection loop it replaced
+    random.seed(0)
+    for translation in generate_translations(2000, 30):
+        alignment = align(*translation)
+        assert (alignment.entry_ma(), alignment.prompt_ma) == reference_detect_ma(*translation), translation
+
+
+def test_alignment_cache(tmp_path):
+    cache = AlignmentCache(str(tmp_path), maxsize=2)
+    alignment = cache.align('hij loapt snel', 'Hij loopt snel naar huis', 2)
+    # the translation is split into words, so only the words matter
+    assert cache.align(' hij  loapt snel ', 'Hij loopt snel naar huis', 2) is alignment
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.align('zij loapt snel', 'Hij loopt snel naar huis', 2)
+    cache.align('hij loapt snel', 'Hij loopt snel naar huis', 2)
+    cache.align('wij loapt snel', 'Hij loopt snel naar huis', 2)
+    # the least recently used alignment is evicted
+    assert [key[0] for key in cache.alignments] == ['hij loapt snel', 'wij loapt snel']
+
+    cache.save()
+    assert AlignmentCache(str(tmp_path)).alignments == cache.alignments
+    assert AlignmentCache().filepath is None
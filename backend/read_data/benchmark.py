@@ -0,0 +1,169 @@
+"""
+Measures the wall time and peak memory of every stage of the data pipeline on a
+synthetic dataset (see synthetic.py), to track performance regressions between releases.
+
+Every stage runs in a fresh process, with the paths in mima.settings pointing to the
+synthetic dataset and the pipeline cache disabled:
+- read_questionnaire, read_likert and ingest on both questionnaires
+- read_data on the first questionnaire
+- likert_aggregates, dialect_similarity and lexical_distances on both questionnaires
+- organize_dialects on the synthetic dialect_data.txt
+
+Usage: python benchmark.py [--scale 1 10 100] [--stages ...] [--output results.json] [--compare previous.json]
+"""
+import argparse
+import json
+import os
+import resource
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import generate
+
+READ_DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(READ_DATA_DIR)
+REPOSITORY_DIR = os.path.dirname(BACKEND_DIR)
+
+STAGES = {
+    'read_questionnaire': os.path.join(READ_DATA_DIR, 'read_questionnaire.py'),
+    'read_likert': os.path.join(READ_DATA_DIR, 'read_likert.py'),
+    'ingest': os.path.join(READ_DATA_DIR, 'ingest.py'),
+    'read_data': os.path.join(READ_DATA_DIR, 'read_data.py'),
+    'likert_aggregates': os.path.join(READ_DATA_DIR, 'likert_aggregates.py'),
+    'dialect_similarity': os.path.join(READ_DATA_DIR, 'dialect_similarity.py'),
+    'lexical_distances': os.path.join(READ_DATA_DIR, 'lexical_distances.py'),
+    'organize_dialects': os.path.join(REPOSITORY_DIR, 'organize_dialects.py'),
+}
+
+
+def configure_settings(dataset):
+    ## Point the settings to the synthetic dataset, before any of the scripts imports them
+    import mima.settings as settings
+
+    for wave in [1, 2]:
+        directory = os.path.join(dataset, 'q{}'.format(wave))
+        setattr(settings, 'DATA_PATH_Q{}'.format(wave), os.path.join(directory, 'data.csv'))
+        setattr(settings, 'PARTICIPANTS_PATH_Q{}'.format(wave), os.path.join(directory, 'participants.csv'))
+        setattr(settings, 'ADDITIONAL_DATA_PATH_Q{}'.format(wave), os.path.join(directory, 'additional.csv'))
+    settings.DATA_PATH = settings.DATA_PATH_Q1
+    settings.PARTICIPANTS_PATH = settings.PARTICIPANTS_PATH_Q1
+    settings.OUTPUT_PATH = os.path.join(dataset, 'output')
+    settings.CACHE_PATH = ''
+
+
+def run_stage(stage, dataset, report_path):
+    ## Runs in the child process: execute the script as __main__ and report its own measurements
+    configure_settings(dataset)
+    if stage == 'organize_dialects':
+        # reads and writes its files in the working directory
+        os.chdir(dataset)
+    sys.argv = [STAGES[stage]]
+
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            runpy.run_path(STAGES[stage], run_name='__main__')
+        finally:
+            sys.stdout = stdout
+    seconds = time.perf_counter() - start
+
+    # the largest of this process and the worker processes it started
+    peak_rss = max(resource.getrusage(who).ru_maxrss for who in [resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN])
+    # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+    if sys.platform != 'darwin':
+        peak_rss *= 1024
+    with open(report_path, 'w') as file:
+        json.dump({'seconds': seconds, 'peak_rss': peak_rss}, file)
+
+
+def measure(stage, dataset):
+    with tempfile.TemporaryDirectory() as directory:
+        report_path = os.path.join(directory, 'report.json')
+        environment = dict(os.environ)
+        environment['PYTHONPATH'] = os.pathsep.join(
+            [READ_DATA_DIR, BACKEND_DIR] + ([environment['PYTHONPATH']] if environment.get('PYTHONPATH') else []))
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run-stage', stage, '--dataset', dataset, '--report', report_path],
+            cwd=READ_DATA_DIR, env=environment, check=True)
+        with open(report_path) as file:
+            return json.load(file)
+
+
+def compare(results, previous, threshold):
+    ## Returns the stages which got slower or use more memory than the previous results allow
+    regressions = []
+    for scale, stages in results.items():
+        for stage, measurements in stages.items():
+            try:
+                previous_measurements = previous[scale][stage]
+            except KeyError:
+                continue
+            for metric in ['seconds', 'peak_rss']:
+                if measurements[metric] > previous_measurements[metric] * threshold:
+                    regressions.append('{} at scale {}: {} went from {:.3g} to {:.3g}'.format(
+                        stage, scale, metric, previous_measurements[metric], measurements[metric]))
+    return regressions
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1], help='dataset sizes, in multiples of a survey wave')
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--directory', help='where to generate the datasets, a temporary directory by default')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='report regressions against the results of a previous run')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='ratio to the previous result above which a measurement counts as a regression')
+    parser.add_argument('--run-stage', help=argparse.SUPPRESS)
+    parser.add_argument('--dataset', help=argparse.SUPPRESS)
+    parser.add_argument('--report', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def run_benchmarks(args, directory):
+    results = {}
+    for scale in args.scale:
+        dataset = os.path.join(directory, 'scale-{}'.format(scale))
+        generate(dataset, scale, seed=args.seed)
+        results[str(scale)] = {}
+        for stage in args.stages:
+            measurements = measure(stage, dataset)
+            results[str(scale)][stage] = measurements
+            print('{:<20} scale {:>4}: {:8.2f} s {:10.1f} MB'.format(
+                stage, scale, measurements['seconds'], measurements['peak_rss'] / 2 ** 20))
+    return results
+
+
+def __main__():
+    args = parse_arguments()
+    if args.run_stage:
+        run_stage(args.run_stage, args.dataset, args.report)
+        return
+
+    if args.directory:
+        results = run_benchmarks(args, args.directory)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            results = run_benchmarks(args, directory)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=4)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print('REGRESSION', regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,119 @@
+"""
+Compares the alignment engine with the MA detection loop it replaced in read_data.py:
+checks that both give the same MA and prompt MA for every translation, and measures
+their speed on short translations and on long free-text ones.
+
+Usage: python benchmark_alignment.py [--translations N] [--long-words N]
+"""
+import argparse
+import random
+import time
+
+import editdistance
+
+from alignment import align
+from synthetic import SENTENCES, SOUND_CHANGES
+
+
+def reference_detect_ma(answer, prompt, ma_position):
+    ## reference: the MA detection as read_data did it before the alignment engine
+    entry_ma = 'NA'
+    prompt_ma = 'NA'
+    try:
+        if type(ma_position) == int:
+            ma = answer.split()[ma_position]
+            entry_ma = ma
+            prompt_ma = prompt.split()[ma_position]
+        else:
+            ma = answer.split()[ma_position[0]:ma_position[1]]
+            entry_ma = ' '.join(ma)
+            prompt_ma = ' '.join(prompt.split()[ma_position[0]:ma_position[1]])
+    except:
+        prompt_ma = 'NA'
+
+    ed_to_beat = editdistance.distance(entry_ma, prompt_ma)
+    if type(ma_position) == int:
+        for word in answer.split():
+            ed = editdistance.distance(word, prompt_ma)
+            if ed < ed_to_beat:
+                entry_ma = [ma, word]
+                ed_to_beat = ed
+    else:
+        len_ma = ma_position[1]-ma_position[0]
+        for i in range(len(answer.split())-len_ma):
+            ed = editdistance.distance(' '.join(answer.split()[i:i+len_ma]), prompt_ma)
+            if ed < ed_to_beat:
+                entry_ma = [' '.join(ma), ' '.join(answer.split()[i:i+len_ma])]
+                ed_to_beat = ed
+    return entry_ma, prompt_ma
+
+
+def parse_position(position):
+    if ':' in position:
+        start, end = position.split(':')
+        return int(start), int(end)
+    return int(position)
+
+
+def vary(word):
+    ## a dialectal spelling of a word, or another word altogether
+    for source, target in random.sample(SOUND_CHANGES, 2):
+        word = word.replace(source, target)
+    return word if random.random() < 0.8 else word[::-1]
+
+
+def generate_translations(count, long_words):
+    ## (answer, prompt, MA position) triples: translations of the prompts, some of them idem answers
+    ## and every tenth a long free-text translation
+    vocabulary = [word for sentence, _ in SENTENCES for word in sentence.split()]
+    translations = []
+    for index in range(count):
+        prompt, position = random.choice(SENTENCES)
+        words = [vary(word) for word in prompt.split()]
+        if index % 10 == 0:
+            words += [vary(random.choice(vocabulary)) for _ in range(long_words)]
+        elif random.random() < 0.05:
+            words = ['idem']
+        if random.random() < 0.2:
+            random.shuffle(words)
+        translations.append((' '.join(words), prompt, parse_position(position)))
+    return translations
+
+
+def measure(label, function):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<40} {elapsed:8.3f}s')
+    return elapsed, result
+
+
+def __main__():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--translations', type=int, default=50000)
+    parser.add_argument('--long-words', type=int, default=200, help='number of words in the long free-text translations')
+    args = parser.parse_args()
+
+    random.seed(0)
+    translations = generate_translations(args.translations, args.long_words)
+
+    before, expected = measure('per-window split and join', lambda: [
+        reference_detect_ma(*translation) for translation in translations])
+    after, aligned = measure('alignment engine', lambda: [
+        align(*translation) for translation in translations])
+    print(f'speed-up: {before / after:.1f}x')
+
+    differences = [
+        (translation, reference, (alignment.entry_ma(), alignment.prompt_ma))
+        for translation, reference, alignment in zip(translations, expected, aligned)
+        if reference != (alignment.entry_ma(), alignment.prompt_ma)
+    ]
+    for difference in differences[:10]:
+        print('DIFFERENT', *difference)
+    print(f'{len(translations) - len(differences)} of {len(translations)} translations give the same MA')
+    if differences:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    __main__()
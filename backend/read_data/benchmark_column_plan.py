@@ -0,0 +1,113 @@
+"""
+Compares the compiled column plans of extract_answers and get_responses with the
+per-cell lookups they replaced, on a synthetic wide export held in memory.
+
+Usage: python benchmark_column_plan.py [--questions N] [--participants N] [--judgments N]
+"""
+import argparse
+import random
+import time
+
+from read_questionnaire import Answer, create_questionnaire_items, extract_answers
+from read_likert import Response, get_full_id, get_judgment_items, get_responses
+
+
+def generate_export(questions, judgments, participants):
+    header = ['id', 'lastpage']
+    for i in range(questions):
+        header.append(f'D{i}Z1[SQ001]. Ik loop [snel] naar huis [Vertaling]')
+        header.append(f'CLEANED D{i}Z1[SQ001]. Ik loop [snel] naar huis [Vertaling]')
+        header.append(f'COMMENT D{i}Z1[SQ001] opmerking')
+    for i in range(judgments):
+        header.append(f'Q{i}Z1[SQ001]. Invulzin Hij rent … weg. [zin {i}]')
+
+    rows = []
+    for participant in range(participants):
+        row = [str(participant), '1']
+        for cell in header[2:]:
+            if 'Invulzin' in cell:
+                row.append(random.choice(['1', '2', '3', '4', '5']))
+            elif cell.endswith('[Vertaling]'):
+                row.append(random.choice(['', 'ik loop snel naar huus']))
+            else:
+                row.append('')
+        rows.append(row)
+    metadata = {row[0] + row[1]: ['Brabants'] for row in rows}
+    countries = {participant_id: ['Nederland'] for participant_id in metadata}
+    return header, rows, metadata, countries
+
+
+def list_lookup_answers(rows, questionnaire_items, translation_indices, participant_countries, participant_dialects, skip_list):
+    ## reference: the per-cell lookups as extract_answers did them before the column plan
+    for row in rows:
+        participant = ''.join(row[0:2])
+        if participant in skip_list:
+            continue
+        for index, cell in enumerate(row):
+            question = questionnaire_items[index]
+            if index in translation_indices:
+                if cell == '' and not questionnaire_items[index].cleaned:
+                    answer = Answer(question.tag, answer='unattested', country=participant_countries[participant], dialect=participant_dialects[participant], participant_id=participant)
+                elif cell != '':
+                    if questionnaire_items[index+1].cleaned and row[index+1] != '':
+                        continue
+                    answer = Answer(question.tag, answer=cell, country=participant_countries[participant], dialect=participant_dialects[participant], participant_id=participant)
+                else:
+                    continue
+                if question.answers:
+                    question.answers.append(answer)
+                else:
+                    question.answers = [answer]
+
+
+def list_lookup_responses(header, rows, participant_dialects, participant_countries, indices, judgments, skip_list):
+    ## reference: re-resolving the question key from the header for every row
+    for line in rows:
+        participant_id = ''.join(line[0:2])
+        if participant_id in skip_list:
+            continue
+        for index in indices:
+            question_id = get_full_id(header[index])
+            judgments[question_id].responses.append(
+                Response(participant_id, participant_dialects[participant_id], participant_countries[participant_id], line[index])
+            )
+
+
+def measure(label, function):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<40} {elapsed:8.3f}s')
+    return elapsed
+
+
+def __main__():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=400)
+    parser.add_argument('--judgments', type=int, default=400)
+    parser.add_argument('--participants', type=int, default=300)
+    args = parser.parse_args()
+
+    random.seed(0)
+    header, rows, dialects, countries = generate_export(args.questions, args.judgments, args.participants)
+    # the former implementation kept a list of skipped participants
+    skip_list = [f'skipped{i}' for i in range(50)]
+    print(f'{len(rows)} rows x {len(header)} columns')
+
+    before = measure('translations, per-cell list lookups', lambda: list_lookup_answers(
+        rows, *create_questionnaire_items(header), countries, dialects, skip_list))
+    after = measure('translations, compiled column plan', lambda: extract_answers(
+        rows, *create_questionnaire_items(header), countries, dialects, set(skip_list)))
+    print(f'speed-up: {before / after:.1f}x')
+
+    judgments, indices = get_judgment_items(header)
+    before = measure('judgments, per-row header parsing', lambda: list_lookup_responses(
+        header, rows, dialects, countries, indices, judgments, skip_list))
+    judgments, indices = get_judgment_items(header)
+    after = measure('judgments, compiled column plan', lambda: get_responses(
+        header, rows, dialects, countries, indices, judgments, set(skip_list)))
+    print(f'speed-up: {before / after:.1f}x')
+
+
+if __name__ == "__main__":
+    __main__()
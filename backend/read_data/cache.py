@@ -0,0 +1,74 @@
+from mima.settings import CACHE_PATH
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+## Increase this whenever a change to the readers changes their results, to invalidate all cached results
+PIPELINE_VERSION = 5
+
+_file_hashes = {}
+
+
+def file_hash(filepath):
+    ## Hash the content of a file; the hash is kept as long as the file isn't modified
+    stat = os.stat(filepath)
+    signature = (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+    try:
+        return _file_hashes[signature]
+    except KeyError:
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        _file_hashes[signature] = digest.hexdigest()
+        return _file_hashes[signature]
+
+
+def write_pickle(filepath, value):
+    directory = os.path.dirname(filepath)
+    os.makedirs(directory, exist_ok=True)
+    # write to a temporary file first, so concurrent workers never read a partial file
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(descriptor, 'wb') as file:
+        pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, filepath)
+
+
+class PipelineCache:
+    """On-disk cache of intermediate results, keyed by the content of their input files.
+
+    A stage is only computed again if one of its input files or the pipeline version changed.
+    Results are stored as pickles.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def key(self, stage, input_paths):
+        digest = hashlib.sha256()
+        for part in [str(PIPELINE_VERSION), stage] + [file_hash(path) for path in input_paths]:
+            digest.update(part.encode('utf8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def cached(self, stage, input_paths, compute):
+        ## Return the cached result of this stage for these input files, or compute and store it
+        if not self.directory:
+            return compute()
+
+        key = self.key(stage, input_paths)
+        filepath = os.path.join(self.directory, '{}-{}.pickle'.format(stage, key))
+        try:
+            with open(filepath, 'rb') as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            pass
+
+        result = compute()
+        write_pickle(filepath, result)
+        return result
+
+
+pipeline_cache = PipelineCache(CACHE_PATH)
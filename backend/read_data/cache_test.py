@@ -0,0 +1,76 @@
+import hashlib
+import os
+
+import cache
+from cache import PipelineCache, file_hash
+
+
+def write(filepath, content, mtime_ns):
+    with open(filepath, 'w', encoding='utf8') as file:
+        file.write(content)
+    # the hash is kept for the modification time, which may not change between quick writes
+    os.utime(filepath, ns=(mtime_ns, mtime_ns))
+
+
+class Compute:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {'result': self.calls}
+
+
+def test_file_hash(tmp_path):
+    filepath = str(tmp_path / 'data.csv')
+    write(filepath, 'a,b\n1,2\n', 10 ** 18)
+    assert file_hash(filepath) == hashlib.sha256(b'a,b\n1,2\n').hexdigest()
+    # the same content has the same hash, wherever it is
+    other_filepath = str(tmp_path / 'other.csv')
+    write(other_filepath, 'a,b\n1,2\n', 2 * 10 ** 18)
+    assert file_hash(other_filepath) == file_hash(filepath)
+    write(filepath, 'a,b\n1,3\n', 10 ** 18 + 1)
+    assert file_hash(filepath) == hashlib.sha256(b'a,b\n1,3\n').hexdigest()
+
+
+def test_cached(tmp_path, monkeypatch):
+    filepaths = [str(tmp_path / 'data.csv'), str(tmp_path / 'participants.csv')]
+    write(filepaths[0], 'data', 10 ** 18)
+    write(filepaths[1], 'participants', 10 ** 18)
+    pipeline = PipelineCache(str(tmp_path / 'cache'))
+    compute = Compute()
+    assert pipeline.cached('stage', filepaths, compute) == {'result': 1}
+    assert pipeline.cached('stage', filepaths, compute) == {'result': 1}
+    assert compute.calls == 1
+    assert len(os.listdir(str(tmp_path / 'cache'))) == 1
+    # another stage, or the same files in another order
+    assert pipeline.cached('other', filepaths, compute) == {'result': 2}
+    assert pipeline.cached('stage', filepaths[::-1], compute) == {'result': 3}
+
+    # computed again when an input changes, and cached again for its former content
+    write(filepaths[1], 'other participants', 10 ** 18 + 1)
+    assert pipeline.cached('stage', filepaths, compute) == {'result': 4}
+    assert pipeline.cached('stage', filepaths, compute) == {'result': 4}
+    write(filepaths[1], 'participants', 10 ** 18 + 2)
+    assert pipeline.cached('stage', filepaths, compute) == {'result': 1}
+    assert compute.calls == 4
+
+    # and for another version of the pipeline
+    monkeypatch.setattr(cache, 'PIPELINE_VERSION', cache.PIPELINE_VERSION + 1)
+    assert pipeline.cached('stage', filepaths, compute) == {'result': 5}
+    assert pipeline.cached('stage', filepaths, compute) == {'result': 5}
+    assert not [name for name in os.listdir(str(tmp_path / 'cache')) if name.endswith('.tmp')]
+
+
+def test_cached_disabled(tmp_path, monkeypatch):
+    # with CACHE_PATH = "" nothing is cached
+    pipeline = PipelineCache('')
+    filepath = str(tmp_path / 'data.csv')
+    write(filepath, 'data', 10 ** 18)
+    compute = Compute()
+    monkeypatch.chdir(tmp_path)
+    assert pipeline.cached('stage', [filepath], compute) == {'result': 1}
+    assert pipeline.cached('stage', [filepath], compute) == {'result': 2}
+    # the inputs are not even read
+    assert pipeline.cached('stage', [str(tmp_path / 'missing.csv')], compute) == {'result': 3}
+    assert os.listdir(str(tmp_path)) == ['data.csv']
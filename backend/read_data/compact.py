@@ -0,0 +1,107 @@
+"""
+Compact variant of cleaned_translation_questions.json.
+
+Instead of repeating the dialects, countries and participant ID in every answer,
+the participants are written once in a table and the dialect and country names
+once in a dictionary. The answers refer to them by their index:
+
+    {
+        "format": "compact",
+        "version": 2,
+        "names": ["Nederfrankisch", "Brabants", "Nederland", ...],
+        "participants": [[participant_id, [dialect name indices], [country name indices], [dialect node IDs]], ...],
+        "questions": {
+            tag: {...question fields..., "answers": [[participant index, answer], ...]}
+        }
+    }
+
+An answer with a tag different from its question is stored as [participant index, answer, tag].
+Version 1 has no dialect node IDs in the participants table.
+"""
+import json
+from dataclasses import fields
+
+COMPACT_FORMAT = 'compact'
+COMPACT_VERSION = 2
+
+
+def compact_questionnaires(questions):
+    ## questions: dict of tag -> Question, as written by read_questionnaire
+    names = {}
+    participants = {}
+
+    def name_indices(values):
+        return [names.setdefault(value, len(names)) for value in values]
+
+    def participant_index(answer):
+        key = (answer.participant_id, tuple(answer.dialect), tuple(answer.country), tuple(answer.dialect_ids))
+        try:
+            return participants[key]
+        except KeyError:
+            participants[key] = len(participants)
+            return participants[key]
+
+    compacted = {}
+    for tag, question in questions.items():
+        entry = {field.name: getattr(question, field.name) for field in fields(question) if field.name != 'answers'}
+        answers = []
+        for answer in question.answers:
+            compact_answer = [participant_index(answer), answer.answer]
+            if answer.tag != question.tag:
+                compact_answer.append(answer.tag)
+            answers.append(compact_answer)
+        entry['answers'] = answers
+        compacted[tag] = entry
+
+    participant_table = [
+        [participant_id, name_indices(dialect), name_indices(country), list(dialect_ids)]
+        for participant_id, dialect, country, dialect_ids in participants
+    ]
+    return {
+        'format': COMPACT_FORMAT,
+        'version': COMPACT_VERSION,
+        'names': list(names),
+        'participants': participant_table,
+        'questions': compacted
+    }
+
+
+def is_compact(data):
+    return isinstance(data, dict) and data.get('format') == COMPACT_FORMAT
+
+
+def expand_compact(data):
+    ## Expand the compact format to the same dictionaries as the regular output
+    if data['version'] not in (1, COMPACT_VERSION):
+        raise ValueError('Unsupported compact format version: {}'.format(data['version']))
+
+    names = data['names']
+    participants = [
+        (participant[0], [names[index] for index in participant[1]], [names[index] for index in participant[2]],
+         participant[3] if len(participant) > 3 else [])
+        for participant in data['participants']
+    ]
+
+    questions = {}
+    for tag, entry in data['questions'].items():
+        question = dict(entry)
+        answers = []
+        for compact_answer in entry['answers']:
+            participant_id, dialect, country, dialect_ids = participants[compact_answer[0]]
+            answers.append({
+                'tag': compact_answer[2] if len(compact_answer) > 2 else entry['tag'],
+                'answer': compact_answer[1],
+                'dialect': list(dialect),
+                'country': list(country),
+                'participant_id': participant_id,
+                'dialect_ids': list(dialect_ids)
+            })
+        question['answers'] = answers
+        questions[tag] = question
+    return questions
+
+
+def load_questionnaires(file):
+    ## Load cleaned_translation_questions.json in either format, as the regular dictionaries
+    data = json.load(file)
+    return expand_compact(data) if is_compact(data) else data
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from compact import COMPACT_VERSION, compact_questionnaires, expand_compact, is_compact, load_questionnaires
+from read_questionnaire import extract_questionnaires, write_questionnaires
+from records import Answer, Question
+
+
+def test_compact_round_trip(tmp_path, synthetic_sources):
+    # the compact file reads back as the same questions as the regular file
+    questionnaire = extract_questionnaires(synthetic_sources[:1], max_workers=1)[0]
+    regular_filepath = str(tmp_path / 'regular.json')
+    compact_filepath = str(tmp_path / 'compact.json')
+    write_questionnaires(questionnaire, regular_filepath)
+    write_questionnaires(questionnaire, compact_filepath, compact=True)
+    with open(regular_filepath) as file:
+        expected = load_questionnaires(file)
+    with open(compact_filepath) as file:
+        questions = load_questionnaires(file)
+    assert questions == expected
+    assert any(answer['dialect_ids'] for question in questions.values() for answer in question['answers'])
+
+
+def test_compact_questionnaires():
+    questions = {'D1Z1[SQ001]': Question('D1Z1[SQ001]', 3, 'Ik loop snel', answers=[
+        Answer('D1Z1[SQ001]', 'ik loop rap', ('Brabants',), ('Nederland',), '17', (3, 7)),
+        Answer('D1Z1', 'unattested', ('Kempisch', 'Brabants'), (), '18', ()),
+        Answer('D1Z1[SQ001]', 'ik loop rap', ('Brabants',), ('Nederland',), '17', (3, 7)),
+    ])}
+    compact = compact_questionnaires(questions)
+    assert is_compact(compact) and not is_compact({'D1Z1[SQ001]': {}})
+    assert (compact['version'], compact['names']) == (COMPACT_VERSION, ['Brabants', 'Nederland', 'Kempisch'])
+    assert compact['participants'] == [['17', [0], [1], [3, 7]], ['18', [2, 0], [], []]]
+    assert compact['questions']['D1Z1[SQ001]']['answers'] == [[0, 'ik loop rap'], [1, 'unattested', 'D1Z1'],
+                                                                [0, 'ik loop rap']]
+
+    # version 1 has no dialect node IDs
+    version_1 = dict(compact, version=1, participants=[participant[:3] for participant in compact['participants']])
+    assert [answer['dialect_ids'] for answer in expand_compact(version_1)['D1Z1[SQ001]']['answers']] == [[], [], []]
+    with pytest.raises(ValueError):
+        expand_compact(dict(compact, version=COMPACT_VERSION + 1))
+
+    expanded = expand_compact(json.loads(json.dumps(compact)))
+    assert expanded['D1Z1[SQ001]']['answers'][1] == {
+        'tag': 'D1Z1', 'answer': 'unattested', 'dialect': ['Kempisch', 'Brabants'], 'country': [],
+        'participant_id': '18', 'dialect_ids': []
+    }
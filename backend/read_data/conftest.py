@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from dialect_hierarchy import DialectHierarchy
+from records import JudgmentItem, Response
+from synthetic import generate
+
+
+@pytest.fixture(scope='session')
+def synthetic_sources(tmp_path_factory):
+    ## The (data, participants, additional data) paths of two synthetic questionnaire waves
+    return generate(str(tmp_path_factory.mktemp('synthetic')), scale=1, waves=2, seed=0)
+
+
+## A small dialect hierarchy, with a dialect under two parents
+DIALECT_TREE = {'Nederfrankisch': {'Brabants': {'Kempisch': {}}, 'Hollands': {}, 'Limburgs': {'Kempisch': {}}}, 'Fries': {}}
+
+
+@pytest.fixture
+def hierarchy():
+    return DialectHierarchy(DIALECT_TREE)
+
+
+@pytest.fixture
+def judgment_items(hierarchy):
+    ## Judgment items with the responses of 30 participants of random dialects, with missing and invalid scores
+    rng = random.Random(0)
+    participants = [('p{}'.format(index), tuple(rng.sample(range(len(hierarchy)), rng.randint(0, 2))))
+                    for index in range(30)]
+    items = {}
+    for index in range(8):
+        responses = [
+            Response(participant_id, (), (), rng.choice([1, 2, 3, 4, 5, '3', '5', None, '', 'x', 0, 6]), dialect_ids)
+            for participant_id, dialect_ids in rng.sample(participants, rng.randint(0, len(participants)))
+        ]
+        items['J{}[SQ001]'.format(index)] = JudgmentItem('main', 'J{}'.format(index), 'sub', 'SQ001', 'ST000', responses)
+    return items
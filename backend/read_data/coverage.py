@@ -0,0 +1,123 @@
+"""
+Which participants and dialects attested each translation question, as bitsets.
+
+Every participant and every node of the dialect hierarchy has a bit; the bitsets of a
+question are Python integers with the bits of the participants who gave an answer
+(other than 'unattested') and of their dialect nodes with all their ancestors.
+Questions like "which dialects attest X" or "which questions lack data for dialect Y"
+are then answered from the bitsets, without going through the answers.
+
+The coverage is written to coverage.json, with the bitsets as hexadecimal strings:
+
+    {
+        "format": "coverage",
+        "version": 1,
+        "dialects": [name of the dialect node of every bit],
+        "participants": [participant ID of every bit],
+        "questions": {tag: {"dialects": "1f0", "participants": "a3"}}
+    }
+"""
+import json
+from typing import Dict, List, Tuple
+
+COVERAGE_FORMAT = 'coverage'
+COVERAGE_VERSION = 1
+
+
+def bitset(indices, size):
+    ## An integer with the bits at these indices set; built as bytes, as setting the bits one
+    ## by one on an integer copies it every time
+    bits = bytearray((size + 7) // 8)
+    for index in indices:
+        bits[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bit_indices(value):
+    # the binary digits from the lowest bit up
+    return [index for index, digit in enumerate(bin(value)[:1:-1]) if digit == '1']
+
+
+class Coverage:
+    def __init__(self, dialects: List[str], participants: List[str], questions: Dict[str, Tuple[int, int]]):
+        self.dialects = dialects
+        self.participants = participants
+        self.questions = questions  # tag -> (dialect bitset, participant bitset)
+        self.dialect_ids = {name: index for index, name in enumerate(dialects)}
+
+    def attesting_dialects(self, tag) -> List[str]:
+        return [self.dialects[index] for index in bit_indices(self.questions[tag][0])]
+
+    def attesting_participants(self, tag) -> List[str]:
+        return [self.participants[index] for index in bit_indices(self.questions[tag][1])]
+
+    def attested_by(self, dialect) -> List[str]:
+        ## The questions answered by participants of this dialect (or one of its sub-dialects)
+        bit = 1 << self.dialect_ids[dialect]
+        return [tag for tag, (dialects, _) in self.questions.items() if dialects & bit]
+
+    def lacking(self, dialect) -> List[str]:
+        ## The questions without any answer from this dialect (or one of its sub-dialects)
+        bit = 1 << self.dialect_ids[dialect]
+        return [tag for tag, (dialects, _) in self.questions.items() if not dialects & bit]
+
+    def to_json(self):
+        return {
+            'format': COVERAGE_FORMAT,
+            'version': COVERAGE_VERSION,
+            'dialects': self.dialects,
+            'participants': self.participants,
+            'questions': {
+                tag: {'dialects': format(dialects, 'x'), 'participants': format(participants, 'x')}
+                for tag, (dialects, participants) in self.questions.items()
+            }
+        }
+
+    @staticmethod
+    def from_json(data) -> 'Coverage':
+        if data.get('format') != COVERAGE_FORMAT or data['version'] != COVERAGE_VERSION:
+            raise ValueError('Unsupported coverage format: {} {}'.format(data.get('format'), data.get('version')))
+        return Coverage(data['dialects'], data['participants'], {
+            tag: (int(bitsets['dialects'], 16), int(bitsets['participants'], 16))
+            for tag, bitsets in data['questions'].items()
+        })
+
+
+def build_coverage(questionnaires, hierarchy) -> Coverage:
+    ## questionnaires: dict of tag -> Question with the answers, hierarchy: DialectHierarchy the dialect_ids of the answers refer to
+    participant_ids = {}
+    dialect_masks = {}
+    questions = {}
+    answered = {}
+    for tag, question in questionnaires.items():
+        participants = answered[tag] = set()
+        dialects = 0
+        for answer in question.answers or []:
+            if answer.answer == 'unattested':
+                continue
+            try:
+                participant = participant_ids[answer.participant_id]
+            except KeyError:
+                participant = participant_ids[answer.participant_id] = len(participant_ids)
+            participants.add(participant)
+            try:
+                dialects |= dialect_masks[answer.dialect_ids]
+            except KeyError:
+                dialect_masks[answer.dialect_ids] = bitset(hierarchy.closure(tuple(answer.dialect_ids)), len(hierarchy))
+                dialects |= dialect_masks[answer.dialect_ids]
+        questions[tag] = dialects
+
+    return Coverage(list(hierarchy.names), list(participant_ids), {
+        tag: (dialects, bitset(answered[tag], len(participant_ids)))
+        for tag, dialects in questions.items()
+    })
+
+
+def write_coverage(coverage, filepath):
+    with open(filepath, 'w') as file:
+        json.dump(coverage.to_json(), file, separators=(',', ':'))
+
+
+def load_coverage(filepath) -> Coverage:
+    with open(filepath) as file:
+        return Coverage.from_json(json.load(file))
@@ -0,0 +1,106 @@
+import json
+import random
+
+import pytest
+
+from coverage import Coverage, bit_indices, bitset, build_coverage, load_coverage, write_coverage
+from dialect_hierarchy import DialectHierarchy
+from records import Answer, Question
+
+TREE = {'Nederfrankisch': {'Brabants': {'Kempisch': {}}, 'Hollands': {}, 'Limburgs': {'Kempisch': {}}}, 'Fries': {}}
+
+
+def question(tag, answers):
+    ## answers: (participant ID, answer, dialect IDs)
+    return Question(tag, 0, tag, answers=[
+        Answer(tag, answer, (), (), participant_id, dialect_ids) for participant_id, answer, dialect_ids in answers
+    ] if answers else None)
+
+
+def questionnaire(hierarchy):
+    ids = hierarchy.ids
+    return {
+        'Q1': question('Q1', [('p1', 'snel', (ids['Kempisch'],)), ('p2', 'unattested', (ids['Hollands'],))]),
+        'Q2': question('Q2', [('p2', 'rap', (ids['Hollands'],)), ('p2', 'vlug', (ids['Hollands'],))]),
+        'Q3': question('Q3', []),
+        'Q4': question('Q4', [('p3', 'gauw', (ids['Fries'], ids['Brabants'])), ('p1', 'snel', (ids['Kempisch'],)),
+                              ('p4', 'snel', ())]),
+    }
+
+
+def test_bitset():
+    assert bitset([0, 3, 9], 10) == 0b1000001001
+    assert bitset([], 0) == 0
+    rng = random.Random(0)
+    for _ in range(100):
+        size = rng.randint(1, 100)
+        indices = sorted(rng.sample(range(size), rng.randint(0, size)))
+        assert bit_indices(bitset(indices, size)) == indices
+        assert bitset(indices, size) == sum(1 << index for index in indices)
+
+
+def test_build_coverage():
+    hierarchy = DialectHierarchy(TREE)
+    coverage = build_coverage(questionnaire(hierarchy), hierarchy)
+    assert coverage.dialects == ['Nederfrankisch', 'Brabants', 'Kempisch', 'Hollands', 'Limburgs', 'Fries']
+    # only the participants with an attested answer, numbered in the order they are found
+    assert coverage.participants == ['p1', 'p2', 'p3', 'p4']
+    assert coverage.attesting_participants('Q1') == ['p1']
+    assert coverage.attesting_participants('Q4') == ['p1', 'p3', 'p4']
+    assert coverage.attesting_participants('Q3') == []
+    # the dialects with all the dialects above them
+    assert coverage.attesting_dialects('Q1') == ['Nederfrankisch', 'Brabants', 'Kempisch', 'Limburgs']
+    assert coverage.attesting_dialects('Q2') == ['Nederfrankisch', 'Hollands']
+    assert coverage.attesting_dialects('Q4') == ['Nederfrankisch', 'Brabants', 'Kempisch', 'Limburgs', 'Fries']
+    assert coverage.attested_by('Nederfrankisch') == ['Q1', 'Q2', 'Q4']
+    assert coverage.attested_by('Limburgs') == ['Q1', 'Q4']
+    assert coverage.lacking('Hollands') == ['Q1', 'Q3', 'Q4']
+    assert coverage.lacking('Fries') == ['Q1', 'Q2', 'Q3']
+    with pytest.raises(KeyError):
+        coverage.attested_by('Zeeuws')
+
+
+def test_build_coverage_random():
+    # the bitsets give the same dialects and participants as collecting them from the answers
+    hierarchy = DialectHierarchy(TREE)
+    rng = random.Random(0)
+    for _ in range(20):
+        questions = {}
+        for index in range(rng.randint(0, 30)):
+            tag = 'Q{}'.format(index)
+            questions[tag] = question(tag, [
+                ('p{}'.format(rng.randint(0, 20)), rng.choice(['snel', 'rap', 'unattested']),
+                 tuple(rng.sample(range(len(hierarchy)), rng.randint(0, 2))))
+                for _ in range(rng.randint(0, 10))
+            ])
+        coverage = build_coverage(questions, hierarchy)
+        names = {}
+        for tag, item in questions.items():
+            answers = [answer for answer in item.answers or [] if answer.answer != 'unattested']
+            nodes = hierarchy.closure(tuple(node for answer in answers for node in answer.dialect_ids))
+            names[tag] = [hierarchy.names[node] for node in nodes]
+            assert coverage.attesting_dialects(tag) == names[tag]
+            assert sorted(coverage.attesting_participants(tag)) == sorted({answer.participant_id for answer in answers})
+        for name in hierarchy.names:
+            assert coverage.attested_by(name) == [tag for tag in questions if name in names[tag]]
+            assert coverage.lacking(name) == [tag for tag in questions if name not in names[tag]]
+
+
+def test_coverage_json(tmp_path):
+    hierarchy = DialectHierarchy(TREE)
+    coverage = build_coverage(questionnaire(hierarchy), hierarchy)
+    filepath = str(tmp_path / 'coverage.json')
+    write_coverage(coverage, filepath)
+    with open(filepath) as file:
+        data = json.load(file)
+    assert (data['format'], data['version']) == ('coverage', 1)
+    assert data['questions']['Q2'] == {'dialects': '9', 'participants': '2'}
+    loaded = load_coverage(filepath)
+    assert (loaded.dialects, loaded.participants, loaded.questions) == \
+        (coverage.dialects, coverage.participants, coverage.questions)
+    assert loaded.attested_by('Limburgs') == ['Q1', 'Q4']
+
+    with pytest.raises(ValueError):
+        Coverage.from_json(dict(data, version=2))
+    with pytest.raises(ValueError):
+        Coverage.from_json({'version': 1})
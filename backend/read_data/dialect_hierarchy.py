@@ -0,0 +1,69 @@
+"""
+The dialect hierarchy written by organize_dialects.py (dialect_hierarchy.json) as numbered nodes.
+
+A dialect name occurring at several places in the hierarchy is a single node, with all
+those parents. The participants' dialects are mapped to the nodes of the hierarchy with
+all their ancestors, so aggregates per node include the participants of its sub-dialects.
+"""
+import json
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from mima.settings import DIALECT_HIERARCHY_PATH
+
+
+class DialectHierarchy:
+    def __init__(self, tree: dict):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.parents: List[List[int]] = []
+        self._ancestors: Dict[int, FrozenSet[int]] = {}
+        self._closures: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        self.add_children(tree, None)
+
+    def add_children(self, tree: dict, parent: Optional[int]):
+        for name, children in tree.items():
+            try:
+                node = self.ids[name]
+            except KeyError:
+                node = self.ids[name] = len(self.names)
+                self.names.append(name)
+                self.parents.append([])
+            if parent is not None and parent not in self.parents[node]:
+                self.parents[node].append(parent)
+            self.add_children(children, node)
+
+    def __len__(self):
+        return len(self.names)
+
+    def ancestors(self, node: int) -> FrozenSet[int]:
+        ## The node itself and all the nodes above it
+        try:
+            return self._ancestors[node]
+        except KeyError:
+            pass
+        found = {node}
+        pending = [node]
+        while pending:
+            for parent in self.parents[pending.pop()]:
+                if parent not in found:
+                    found.add(parent)
+                    pending.append(parent)
+        self._ancestors[node] = frozenset(found)
+        return self._ancestors[node]
+
+    def closure(self, nodes: Tuple[int, ...]) -> Tuple[int, ...]:
+        ## These nodes and their ancestors, each node once (e.g. the dialect_ids of an answer or response)
+        try:
+            return self._closures[nodes]
+        except KeyError:
+            pass
+        found = set()
+        for node in nodes:
+            found |= self.ancestors(node)
+        self._closures[nodes] = tuple(sorted(found))
+        return self._closures[nodes]
+
+
+def load_hierarchy(filepath=DIALECT_HIERARCHY_PATH) -> DialectHierarchy:
+    with open(filepath, encoding='utf8') as file:
+        return DialectHierarchy(json.load(file))
@@ -0,0 +1,115 @@
+"""
+Resolves the dialect names given by the participants to the nodes of the dialect hierarchy.
+
+The `[metadata:dialect]` cell of a participant is split into names, which are looked up
+by their normalized form (case, accents, punctuation and spacing ignored). A name which is
+not found that way is matched to the hierarchy name with the most trigrams in common, if
+they are similar enough; names which match nothing (e.g. countries) are left out.
+
+The node IDs are those of DialectHierarchy, so they refer to the same nodes as the
+Likert aggregates and the coverage bitsets. Every reader shares the resolver of a
+hierarchy file (see load_resolver), and each name is resolved only once.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from mima.settings import DIALECT_HIERARCHY_PATH
+from dialect_hierarchy import DialectHierarchy, load_hierarchy
+
+## separators between the (sub)dialects in the participants' metadata
+DIALECT_SEPARATORS = [';', '&', '+', ':']
+## minimal Dice coefficient of the trigrams of a name and a hierarchy name for a fuzzy match
+FUZZY_THRESHOLD = 0.7
+
+separator_pattern = re.compile('|'.join(map(re.escape, DIALECT_SEPARATORS)))
+
+
+def split_dialects(text: str) -> List[str]:
+    return [subdialect.strip() for subdialect in separator_pattern.split(text)]
+
+
+def normalize_name(name: str) -> str:
+    ## lowercase, without accents, and with every run of other characters than letters and digits as a single space
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(re.sub(r'[\W_]+', ' ', stripped.casefold()).split())
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = ' {} '.format(normalized)
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class DialectResolver:
+    def __init__(self, hierarchy: DialectHierarchy, threshold: float = FUZZY_THRESHOLD):
+        self.hierarchy = hierarchy
+        self.threshold = threshold
+        self.exact: Dict[str, int] = {}
+        self.index: Dict[str, List[int]] = {}  # trigram -> nodes with that trigram
+        self.sizes: List[int] = []  # number of trigrams of every node
+        self._resolved: Dict[str, Optional[int]] = {}
+        self._resolved_all: Dict[Tuple[str, ...], Tuple[int, ...]] = {}
+        for node, name in enumerate(hierarchy.names):
+            normalized = normalize_name(name)
+            self.exact.setdefault(normalized, node)
+            node_trigrams = trigrams(normalized)
+            self.sizes.append(len(node_trigrams))
+            for trigram in node_trigrams:
+                self.index.setdefault(trigram, []).append(node)
+
+    def fuzzy(self, normalized: str) -> Optional[int]:
+        ## The node sharing the most trigrams relative to their number (Dice coefficient), the first one on a tie
+        name_trigrams = trigrams(normalized)
+        shared: Dict[int, int] = {}
+        for trigram in name_trigrams:
+            for node in self.index.get(trigram, []):
+                shared[node] = shared.get(node, 0) + 1
+        best, best_score = None, self.threshold
+        for node, count in sorted(shared.items()):
+            score = 2 * count / (len(name_trigrams) + self.sizes[node])
+            if score > best_score or score == best_score and best is None:
+                best, best_score = node, score
+        return best
+
+    def resolve(self, name: str) -> Optional[int]:
+        try:
+            return self._resolved[name]
+        except KeyError:
+            pass
+        normalized = normalize_name(name)
+        node = self.exact.get(normalized)
+        if node is None and normalized:
+            node = self.fuzzy(normalized)
+        self._resolved[name] = node
+        return node
+
+    def resolve_all(self, names: Iterable[str]) -> Tuple[int, ...]:
+        ## The nodes of these names, each once and in the order of the names
+        names = tuple(names)
+        try:
+            return self._resolved_all[names]
+        except KeyError:
+            pass
+        nodes = []
+        for name in names:
+            node = self.resolve(name)
+            if node is not None and node not in nodes:
+                nodes.append(node)
+        self._resolved_all[names] = tuple(nodes)
+        return self._resolved_all[names]
+
+    def most_specific(self, nodes: Tuple[int, ...]) -> Tuple[int, ...]:
+        ## These nodes without the ones above another of them, e.g. Limburgs and Venlo give Venlo
+        return tuple(node for node in nodes
+                     if not any(other != node and node in self.hierarchy.ancestors(other) for other in nodes))
+
+    def names(self, nodes: Iterable[int]) -> List[str]:
+        return [self.hierarchy.names[node] for node in nodes]
+
+
+@lru_cache(maxsize=None)
+def load_resolver(filepath=DIALECT_HIERARCHY_PATH) -> DialectResolver:
+    ## one resolver per hierarchy file (and process)
+    return DialectResolver(load_hierarchy(filepath))
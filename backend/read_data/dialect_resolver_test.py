@@ -0,0 +1,99 @@
+import random
+
+from mima.settings import DIALECT_HIERARCHY_PATH
+from dialect_hierarchy import DialectHierarchy, load_hierarchy
+from dialect_resolver import FUZZY_THRESHOLD, DialectResolver, normalize_name, split_dialects, trigrams
+
+TREE = {
+    'Nederfrankisch': {
+        'Brabants': {'Noord-Brabants': {'Kempisch': {}}},
+        'Hollands': {'Zuid-Hollands': {}},
+        'Limburgs': {'Noord-Limburgs': {'Kempisch': {}}},
+    },
+    'Friese dialecten': {'Fries': {}},
+    'abcdefghij': {},
+}
+
+
+def reference_fuzzy(hierarchy, name, threshold=FUZZY_THRESHOLD):
+    ## The first node with the highest Dice coefficient of the trigrams, comparing the name with every node
+    name_trigrams = trigrams(normalize_name(name))
+    best, best_score = None, None
+    for node, node_name in enumerate(hierarchy.names):
+        node_trigrams = trigrams(normalize_name(node_name))
+        score = 2 * len(name_trigrams & node_trigrams) / (len(name_trigrams) + len(node_trigrams))
+        if score >= threshold and (best_score is None or score > best_score):
+            best, best_score = node, score
+    return best
+
+
+def test_split_dialects():
+    assert split_dialects('Nederland; Brabants & Hollands+Fries : Zuid-Hollands') == \
+        ['Nederland', 'Brabants', 'Hollands', 'Fries', 'Zuid-Hollands']
+    assert split_dialects('') == ['']
+
+
+def test_normalize_name():
+    assert normalize_name(' Zúid–HOLLANDS. ') == 'zuid hollands'
+    assert normalize_name('Noord_Brabants (Kempisch)') == 'noord brabants kempisch'
+    assert normalize_name('?!') == ''
+
+
+def test_resolve():
+    hierarchy = DialectHierarchy(TREE)
+    resolver = DialectResolver(hierarchy)
+    ids = hierarchy.ids
+    # exactly, and with another case, accents, punctuation or spacing
+    assert resolver.resolve('Brabants') == ids['Brabants']
+    assert resolver.resolve('noord  brabants') == resolver.resolve('NOORD-BRABANTS.') == ids['Noord-Brabants']
+    assert resolver.resolve('Bràbants') == ids['Brabants']
+    # a name given at several places in the hierarchy is a single node
+    assert resolver.resolve('Kempisch') == ids['Kempisch']
+    # the closest name with enough trigrams in common
+    assert resolver.resolve('Zuid-Hollandsch') == ids['Zuid-Hollands']
+    assert resolver.resolve('Friese dialect') == ids['Friese dialecten']
+    # and nothing for countries, unknown and empty names
+    assert resolver.resolve('Nederland') is None
+    assert resolver.resolve('Zeeuws') is None
+    assert resolver.resolve('') is None
+
+
+def test_fuzzy_threshold():
+    hierarchy = DialectHierarchy(TREE)
+    # 7 of the 10 trigrams of both names are shared, so the Dice coefficient is 0.7 exactly
+    assert FUZZY_THRESHOLD == 0.7
+    assert DialectResolver(hierarchy).resolve('abcdefghxy') == hierarchy.ids['abcdefghij']
+    # and 0.6 with 6 of them
+    assert DialectResolver(hierarchy).resolve('abcdefgxyz') is None
+    assert DialectResolver(hierarchy, threshold=0.6).resolve('abcdefgxyz') == hierarchy.ids['abcdefghij']
+    assert DialectResolver(hierarchy, threshold=0.71).resolve('abcdefghxy') is None
+
+
+def test_fuzzy():
+    # the trigram index finds the same node as comparing the name with every name of the hierarchy
+    hierarchy = load_hierarchy(DIALECT_HIERARCHY_PATH)
+    rng = random.Random(0)
+    for threshold in [FUZZY_THRESHOLD, 0.4]:
+        resolver = DialectResolver(hierarchy, threshold)
+        for _ in range(500):
+            name = list(normalize_name(rng.choice(hierarchy.names)))
+            for _ in range(rng.randint(0, 4)):
+                position = rng.randrange(len(name) + 1)
+                name[position:position + rng.randint(0, 1)] = rng.choice(['', 'e', 's', 'ch', ' '])
+            name = ''.join(name)
+            if normalize_name(name):
+                assert resolver.fuzzy(normalize_name(name)) == reference_fuzzy(hierarchy, name, threshold), name
+
+
+def test_resolve_all():
+    hierarchy = DialectHierarchy(TREE)
+    resolver = DialectResolver(hierarchy)
+    ids = hierarchy.ids
+    # each node once, in the order of the names
+    nodes = resolver.resolve_all(['Nederland', 'Hollands', 'Limburgs', 'hollands', 'Zeeuws', 'Noord-Limburgs'])
+    assert nodes == (ids['Hollands'], ids['Limburgs'], ids['Noord-Limburgs'])
+    assert resolver.resolve_all(('Nederland', 'Hollands', 'Limburgs', 'hollands', 'Zeeuws', 'Noord-Limburgs')) is nodes
+    assert resolver.names(resolver.most_specific(nodes)) == ['Hollands', 'Noord-Limburgs']
+    assert resolver.most_specific(resolver.resolve_all(['Nederfrankisch', 'Kempisch', 'Brabants'])) == \
+        (ids['Kempisch'],)
+    assert resolver.resolve_all([]) == resolver.most_specific(()) == ()
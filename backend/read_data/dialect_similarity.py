@@ -0,0 +1,140 @@
+"""
+Distances between the dialects of the dialect hierarchy, based on their Likert judgments.
+
+The scores become a participants x judgment items matrix, with NaN for missing scores.
+The profile of a dialect node is the mean score of its participants (including those
+of its sub-dialects) for every item. The distance between two dialects is the root mean
+square difference between their profiles, over the items both have scores for;
+dialects without enough items in common have no distance (NaN).
+
+The matrix is cached by the content of the input files and written to
+dialect_distances.npz, with the nearest neighbours of every dialect in dialect_neighbours.json.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from mima.settings import DIALECT_HIERARCHY_PATH, OUTPUT_PATH
+from cache import pipeline_cache
+from dialect_hierarchy import load_hierarchy
+from likert_aggregates import parse_score
+from read_questionnaire import QUESTIONNAIRE_SOURCES, merge_questionnaires, output_filepath, report_conflicts
+from read_likert import extract_likert_questionnaires
+
+NEIGHBOURS = 5
+
+
+def score_matrix(judgment_items):
+    ## Returns the participant IDs, the dialect IDs of every participant and their scores as a
+    ## (participants, items) matrix with NaN for missing scores
+    participant_ids = {}
+    dialects = []
+    rows = []
+    columns = []
+    scores = []
+    for item_index, judgment_item in enumerate(judgment_items.values()):
+        for response in judgment_item.responses:
+            score = parse_score(response.score)
+            try:
+                participant = participant_ids[response.participant_id]
+            except KeyError:
+                participant = participant_ids[response.participant_id] = len(participant_ids)
+                dialects.append(tuple(response.dialect_ids))
+            if score:
+                rows.append(participant)
+                columns.append(item_index)
+                scores.append(score)
+
+    matrix = np.full((len(participant_ids), len(judgment_items)), np.nan, dtype=np.float32)
+    matrix[np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64)] = scores
+    return list(participant_ids), dialects, matrix
+
+
+def dialect_profiles(matrix, dialects, hierarchy):
+    ## Mean score of every dialect node for every item, NaN if none of its participants gave one
+    membership = np.zeros((len(hierarchy), len(dialects)), dtype=np.float32)
+    for participant, participant_dialects in enumerate(dialects):
+        membership[list(hierarchy.closure(participant_dialects)), participant] = 1
+    answered = ~np.isnan(matrix)
+    sums = membership @ np.where(answered, matrix, 0)
+    counts = membership @ answered.astype(np.float32)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def dialect_distances(profiles, min_overlap=1):
+    ## Root mean square differences between all pairs of profiles over their common items, and the
+    ## number of common items; computed with matrix products instead of comparing every pair
+    present = (~np.isnan(profiles)).astype(np.float64)
+    values = np.where(present > 0, profiles, 0).astype(np.float64)
+    squares = values ** 2
+    overlaps = present @ present.T
+    # sum over the common items of (a - b)² = a² + b² - 2ab
+    differences = squares @ present.T + present @ squares.T - 2 * values @ values.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        distances = np.sqrt(np.maximum(differences, 0) / overlaps)
+    distances[overlaps < max(min_overlap, 1)] = np.nan
+    return distances, overlaps.astype(np.int32)
+
+
+def nearest_neighbours(names, distances, count=NEIGHBOURS):
+    ## {dialect: [[other dialect, distance], ...]}, closest first
+    ordered = np.where(np.isnan(distances), np.inf, distances)
+    np.fill_diagonal(ordered, np.inf)
+    neighbours = {}
+    for index, name in enumerate(names):
+        closest = np.argsort(ordered[index], kind='stable')[:count]
+        neighbours[name] = [
+            [names[other], round(float(distances[index, other]), 4)]
+            for other in closest if np.isfinite(ordered[index, other])
+        ]
+    return neighbours
+
+
+def compute_similarity(sources, hierarchy_path, min_overlap=1):
+    merged_judgment_items, conflicts = merge_questionnaires(*extract_likert_questionnaires(sources))
+    report_conflicts(conflicts)
+    hierarchy = load_hierarchy(hierarchy_path)
+    _, dialects, matrix = score_matrix(merged_judgment_items)
+    profiles = dialect_profiles(matrix, dialects, hierarchy)
+
+    # only the dialects with any scores
+    scored = np.flatnonzero((~np.isnan(profiles)).any(axis=1))
+    distances, overlaps = dialect_distances(profiles[scored], min_overlap)
+    return {
+        'names': np.array([hierarchy.names[node] for node in scored]),
+        'items': np.array(list(merged_judgment_items)),
+        'profiles': profiles[scored].astype(np.float32),
+        'distances': distances.astype(np.float32),
+        'overlaps': overlaps,
+    }
+
+
+def extract_similarity(sources, hierarchy_path=DIALECT_HIERARCHY_PATH, min_overlap=1):
+    input_paths = [path for source in sources for path in source[:2]] + [hierarchy_path]
+    return pipeline_cache.cached(
+        'dialect-similarity-{}'.format(min_overlap), input_paths,
+        lambda: compute_similarity(sources, hierarchy_path, min_overlap)
+    )
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--neighbours', type=int, default=NEIGHBOURS, help='number of nearest neighbours per dialect')
+    parser.add_argument('--min-overlap', type=int, default=1,
+                        help='minimum number of judgment items two dialects should both have scores for')
+    return parser.parse_args()
+
+
+def __main__():
+    args = parse_arguments()
+    similarity = extract_similarity(QUESTIONNAIRE_SOURCES, min_overlap=args.min_overlap)
+    np.savez_compressed(os.path.join(OUTPUT_PATH, 'dialect_distances.npz'), **similarity)
+    with open(output_filepath('dialect_neighbours'), 'w') as file:
+        json.dump(nearest_neighbours(list(similarity['names']), similarity['distances'], args.neighbours), file, indent=4)
+
+
+if __name__ == "__main__":
+    __main__()
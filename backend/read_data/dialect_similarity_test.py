@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+
+from dialect_similarity import dialect_distances, dialect_profiles, nearest_neighbours, score_matrix
+from likert_aggregates import parse_score
+
+
+def reference_profiles(judgment_items, hierarchy):
+    ## The mean valid score of the participants of every dialect node (and its sub-dialects) for every item
+    profiles = []
+    for node in range(len(hierarchy)):
+        profile = []
+        for judgment_item in judgment_items.values():
+            scores = [parse_score(response.score) for response in judgment_item.responses
+                      if node in hierarchy.closure(tuple(response.dialect_ids)) and parse_score(response.score)]
+            profile.append(sum(scores) / len(scores) if scores else math.nan)
+        profiles.append(profile)
+    return profiles
+
+
+def reference_distance(first, second):
+    ## The root mean square difference over the items both profiles have
+    differences = [(a - b) ** 2 for a, b in zip(first, second) if not math.isnan(a) and not math.isnan(b)]
+    return math.sqrt(sum(differences) / len(differences)) if differences else math.nan, len(differences)
+
+
+def test_score_matrix(judgment_items):
+    participants, dialects, matrix = score_matrix(judgment_items)
+    assert len(participants) == len(dialects) == matrix.shape[0] == len(set(participants))
+    for item_index, judgment_item in enumerate(judgment_items.values()):
+        for response in judgment_item.responses:
+            participant = participants.index(response.participant_id)
+            assert dialects[participant] == response.dialect_ids
+            score = parse_score(response.score)
+            assert (matrix[participant, item_index] == score) if score else np.isnan(matrix[participant, item_index])
+
+
+def test_dialect_distances(judgment_items, hierarchy):
+    # the same profiles and distances as computing them for every dialect and every pair of dialects
+    _, dialects, matrix = score_matrix(judgment_items)
+    profiles = dialect_profiles(matrix, dialects, hierarchy)
+    expected_profiles = reference_profiles(judgment_items, hierarchy)
+    assert np.allclose(profiles, expected_profiles, equal_nan=True)
+
+    for min_overlap in [1, 3, 8]:
+        distances, overlaps = dialect_distances(profiles, min_overlap)
+        for first in range(len(hierarchy)):
+            for second in range(len(hierarchy)):
+                distance, overlap = reference_distance(expected_profiles[first], expected_profiles[second])
+                assert overlaps[first, second] == overlap
+                if overlap < min_overlap:
+                    distance = math.nan
+                assert np.isclose(distances[first, second], distance, atol=1e-6, equal_nan=True)
+
+
+def test_nearest_neighbours():
+    nan = np.nan
+    distances = np.array([[0, 0.5, 0.2, nan], [0.5, 0, 0.5, nan], [0.2, 0.5, 0, nan], [nan, nan, nan, nan]])
+    assert nearest_neighbours(['a', 'b', 'c', 'd'], distances, 2) == {
+        'a': [['c', 0.2], ['b', 0.5]], 'b': [['a', 0.5], ['c', 0.5]], 'c': [['a', 0.2], ['b', 0.5]], 'd': []
+    }
@@ -0,0 +1,116 @@
+from mima.settings import DIALECT_HIERARCHY_PATH
+from cache import pipeline_cache
+from coverage import build_coverage, write_coverage
+from dialect_hierarchy import load_hierarchy
+from read_questionnaire import (
+    QUESTIONNAIRE_SOURCES,
+    add_answers,
+    collect_cleaned_translation_questions,
+    compile_translation_plan,
+    create_questionnaire_items,
+    enrich_translation_questions,
+    iter_csv,
+    map_questionnaires,
+    merge_questionnaires,
+    output_filepath,
+    parse_arguments,
+    read_participant_metadata,
+    report_conflicts,
+    write_outputs,
+)
+from records import intern
+from read_likert import (
+    add_responses,
+    compile_judgment_plan,
+    get_judgment_items,
+    renumber_sub_question_text_ids,
+    write_judgment_items,
+)
+
+
+class TranslationExtractor:
+    """Collects the answers to the translation questions (`[Vertaling]` and `CLEANED` columns)."""
+
+    def __init__(self, header):
+        self.questionnaire_items, translation_indices = create_questionnaire_items(header)
+        self.translation_plan = compile_translation_plan(self.questionnaire_items, translation_indices)
+
+    def add_row(self, row, participant_id, country, dialects, dialect_ids):
+        add_answers(row, participant_id, self.translation_plan, country, dialects, dialect_ids)
+
+    def result(self):
+        return collect_cleaned_translation_questions(self.questionnaire_items)
+
+
+class JudgmentExtractor:
+    """Collects the Likert responses to the judgment questions (`Invulzin` columns)."""
+
+    def __init__(self, header):
+        self.judgment_items, judgment_indices = get_judgment_items(header)
+        self.judgment_plan = compile_judgment_plan(header, judgment_indices, self.judgment_items)
+
+    def add_row(self, row, participant_id, country, dialects, dialect_ids):
+        add_responses(row, participant_id, dialects, country, self.judgment_plan, dialect_ids)
+
+    def result(self):
+        return self.judgment_items
+
+
+def extract_questionnaire(data_path, participants_path):
+    ## Read a questionnaire export once: the participants are resolved once per row
+    ## and every row is handed to both the translation and the judgment extractor
+    participant_countries, participant_dialects, skipped_participants, participant_dialect_ids = read_participant_metadata(participants_path)
+    rows = iter_csv(data_path)
+    header = next(rows)
+    translations = TranslationExtractor(header)
+    judgments = JudgmentExtractor(header)
+    extractors = [translations, judgments]
+
+    for row in rows:
+        participant_id = intern(''.join(row[0:2]))
+        if participant_id in skipped_participants:
+            continue
+        country = participant_countries[participant_id]
+        dialects = participant_dialects[participant_id]
+        dialect_ids = participant_dialect_ids[participant_id]
+        for extractor in extractors:
+            extractor.add_row(row, participant_id, country, dialects, dialect_ids)
+
+    return translations.result(), judgments.result()
+
+
+def ingest_questionnaire(data_path, participants_path, additional_data_path):
+    translation_questions, judgment_items = pipeline_cache.cached(
+        'ingest', [data_path, participants_path, DIALECT_HIERARCHY_PATH],
+        lambda: extract_questionnaire(data_path, participants_path))
+    translation_questions = enrich_translation_questions(translation_questions, iter_csv(additional_data_path))
+    return translation_questions, judgment_items
+
+
+def ingest_questionnaires(sources, max_workers=None):
+    ## Ingest any number of (data, participants, additional data) path triples in parallel;
+    ## returns the translation questions and the judgment items of each of them
+    results = map_questionnaires(ingest_questionnaire, sources, max_workers)
+    translation_questions = [translations for translations, _ in results]
+    judgment_items = renumber_sub_question_text_ids([judgments for _, judgments in results])
+    return translation_questions, judgment_items
+
+
+def __main__():
+    args = parse_arguments()
+    translation_questions, judgment_items = ingest_questionnaires(QUESTIONNAIRE_SOURCES)
+
+    merged_translation_questions, conflicts = merge_questionnaires(*translation_questions)
+    report_conflicts(conflicts)
+    write_outputs(merged_translation_questions, args)
+    # which dialects and participants answered each question, next to the translation questions
+    coverage = build_coverage(merged_translation_questions, load_hierarchy(DIALECT_HIERARCHY_PATH))
+    write_coverage(coverage, output_filepath('coverage'))
+
+    merged_judgment_items, conflicts = merge_questionnaires(*judgment_items)
+    report_conflicts(conflicts)
+    write_judgment_items(merged_judgment_items, output_filepath('likert_scales_test', args.ndjson), args.ndjson)
+
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,21 @@
+import pickle
+
+from ingest import ingest_questionnaires
+from read_likert import extract_likert_questionnaires
+from read_questionnaire import extract_questionnaires
+from records import Answer, Question
+
+
+def test_ingest_questionnaires(synthetic_sources):
+    # reading every export once gives the same questions and judgments as the two readers
+    translation_questions, judgment_items = ingest_questionnaires(synthetic_sources, max_workers=1)
+    assert translation_questions == extract_questionnaires(synthetic_sources, max_workers=1)
+    assert judgment_items == extract_likert_questionnaires(synthetic_sources, max_workers=1)
+    assert ingest_questionnaires(synthetic_sources, max_workers=2) == (translation_questions, judgment_items)
+
+
+def test_pickle_records():
+    answer = Answer('D1Z1[SQ001]', 'hij loopt', ('Brabants',), ('Nederland',), '10001', (1, 2))
+    question = Question('D1Z1[SQ001]', 3, 'Vertaal', answers=[answer])
+    assert pickle.loads(pickle.dumps(question)) == question
+    assert pickle.loads(pickle.dumps(answer)).dialect_ids == (1, 2)
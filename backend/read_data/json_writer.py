@@ -0,0 +1,74 @@
+import json
+
+
+class JsonWriter:
+    """Writes a JSON object or array to a file one entry at a time.
+
+    The output is the same as json.dump of the complete object or list with the same
+    indent, but only a single entry is encoded in memory at any time.
+    With ndjson=True every entry is written on a line of its own instead: the values of
+    an array as they are, the entries of an object as single-key objects.
+    """
+
+    def __init__(self, file, container=dict, default=None, indent=None, ndjson=False):
+        self.file = file
+        self.is_object = container is dict
+        self.default = default
+        self.indent = None if ndjson else indent
+        self.ndjson = ndjson
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def encode(self, value):
+        return json.dumps(value, default=self.default, indent=self.indent)
+
+    def write(self, value, key=None):
+        if self.is_object != (key is not None):
+            raise ValueError('Entries of an object need a key, entries of an array do not')
+
+        if self.ndjson:
+            self.file.write(self.encode({key: value} if self.is_object else value))
+            self.file.write('\n')
+            self.count += 1
+            return
+
+        if self.count == 0:
+            self.file.write('{' if self.is_object else '[')
+        else:
+            self.file.write(',' if self.indent is not None else ', ')
+
+        text = self.encode(value)
+        if self.indent is not None:
+            padding = ' ' * self.indent
+            self.file.write('\n' + padding)
+            text = text.replace('\n', '\n' + padding)
+        if self.is_object:
+            self.file.write(json.dumps(key) + ': ')
+        self.file.write(text)
+        self.count += 1
+
+    def close(self):
+        if self.ndjson:
+            return
+        if self.count == 0:
+            self.file.write('{' if self.is_object else '[')
+        elif self.indent is not None:
+            self.file.write('\n')
+        self.file.write('}' if self.is_object else ']')
+
+
+def write_json(filepath, entries, container=dict, default=None, indent=None, ndjson=False):
+    ## Write (key, value) pairs as a JSON object, or values as a JSON array
+    with open(filepath, 'w') as file:
+        with JsonWriter(file, container, default, indent, ndjson) as writer:
+            for entry in entries:
+                if container is dict:
+                    writer.write(entry[1], key=entry[0])
+                else:
+                    writer.write(entry)
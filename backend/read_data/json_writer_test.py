@@ -0,0 +1,79 @@
+import io
+import json
+
+import pytest
+
+from json_writer import JsonWriter, write_json
+from records import Answer, serialize_classes
+
+VALUES = [
+    {'tag': 'D1Z1[SQ001]', 'answers': [{'answer': 'hij lópt\nsnel', 'dialect': ['Brabants']}, {}], 'index': 3},
+    [],
+    {},
+    [1, 2.5, None, True, [[]]],
+    'zij "praat" zacht\\',
+    0,
+    None,
+    Answer('D1Z1[SQ001]', 'ik loop rap', ('Brabants',), ('Nederland',), '17', (3, 7)),
+]
+
+
+def encoded(container, entries, indent=None, ndjson=False):
+    file = io.StringIO()
+    with JsonWriter(file, container, default=serialize_classes, indent=indent, ndjson=ndjson) as writer:
+        for key, value in entries:
+            if container is dict:
+                writer.write(value, key=key)
+            else:
+                writer.write(value)
+    return file.getvalue()
+
+
+def dumped(value, indent=None):
+    file = io.StringIO()
+    json.dump(value, file, default=serialize_classes, indent=indent)
+    return file.getvalue()
+
+
+@pytest.mark.parametrize('indent', [None, 0, 2, 4])
+@pytest.mark.parametrize('count', [0, 1, 2, len(VALUES)])
+def test_json_writer(indent, count):
+    # the same output as json.dump of the whole object or list
+    entries = [('key {}'.format(index), value) for index, value in enumerate(VALUES[:count])]
+    assert encoded(dict, entries, indent) == dumped(dict(entries), indent)
+    assert encoded(list, entries, indent) == dumped([value for _, value in entries], indent)
+
+
+def test_json_writer_ndjson():
+    # a line for every entry, without the indent
+    entries = [('key {}'.format(index), value) for index, value in enumerate(VALUES)]
+    lines = encoded(dict, entries, indent=4, ndjson=True).splitlines()
+    assert lines == [json.dumps({key: value}, default=serialize_classes) for key, value in entries]
+    lines = encoded(list, entries, indent=4, ndjson=True).splitlines()
+    assert lines == [json.dumps(value, default=serialize_classes) for _, value in entries]
+    assert encoded(list, [], ndjson=True) == ''
+
+
+def test_json_writer_keys():
+    with pytest.raises(ValueError):
+        JsonWriter(io.StringIO(), dict).write(1)
+    with pytest.raises(ValueError):
+        JsonWriter(io.StringIO(), list).write(1, key='key')
+    # not closed after an error
+    file = io.StringIO()
+    with pytest.raises(KeyError):
+        with JsonWriter(file, list) as writer:
+            writer.write(1)
+            raise KeyError()
+    assert file.getvalue() == '[1'
+
+
+def test_write_json(tmp_path):
+    filepath = str(tmp_path / 'questions.json')
+    entries = [('key {}'.format(index), value) for index, value in enumerate(VALUES)]
+    write_json(filepath, entries, default=serialize_classes, indent=4)
+    with open(filepath) as file:
+        assert file.read() == dumped(dict(entries), 4)
+    write_json(filepath, (value for _, value in entries), list, default=serialize_classes, indent=2)
+    with open(filepath) as file:
+        assert file.read() == dumped([value for _, value in entries], 2)
@@ -0,0 +1,165 @@
+"""
+Lexical distances between the dialects of the dialect hierarchy, based on their translations.
+
+For every question, the distance between two dialects is the mean normalized edit distance
+(edit distance divided by the length of the longer answer) between the answers of their
+participants, including those of their sub-dialects. The distance between two dialects is
+the mean over all questions both have answers for. The distance of a dialect to itself is
+the variation between its own answers.
+
+The translations of an answer (separated by |) are separate answers. They are normalized
+(lowercase, no periods, single spaces) and every distinct translation of a question is
+compared with every other one only once, in chunks of answers so the memory does not grow
+with the square of the number of distinct answers. The distances per dialect pair then follow
+from a product with the answer frequencies of the dialects.
+
+The matrix is cached by the content of the input files and written to
+lexical_distances.npz, with the nearest neighbours of every dialect in lexical_neighbours.json.
+"""
+import argparse
+import json
+import os
+
+import editdistance
+import numpy as np
+
+from mima.settings import DIALECT_HIERARCHY_PATH, OUTPUT_PATH
+from cache import pipeline_cache
+from dialect_hierarchy import load_hierarchy
+from dialect_similarity import NEIGHBOURS, nearest_neighbours
+from read_questionnaire import (
+    QUESTIONNAIRE_SOURCES,
+    extract_questionnaires,
+    merge_questionnaires,
+    output_filepath,
+    remove_periods,
+    report_conflicts,
+)
+
+## number of distinct answers to a question whose distances to the other answers are computed at once
+DISTANCE_CHUNK_SIZE = 256
+
+
+def normalize_answer(answer):
+    return ' '.join(remove_periods(answer).lower().split())
+
+
+def answer_translations(answer):
+    ## The distinct normalized translations of an answer (separated by |), without unattested and empty ones
+    return list(dict.fromkeys(
+        text for text in (normalize_answer(example) for example in answer.split('|') if example != 'unattested') if text
+    ))
+
+
+def answer_distances(answers, start, stop):
+    ## Normalized edit distances from the answers start:stop to the answers from start on, as a
+    ## (stop - start, len(answers) - start) matrix; only those to later answers are computed, the others are zero,
+    ## so every pair is computed once
+    distances = np.zeros((stop - start, len(answers) - start), dtype=np.float32)
+    rows, columns = np.triu_indices(stop - start, 1, len(answers) - start)
+    first, second = rows + start, columns + start
+    lengths = np.array([len(answer) for answer in answers], dtype=np.float32)
+    row = np.fromiter(
+        map(editdistance.eval, (answers[index] for index in first), (answers[index] for index in second)),
+        dtype=np.float32, count=len(first))
+    row /= np.maximum(np.maximum(lengths[first], lengths[second]), 1)
+    distances[rows, columns] = row
+    return distances
+
+
+def weighted_distances(answers, frequencies, chunk_size=DISTANCE_CHUNK_SIZE):
+    ## The mean distances between the answers of every pair of dialects (frequencies @ distances @ frequencies.T),
+    ## computing the distances chunk_size answers at a time, so they take memory linear in the number of answers
+    upper = np.zeros((len(frequencies), len(frequencies)), dtype=np.float64)
+    for start in range(0, len(answers), chunk_size):
+        stop = min(start + chunk_size, len(answers))
+        upper += frequencies[:, start:stop] @ answer_distances(answers, start, stop) @ frequencies[:, start:].T
+    # the distances are symmetric, and only those to later answers were computed
+    return upper + upper.T
+
+
+def answer_counts(question, hierarchy):
+    ## The distinct normalized translations of the answers to a question and how often each dialect node gave them,
+    ## as a (nodes, answers) matrix; every translation of an answer counts as a separate answer
+    answers = {}
+    nodes = []
+    columns = []
+    translated = {}  # many participants give the same answer
+    for answer in question.answers or []:
+        try:
+            translations = translated[answer.answer]
+        except KeyError:
+            translations = translated[answer.answer] = answer_translations(answer.answer)
+        if not translations:
+            continue
+        dialect_nodes = hierarchy.closure(tuple(answer.dialect_ids))
+        for text in translations:
+            column = answers.setdefault(text, len(answers))
+            nodes.extend(dialect_nodes)
+            columns.extend([column] * len(dialect_nodes))
+
+    counts = np.zeros((len(hierarchy), len(answers)), dtype=np.float64)
+    np.add.at(counts, (np.array(nodes, dtype=np.int64), np.array(columns, dtype=np.int64)), 1)
+    return list(answers), counts
+
+
+def lexical_distances(questionnaires, hierarchy, chunk_size=DISTANCE_CHUNK_SIZE):
+    ## Returns the mean distances between all dialect nodes, and for how many questions both had answers
+    node_count = len(hierarchy)
+    totals = np.zeros((node_count, node_count), dtype=np.float64)
+    overlaps = np.zeros((node_count, node_count), dtype=np.int32)
+    for question in questionnaires.values():
+        answers, counts = answer_counts(question, hierarchy)
+        nodes = np.flatnonzero(counts.sum(axis=1))
+        if not len(nodes):
+            continue
+        # the share of every answer within the answers of a dialect
+        frequencies = counts[nodes] / counts[nodes].sum(axis=1, keepdims=True)
+        pairs = np.ix_(nodes, nodes)
+        totals[pairs] += weighted_distances(answers, frequencies, chunk_size)
+        overlaps[pairs] += 1
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        distances = np.where(overlaps > 0, totals / overlaps, np.nan)
+    return distances, overlaps
+
+
+def compute_lexical_distances(sources, hierarchy_path):
+    merged_questionnaires, conflicts = merge_questionnaires(*extract_questionnaires(sources))
+    report_conflicts(conflicts)
+    hierarchy = load_hierarchy(hierarchy_path)
+    distances, overlaps = lexical_distances(merged_questionnaires, hierarchy)
+
+    # only the dialects with any answers
+    answered = np.flatnonzero(overlaps.diagonal())
+    return {
+        'names': np.array([hierarchy.names[node] for node in answered]),
+        'distances': distances[np.ix_(answered, answered)].astype(np.float32),
+        'overlaps': overlaps[np.ix_(answered, answered)],
+    }
+
+
+def extract_lexical_distances(sources, hierarchy_path=DIALECT_HIERARCHY_PATH):
+    input_paths = [path for source in sources for path in source] + [hierarchy_path]
+    return pipeline_cache.cached(
+        'lexical-distances', input_paths,
+        lambda: compute_lexical_distances(sources, hierarchy_path)
+    )
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--neighbours', type=int, default=NEIGHBOURS, help='number of nearest neighbours per dialect')
+    return parser.parse_args()
+
+
+def __main__():
+    args = parse_arguments()
+    lexical = extract_lexical_distances(QUESTIONNAIRE_SOURCES)
+    np.savez_compressed(os.path.join(OUTPUT_PATH, 'lexical_distances.npz'), **lexical)
+    with open(output_filepath('lexical_neighbours'), 'w') as file:
+        json.dump(nearest_neighbours(list(lexical['names']), lexical['distances'], args.neighbours), file, indent=4)
+
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,79 @@
+import random
+
+import editdistance
+import numpy as np
+
+from dialect_hierarchy import DialectHierarchy
+from lexical_distances import answer_translations, lexical_distances, weighted_distances
+from records import Answer, Question
+
+TREE = {'Nederfrankisch': {'Brabants': {'Kempisch': {}}, 'Hollands': {}, 'Limburgs': {'Kempisch': {}}}, 'Fries': {}}
+WORDS = ['snel', 'snelle', 'rap', 'rapper', 'vlug', 'gauw', 'zacht', 'zachjes', 'hard', '']
+
+
+def distance(first, second):
+    return editdistance.eval(first, second) / max(len(first), len(second), 1)
+
+
+def reference_distances(questionnaires, hierarchy):
+    ## For every question and pair of dialects, the mean distance between every answer of one and every answer of
+    ## the other, and then the mean over the questions
+    totals = np.zeros((len(hierarchy), len(hierarchy)))
+    overlaps = np.zeros((len(hierarchy), len(hierarchy)), dtype=np.int32)
+    for question in questionnaires.values():
+        texts = {}
+        for answer in question.answers or []:
+            for text in answer_translations(answer.answer):
+                for node in hierarchy.closure(tuple(answer.dialect_ids)):
+                    texts.setdefault(node, []).append(text)
+        for first, first_texts in texts.items():
+            for second, second_texts in texts.items():
+                totals[first, second] += np.mean([distance(a, b) for a in first_texts for b in second_texts])
+                overlaps[first, second] += 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(overlaps > 0, totals / overlaps, np.nan), overlaps
+
+
+def random_answer(rng):
+    return '|'.join(
+        rng.choice(['unattested', 'Hij loopt {}.'.format(rng.choice(WORDS)), 'hij  LOOPT {}'.format(rng.choice(WORDS))])
+        for _ in range(rng.choice([1, 1, 2]))
+    )
+
+
+def test_answer_translations():
+    assert answer_translations('Hij loopt snel.|hij  loopt SNEL|unattested|  |Hij rent') == \
+        ['hij loopt snel', 'hij rent']
+    assert answer_translations('unattested') == []
+
+
+def test_weighted_distances():
+    # in chunks, the distances are the same as those between every pair of answers
+    rng = random.Random(0)
+    answers = list(dict.fromkeys(''.join(rng.choice('abcde') for _ in range(rng.randint(0, 8))) for _ in range(60)))
+    frequencies = np.array([[rng.random() for _ in answers] for _ in range(4)])
+    pairwise = np.array([[distance(first, second) for second in answers] for first in answers])
+    expected = frequencies @ pairwise @ frequencies.T
+    for chunk_size in [1, 7, len(answers), 1000]:
+        assert np.allclose(weighted_distances(answers, frequencies, chunk_size), expected)
+    assert weighted_distances([], np.zeros((0, 0))).shape == (0, 0)
+
+
+def test_lexical_distances():
+    hierarchy = DialectHierarchy(TREE)
+    rng = random.Random(0)
+    questionnaires = {}
+    for index in range(15):
+        tag = 'Q{}'.format(index)
+        questionnaires[tag] = Question(tag, index, tag, answers=[
+            Answer(tag, random_answer(rng), (), (), 'p{}'.format(participant),
+                   tuple(rng.sample(range(len(hierarchy)), rng.randint(0, 2))))
+            for participant in range(rng.randint(0, 12))
+        ])
+    expected_distances, expected_overlaps = reference_distances(questionnaires, hierarchy)
+    assert expected_overlaps.any()
+    for chunk_size in [1, 3, 256]:
+        distances, overlaps = lexical_distances(questionnaires, hierarchy, chunk_size)
+        assert (overlaps == expected_overlaps).all()
+        assert np.allclose(distances, expected_distances, equal_nan=True)
+        assert np.allclose(distances, distances.T, equal_nan=True)
@@ -0,0 +1,151 @@
+"""
+Aggregates the Likert judgments per dialect of the dialect hierarchy, so summary views
+don't need the raw responses.
+
+For every judgment item the scores are counted per dialect node, including the
+participants of all its sub-dialects, and for all participants together:
+
+    {
+        "format": "likert-aggregates",
+        "version": 1,
+        "scale": 5,
+        "dialects": [name of every node],
+        "parents": [[parent node indices] of every node],
+        "items": {
+            judgment item key: {
+                "all": [responses, mean, [count of score 1, ..., count of score 5], missing],
+                "dialects": [[node index, responses, mean, [count of score 1, ..., count of score 5]], ...]
+            }
+        }
+    }
+
+Responses without a (valid) score are counted as missing and left out of the means.
+Only the nodes with responses for an item are listed.
+"""
+import json
+
+import numpy as np
+
+from mima.settings import DIALECT_HIERARCHY_PATH
+from dialect_hierarchy import load_hierarchy
+from read_questionnaire import QUESTIONNAIRE_SOURCES, merge_questionnaires, output_filepath, report_conflicts
+from read_likert import extract_likert_questionnaires
+
+AGGREGATES_FORMAT = 'likert-aggregates'
+AGGREGATES_VERSION = 1
+LIKERT_SCALE = 5
+
+
+def parse_score(score):
+    ## the score as a number on the scale, or 0 if it is missing or invalid
+    try:
+        value = int(score)
+    except (TypeError, ValueError):
+        return 0
+    return value if 1 <= value <= LIKERT_SCALE else 0
+
+
+def response_arrays(judgment_items, hierarchy):
+    ## Flatten the responses to typed arrays: the item, participant and score of every response,
+    ## and the dialect nodes of every participant in compressed form (offsets into a single array of nodes)
+    items = []
+    participants = []
+    scores = []
+    participant_ids = {}
+    node_offsets = [0]
+    nodes = []
+    for item_index, judgment_item in enumerate(judgment_items.values()):
+        for response in judgment_item.responses:
+            try:
+                participant = participant_ids[response.participant_id]
+            except KeyError:
+                participant = participant_ids[response.participant_id] = len(participant_ids)
+                nodes.extend(hierarchy.closure(tuple(response.dialect_ids)))
+                node_offsets.append(len(nodes))
+            items.append(item_index)
+            participants.append(participant)
+            scores.append(parse_score(response.score))
+    return (
+        np.array(items, dtype=np.int32),
+        np.array(participants, dtype=np.int32),
+        np.array(scores, dtype=np.int8),
+        np.array(node_offsets, dtype=np.int64),
+        np.array(nodes, dtype=np.int32),
+    )
+
+
+def count_scores(judgment_items, hierarchy):
+    ## Returns the counts of every score (0 = missing) per item: for all participants,
+    ## an array of (items, scale + 1); and per dialect node, an array of (items, nodes, scale + 1)
+    items, participants, scores, node_offsets, nodes = response_arrays(judgment_items, hierarchy)
+    item_count = len(judgment_items)
+    node_count = len(hierarchy)
+    bins = LIKERT_SCALE + 1
+
+    totals = np.bincount(items * bins + scores, minlength=item_count * bins).reshape(item_count, bins)
+
+    # repeat every response for each of the nodes its participant belongs to
+    starts = node_offsets[participants]
+    lengths = node_offsets[participants + 1] - starts
+    response_indices = np.repeat(np.arange(len(items)), lengths)
+    positions = np.arange(len(response_indices)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    response_nodes = nodes[starts[response_indices] + positions]
+    per_node = np.bincount(
+        (items[response_indices].astype(np.int64) * node_count + response_nodes) * bins + scores[response_indices],
+        minlength=item_count * node_count * bins
+    ).reshape(item_count, node_count, bins)
+    return totals, per_node
+
+
+def means(counts):
+    ## mean score of histograms of (..., scale + 1) counts, NaN without any valid score
+    valid = counts[..., 1:]
+    responses = valid.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (valid * np.arange(1, LIKERT_SCALE + 1)).sum(axis=-1) / responses
+
+
+def summary(responses, mean, histogram):
+    return [int(responses), None if np.isnan(mean) else round(float(mean), 3), histogram.tolist()]
+
+
+def aggregate_judgments(judgment_items, hierarchy):
+    totals, per_node = count_scores(judgment_items, hierarchy)
+    total_means = means(totals)
+    node_means = means(per_node)
+    node_responses = per_node[..., 1:].sum(axis=-1)
+
+    items = {}
+    for item_index, key in enumerate(judgment_items):
+        histogram = totals[item_index, 1:]
+        items[key] = {
+            'all': summary(histogram.sum(), total_means[item_index], histogram) + [int(totals[item_index, 0])],
+            'dialects': [
+                [int(node)] + summary(node_responses[item_index, node], node_means[item_index, node], per_node[item_index, node, 1:])
+                for node in np.flatnonzero(node_responses[item_index])
+            ]
+        }
+    return {
+        'format': AGGREGATES_FORMAT,
+        'version': AGGREGATES_VERSION,
+        'scale': LIKERT_SCALE,
+        'dialects': hierarchy.names,
+        'parents': hierarchy.parents,
+        'items': items
+    }
+
+
+def write_aggregates(aggregates, filepath):
+    with open(filepath, 'w') as file:
+        json.dump(aggregates, file, separators=(',', ':'))
+
+
+def __main__():
+    merged_judgment_items, conflicts = merge_questionnaires(*extract_likert_questionnaires(QUESTIONNAIRE_SOURCES))
+    report_conflicts(conflicts)
+    aggregates = aggregate_judgments(merged_judgment_items, load_hierarchy(DIALECT_HIERARCHY_PATH))
+    write_aggregates(aggregates, output_filepath('likert_aggregates'))
+
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,59 @@
+import json
+
+from likert_aggregates import LIKERT_SCALE, aggregate_judgments, parse_score, write_aggregates
+from records import JudgmentItem, Response
+
+
+def reference_summary(scores):
+    ## [responses, mean, [count of every score]] of the valid scores
+    valid = [score for score in scores if score]
+    histogram = [valid.count(score) for score in range(1, LIKERT_SCALE + 1)]
+    return [len(valid), round(sum(valid) / len(valid), 3) if valid else None, histogram]
+
+
+def test_parse_score():
+    assert [parse_score(score) for score in [1, '5', ' 3', None, '', 'x', 0, 6, '2.5', -1]] == \
+        [1, 5, 3, 0, 0, 0, 0, 0, 0, 0]
+
+
+def test_aggregate_judgments(hierarchy):
+    item = JudgmentItem('main', 'J1', 'sub', 'SQ001', 'ST000', [
+        Response('p1', (), (), 4, (hierarchy.ids['Kempisch'],)),
+        Response('p2', (), (), '2', (hierarchy.ids['Hollands'],)),
+        Response('p3', (), (), None, (hierarchy.ids['Hollands'],)),
+        Response('p4', (), (), 5, ()),
+    ])
+    aggregates = aggregate_judgments({'J1[SQ001]': item}, hierarchy)
+    assert (aggregates['format'], aggregates['version'], aggregates['scale']) == ('likert-aggregates', 1, 5)
+    assert aggregates['dialects'] == ['Nederfrankisch', 'Brabants', 'Kempisch', 'Hollands', 'Limburgs', 'Fries']
+    assert aggregates['parents'] == [[], [0], [1, 4], [0], [0], []]
+    assert aggregates['items'] == {'J1[SQ001]': {
+        'all': [3, 3.667, [0, 1, 0, 1, 1], 1],
+        # Kempisch counts for both its parents, and Nederfrankisch once
+        'dialects': [[0, 2, 3.0, [0, 1, 0, 1, 0]], [1, 1, 4.0, [0, 0, 0, 1, 0]], [2, 1, 4.0, [0, 0, 0, 1, 0]],
+                     [3, 1, 2.0, [0, 1, 0, 0, 0]], [4, 1, 4.0, [0, 0, 0, 1, 0]]],
+    }}
+
+
+def test_aggregate_judgments_counts(hierarchy, judgment_items):
+    # the same counts as going through the responses of the participants of every dialect
+    aggregates = aggregate_judgments(judgment_items, hierarchy)
+    assert list(aggregates['items']) == list(judgment_items)
+    for key, judgment_item in judgment_items.items():
+        scores = [parse_score(response.score) for response in judgment_item.responses]
+        assert aggregates['items'][key]['all'] == reference_summary(scores) + [scores.count(0)]
+        expected = []
+        for node in range(len(hierarchy)):
+            node_scores = [parse_score(response.score) for response in judgment_item.responses
+                           if node in hierarchy.closure(tuple(response.dialect_ids))]
+            if any(node_scores):
+                expected.append([node] + reference_summary(node_scores))
+        assert aggregates['items'][key]['dialects'] == expected
+
+
+def test_write_aggregates(tmp_path, hierarchy, judgment_items):
+    aggregates = aggregate_judgments(judgment_items, hierarchy)
+    filepath = str(tmp_path / 'likert_aggregates.json')
+    write_aggregates(aggregates, filepath)
+    with open(filepath) as file:
+        assert json.load(file) == aggregates
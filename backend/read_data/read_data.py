@@ -1,40 +1,19 @@
+import argparse
 import csv
 import re
 import os
-import editdistance
-import json
-
-from mima.settings import DATA_PATH, PARTICIPANTS_PATH, OUTPUT_PATH
-
-class Question():
-    def __init__(self, tag, index, question, type='NA', prompt='NA', cleaned=False, answers=None):
-        self.tag = tag
-        self.index = index
-        self.question = question
-        self.type = type
-        self.prompt = prompt
-        self.cleaned = cleaned
-        self.answers = answers
-
-    def __str__(self) -> str:
-        return 'Question {}: {}'.format(self.tag, self.question)
-
-class Answer:
-    def __init__(self, tag, prompt, answer, dialect, participant_id, ma='NA', prompt_ma='NA'):
-        self.tag = tag
-        self.prompt = prompt
-        self.answer = answer
-        self.dialect = dialect
-        self.participant_id = participant_id
-        self.ma = ma
-        self.prompt_ma = prompt_ma
-
-class Dialect():
-    def __init__(self, dialect, n_speakers = 0, translations={}):
-        self.dialect = dialect
-        self.n_speakers = n_speakers
-        self.translations = translations
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 
+from mima.settings import DATA_PATH, PARTICIPANTS_PATH, OUTPUT_PATH, CACHE_PATH
+from alignment import AlignmentCache, align
+from cache import pipeline_cache
+from dialect_resolver import load_resolver, split_dialects
+from json_writer import JsonWriter
+from records import Question, TranslationAnswer, intern
+
+## number of translations sent to a worker at once when detecting the MAs
+DETECTION_CHUNK_SIZE = 5000
 
 def read_csv(filepath):
     data = []
@@ -51,171 +30,211 @@ def remove_periods(text):
     stripped_text = text.translate(translator)
     return stripped_text
 
-data = read_csv(DATA_PATH)
-participants_data = read_csv(PARTICIPANTS_PATH)
+def read_csv_cached(filepath):
+    return pipeline_cache.cached('csv', [filepath], lambda: read_csv(filepath))
+
+
+def match_participant_dialects(participants_data, resolver=None):
+    ## Match dialects to participant IDs, and the nodes of the dialect hierarchy (if a DialectResolver is given),
+    ## from the [metadata:dialect] column, or the dialect place if there is no such column
+    ## With a resolver, the dialect is named after the most specific of those nodes
+    participants = {}
+    participant_dialect_ids = {}
+    header = participants_data[0]
+    metadata_index = header.index('[metadata:dialect]') if '[metadata:dialect]' in header else None
+
+    for participant in participants_data[1:]:
+        participant_id = intern(''.join(participant[0:2]))
+        if resolver:
+            names = split_dialects(participant[metadata_index]) if metadata_index is not None else participant[30:31]
+            nodes = participant_dialect_ids[participant_id] = intern(resolver.resolve_all(names))
+            dialect = ' + '.join(resolver.names(resolver.most_specific(nodes))) or 'Geen Dialect'
+        elif participant[29] == 'Het dialect van …':
+            dialect = ' '.join(participant[29:31])
+        elif participant[29] == '':
+            dialect = 'Geen Dialect'
+        else:
+            dialect = participant[29]
+        participants[participant_id] = intern(dialect)
+    return participants, participant_dialect_ids
+
+
+def create_question_items(header):
+    ## Create a Question for each question and save it as an instance
+    q_items = {} #keys: question index
+
+    for index, cell in enumerate(header):
+        first_word = cell.split()[0]
+        if first_word == 'CLEANED':
+            questionnaire_item = Question(
+                tag = cell.split()[1],
+                index = index,
+                question = remove_periods(' '.join(cell.split()[2:])),
+                type = 'Translation',
+                cleaned = True
+            )
+        elif cell.endswith('[Vertaling]') and first_word not in ['COMMENT', 'DEVIATION']:
+            questionnaire_item = Question(
+                tag = first_word,
+                index = index,
+                question = remove_periods(' '.join(cell.split()[1:])),
+                type = 'Translation'
+            )
+        else:
+            questionnaire_item = Question(
+                tag = first_word,
+                index = index,
+                question = remove_periods(' '.join(cell.split()[1:]))
+            )
+
+        q_items[questionnaire_item.index] = questionnaire_item
+
+    ## Find the translations in the questionnaire
+    ## Save the indices of those questions
+    translation_indices = []  # indices of translation questions
+    for item in q_items:
+        if q_items[item].type == 'Translation':
+            translation_indices.append(q_items[item].index)
+
+    print('N of questions: {}\nN of translation questions: {}'.format(len(q_items), len(translation_indices)))
+
+    prompt_pattern = r'\[(.*?)\]'
+    for ti in translation_indices:
+        match = re.search(prompt_pattern, q_items[ti].question)
+        if match:
+            q_items[ti].prompt = match.group(1)
+        else:
+            q_items[ti].prompt = 'No prompt found'
 
-## Match dialects to participant IDs
-participants = {}
+    return q_items, translation_indices
 
-for participant in participants_data[1:]:
-    if participant[29] == 'Het dialect van …':
-        dialect = ' '.join(participant[29:31])
-    elif participant[29] == '':
-        dialect = 'Geen Dialect'
-    else:
-        dialect = participant[29]
-    participants[''.join(participant[0:2])] = dialect
-
-## Create a Question for each question and save it as an instance
-q_items = {} #keys: question index
-
-for index, cell in enumerate(data[0]):
-    first_word = cell.split()[0]
-    if first_word == 'CLEANED':
-        questionnaire_item = Question(
-            tag = cell.split()[1],
-            index = index,
-            question = remove_periods(' '.join(cell.split()[2:])),
-            type = 'Translation',
-            cleaned = True
-        )
-    elif cell.endswith('[Vertaling]') and first_word not in ['COMMENT', 'DEVIATION']:
-        questionnaire_item = Question(
-            tag = first_word,
-            index = index,
-            question = remove_periods(' '.join(cell.split()[1:])),
-            type = 'Translation'
-        )
-    else:
-        questionnaire_item = Question(
-            tag = first_word,
-            index = index,
-            question = remove_periods(' '.join(cell.split()[1:]))
-        )
-
-    q_items[questionnaire_item.index] = questionnaire_item
-
-## Find the translations in the questionnaire
-## Save the indices of those questions
-translation_indices = []  # indices of translation questions
-for item in q_items:
-    if q_items[item].type == 'Translation':
-        translation_indices.append(q_items[item].index)
-
-print('N of questions: {}\nN of translation questions: {}'.format(len(q_items), len(translation_indices)))
-
-prompt_pattern = r'\[(.*?)\]'
-for ti in translation_indices:
-    match = re.search(prompt_pattern, q_items[ti].question)
-    if match:
-        q_items[ti].prompt = match.group(1)
-    else:
-        q_items[ti].prompt = 'No prompt found'
-
-## Fill the answers for each question
-for row in data[1:]:
-    participant = ''.join(row[0:2])
-    for index, cell in enumerate(row):
-        if cell != '' and index in translation_indices:
-            if q_items[index+1].cleaned and row[index+1] != '':
-                pass
-            else:
-                if '|' not in cell:
-                    answer = [(participant, cell)]
-                else:
-                    answer = [(participant, translation) for translation in cell.split('| ')]
 
-                if q_items[index].answers:
-                    q_items[index].answers += answer
+def fill_answers(rows, q_items, translation_indices):
+    ## Fill the answers for each question
+    for row in rows:
+        participant = ''.join(row[0:2])
+        for index, cell in enumerate(row):
+            if cell != '' and index in translation_indices:
+                if q_items[index+1].cleaned and row[index+1] != '':
+                    pass
                 else:
-                    q_items[index].answers = answer
+                    if '|' not in cell:
+                        answer = [(participant, cell)]
+                    else:
+                        answer = [(participant, translation) for translation in cell.split('| ')]
 
-## Collect the translations
-translations = []
+                    if q_items[index].answers:
+                        q_items[index].answers += answer
+                    else:
+                        q_items[index].answers = answer
 
-for index in q_items:
-    item = q_items[index]
-    if item.type != 'Translation':
-        pass
-    else:
-        tag = item.tag
-        prompt = item.prompt
-        if item.answers:
-            for answer in item.answers:
-                translation = Answer(remove_periods(tag), remove_periods(prompt), remove_periods(answer[1]), participants[answer[0]], answer[0])
-                translations.append(translation)
-
-
-## Detect the Manner Adverbials in each translation
-## Get MA positions from prompts
-prompt_pos = read_csv(os.path.join(OUTPUT_PATH, "ma_positions.csv"))
-
-## fill a dict with prompt (row[1]) and position (row[2])
-ma_positions = {}
-for row in prompt_pos[1:]:
-    if ':' in row[2]:
-        start = int(row[2].split(':')[0])
-        end = int(row[2].split(':')[1])
-        ma_positions[remove_periods(row[1].strip())] = (start, end)
-    else:
-        ma_positions[remove_periods(row[1].strip())] = int(row[2])
-
-
-## Use MA positions to get MAs from answer
-## then check the edit distance for a better match
-## evaluate better match
-for entry in translations:
-    # first, position:
-    ma_position = ma_positions[entry.prompt]
-    try:
-        if type(ma_position) == int:
-            ma = entry.answer.split()[ma_position]
-            entry.ma = ma
-            prompt_ma = entry.prompt.split()[ma_position]
-            entry.prompt_ma = prompt_ma
+
+def collect_translations(q_items, participants, participant_dialect_ids):
+    ## Collect the translations
+    translations = []
+
+    for index in q_items:
+        item = q_items[index]
+        if item.type != 'Translation':
+            pass
         else:
-            ma = entry.answer.split()[ma_position[0]:ma_position[1]]
-            entry.ma = ' '.join(ma)
-            prompt_ma = ' '.join(entry.prompt.split()[ma_position[0]:ma_position[1]])
-            entry.prompt_ma = prompt_ma
-    except:
-        prompt_ma = 'NA'
-        pass #for the fucking idem answers
-
-    # second, edit distance:
-    ed_to_beat = editdistance.distance(entry.ma, prompt_ma)
-    if type(ma_position) == int:
-        for word in entry.answer.split():
-            ed = editdistance.distance(word, prompt_ma)
-            if ed < ed_to_beat:
-                entry.ma = [ma, word]
-                ed_to_beat = ed
-    else:
-        len_ma = ma_position[1]-ma_position[0] #len of ma window, (2:4) = 2-word window
-        for i in range(len(entry.answer.split())-len_ma):
-            ed = editdistance.distance(' '.join(entry.answer.split()[i:i+len_ma]), prompt_ma)
-            if ed < ed_to_beat:
-                entry.ma = [' '.join(ma), ' '.join(entry.answer.split()[i:i+len_ma])]
-                ed_to_beat = ed
-
-
-## Create a file with prompt MAs and their translations.
-prompt_translation_mas = {}
-for tr in translations:
-    if type(tr.ma) == str:
-        if tr.prompt_ma in prompt_translation_mas:
-            if tr.ma not in prompt_translation_mas[tr.prompt_ma]:
-                prompt_translation_mas[tr.prompt_ma].append(tr.ma)
+            tag = item.tag
+            prompt = item.prompt
+            if item.answers:
+                for answer in item.answers:
+                    translation = TranslationAnswer(remove_periods(tag), remove_periods(prompt), remove_periods(answer[1]), participants[answer[0]], answer[0],
+                                                    dialect_ids=participant_dialect_ids.get(answer[0], ()))
+                    translations.append(translation)
+    return translations
+
+
+def extract_translations(data_path, participants_path):
+    data = read_csv_cached(data_path)
+    participants, participant_dialect_ids = match_participant_dialects(read_csv_cached(participants_path), load_resolver())
+    q_items, translation_indices = create_question_items(data[0])
+    fill_answers(data[1:], q_items, translation_indices)
+    return collect_translations(q_items, participants, participant_dialect_ids)
+
+
+def read_ma_positions(filepath):
+    ## Get MA positions from prompts
+    prompt_pos = read_csv(filepath)
+
+    ## fill a dict with prompt (row[1]) and position (row[2])
+    ma_positions = {}
+    for row in prompt_pos[1:]:
+        if ':' in row[2]:
+            start = int(row[2].split(':')[0])
+            end = int(row[2].split(':')[1])
+            ma_positions[remove_periods(row[1].strip())] = (start, end)
         else:
-            prompt_translation_mas[tr.prompt_ma] = [tr.ma]
+            ma_positions[remove_periods(row[1].strip())] = int(row[2])
+    return ma_positions
+
+
+def align_chunk(chunk):
+    ## chunk: (answer, prompt, MA position) triples
+    return [align(answer, prompt, ma_position) for answer, prompt, ma_position in chunk]
+
+
+def detect_mas(translations, ma_positions, max_workers=None, chunk_size=DETECTION_CHUNK_SIZE, cache=None):
+    ## Detect the Manner Adverbials in each translation:
+    ## use the MA position to get the MA from the answer, then check the edit distance for a better match
+    ## Only the alignments which are not in the cache are computed, once for every distinct translation,
+    ## in chunks spread over a process pool; the results are set on the translations in their original order
+    cache = cache if cache is not None else AlignmentCache()
+    keys = [cache.key(entry.answer, entry.prompt, ma_positions[entry.prompt]) for entry in translations]
+
+    alignments = {}
+    missing = {}
+    for key, entry in zip(keys, translations):
+        if key in alignments or key in missing:
+            continue
+        alignment = cache.get(key)
+        if alignment is None:
+            missing[key] = (entry.answer, entry.prompt, ma_positions[entry.prompt])
+        else:
+            alignments[key] = alignment
+
+    pending = list(missing.values())
+    chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+    if len(chunks) < 2 or max_workers == 1:
+        results = [align_chunk(chunk) for chunk in chunks]
     else:
-        ## TODO: make a decision on what to do with MAs that have several candidates
-        ## Now it simply takes the first one
-        if tr.prompt_ma in prompt_translation_mas:
-            if tr.ma[0] not in prompt_translation_mas[tr.prompt_ma]:
-                prompt_translation_mas[tr.prompt_ma].append(tr.ma[0])
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(align_chunk, chunks))
+
+    for key, alignment in zip(missing, chain.from_iterable(results)):
+        alignments[key] = alignment
+        cache.put(key, alignment)
+    cache.hits += len(translations) - len(missing)
+    cache.misses += len(missing)
+
+    for key, entry in zip(keys, translations):
+        alignment = alignments[key]
+        entry.ma = alignment.entry_ma()
+        entry.prompt_ma = alignment.prompt_ma
+
+
+def collect_prompt_translation_mas(translations):
+    ## Create a file with prompt MAs and their translations.
+    prompt_translation_mas = {}
+    for tr in translations:
+        if type(tr.ma) == str:
+            if tr.prompt_ma in prompt_translation_mas:
+                if tr.ma not in prompt_translation_mas[tr.prompt_ma]:
+                    prompt_translation_mas[tr.prompt_ma].append(tr.ma)
+            else:
+                prompt_translation_mas[tr.prompt_ma] = [tr.ma]
         else:
-            prompt_translation_mas[tr.prompt_ma] = [tr.ma[0]]
+            ## TODO: make a decision on what to do with MAs that have several candidates
+            ## Now it simply takes the first one
+            if tr.prompt_ma in prompt_translation_mas:
+                if tr.ma[0] not in prompt_translation_mas[tr.prompt_ma]:
+                    prompt_translation_mas[tr.prompt_ma].append(tr.ma[0])
+            else:
+                prompt_translation_mas[tr.prompt_ma] = [tr.ma[0]]
+    return prompt_translation_mas
 
 class IDs():
     def __init__(self, existing_ids=None):
@@ -230,13 +249,10 @@ class IDs():
                 self.existing_ids.add(new_id)
                 return new_id
 
-existing_ids = []
-id_generator = IDs(existing_ids)
-
 
 class Adverbial:
-    def __init__(self, answer):
-        self.id = id_generator.generate_id()
+    def __init__(self, answer, id):
+        self.id = id
         self.text = answer.ma
         self.roots = [answer.prompt_ma]
         self.examples = [answer.answer]
@@ -254,84 +270,198 @@ class Adverbial:
         if type(answer.ma) == list:
             self.text = answer.ma[0]
 
-## Fill the adverbials dict with all translated examples
-adverbials = {}
-for answer in translations:
-    key = str([answer.ma, answer.dialect])
-    if key in adverbials.keys():
-        adverbials[key].examples.append(answer.answer)
-        adverbials[key].translations.append(answer.prompt)
-        # if answer.prompt_ma not in adverbials[key].roots:
-        adverbials[key].roots.append(answer.prompt_ma)
-        adverbials[key].participant_ids.append(answer.participant_id)
-    else:
-        new_adverbial = Adverbial(answer)
-        adverbials[key] = new_adverbial
-
-print('Number of Adverbials:', len(adverbials))
 
-adverbials_list = [adverbial for adverbial in adverbials.values()]
+class AdverbialStore:
+    """The adverbials grouped by their MA and dialect, in the order of the translations.
+
+    Also indexes the adverbials by ID, dialect and text, so a correction of the text
+    finds its adverbial directly, and merges it with an adverbial of the same dialect
+    which already has the corrected text.
+    """
+
+    def __init__(self, id_generator):
+        self.id_generator = id_generator
+        self.adverbials = {}  # (MA, dialect) -> Adverbial
+        self.keys = {}        # ID -> (MA, dialect)
+        self.by_id = {}       # ID (or the ID of a merged adverbial) -> Adverbial
+        self.by_dialect = {}  # dialect -> {ID: Adverbial}
+        self.by_text = {}     # text -> {ID: Adverbial}
+        self.merged_ids = {}  # ID -> IDs of the adverbials merged into it
+
+    @staticmethod
+    def key(ma, dialect):
+        # an MA with several candidates is a list
+        return (tuple(ma) if type(ma) == list else ma, dialect)
+
+    def add(self, answer):
+        key = self.key(answer.ma, answer.dialect)
+        try:
+            adverbial = self.adverbials[key]
+        except KeyError:
+            adverbial = self.adverbials[key] = Adverbial(answer, self.id_generator.generate_id())
+            self.keys[adverbial.id] = key
+            self.by_id[adverbial.id] = adverbial
+            self.by_dialect.setdefault(adverbial.dialect, {})[adverbial.id] = adverbial
+            self.by_text.setdefault(adverbial.text, {})[adverbial.id] = adverbial
+            return adverbial
+
+        adverbial.examples.append(answer.answer)
+        adverbial.translations.append(answer.prompt)
+        # if answer.prompt_ma not in adverbial.roots:
+        adverbial.roots.append(answer.prompt_ma)
+        adverbial.participant_ids.append(answer.participant_id)
+        return adverbial
+
+    def find(self, text, dialect):
+        ## The adverbials with this text in this dialect
+        with_text = self.by_text.get(text, {})
+        in_dialect = self.by_dialect.get(dialect, {})
+        if len(with_text) <= len(in_dialect):
+            return [adverbial for adverbial in with_text.values() if adverbial.dialect == dialect]
+        return [adverbial for adverbial in in_dialect.values() if adverbial.text == text]
+
+    def correct(self, adverbial_id, text):
+        ## Replace the text of an adverbial; returns the adverbial it was merged into, if any
+        adverbial = self.by_id[adverbial_id]
+        del self.by_text[adverbial.text][adverbial.id]
+        if not self.by_text[adverbial.text]:
+            del self.by_text[adverbial.text]
+        adverbial.text = text
+
+        existing = next((other for other in self.find(text, adverbial.dialect) if other is not adverbial), None)
+        if existing is None:
+            self.by_text.setdefault(text, {})[adverbial.id] = adverbial
+            return None
+
+        existing.examples += adverbial.examples
+        existing.translations += adverbial.translations
+        existing.roots += adverbial.roots
+        existing.participant_ids += adverbial.participant_ids
+        del self.adverbials[self.keys.pop(adverbial.id)]
+        del self.by_dialect[adverbial.dialect][adverbial.id]
+        # later corrections of the merged adverbial (and the ones merged into it) apply to the one it became part of
+        merged_ids = self.merged_ids.pop(adverbial.id, []) + [adverbial.id]
+        for merged_id in merged_ids:
+            self.by_id[merged_id] = existing
+        self.merged_ids.setdefault(existing.id, []).extend(merged_ids)
+        return existing
+
+    def __iter__(self):
+        return iter(self.adverbials.values())
+
+    def __len__(self):
+        return len(self.adverbials)
+
+
+def group_adverbials(translations, id_generator):
+    ## Fill the adverbials store with all translated examples
+    ## the IDs are assigned in the order of the translations, so they are the same for every run
+    adverbials = AdverbialStore(id_generator)
+    for answer in translations:
+        adverbials.add(answer)
+
+    print('Number of Adverbials:', len(adverbials))
+
+    return adverbials
 
 # Convert the list of Adverbial objects to JSON
 def obj_dict(obj):
     return obj.__dict__
 
-json_data = json.dumps(adverbials_list, default=obj_dict, indent=2)
-json_data_abridged = json.dumps(adverbials_list[0:50], default=obj_dict, indent=2)
-
-# Write the JSON data to a file
-with open(os.path.join(OUTPUT_PATH, 'adverbials_questionnaire.json'), 'w') as json_file:
-    json_file.write(json_data)
-
-with open(os.path.join(OUTPUT_PATH, 'adverbials_questionnaire_abridged.json'), 'w') as json_file:
-    json_file.write(json_data_abridged)
-
-
-# write a csv file to manually check for the correct MA: for Tess
-with open(os.path.join(OUTPUT_PATH, 'list_MAs_to_check'), 'w') as file:
-    writer = csv.writer(file)
-    for adverbial in adverbials_list:
-        row = [adverbial.id, adverbial.examples[0], adverbial.text, '']
-        writer.writerow(row)
-
-# now that Tess has checked the MAs, read the csv file and update the adverbials
-with open(os.path.join(OUTPUT_PATH, 'checked_MAs.csv'), encoding='utf8') as file:
-    reader = csv.reader(file)
-    for row in reader:
-        adverbial_id = row[0]
-        adverbial_text = row[2]
-        adverbial_correction = row[3]
-        for adverbial in adverbials_list:
-            if adverbial.id == adverbial_id and adverbial_correction != '':
-                adverbial.text = adverbial_correction
-                print('replaced {} with {}'.format(adverbial_text, adverbial_correction))
-
-# Save the final collection of Adverbials as a csv file:
-with open(os.path.join(OUTPUT_PATH, 'dutch_adverbials_from_meertens.csv'), 'w', encoding='utf8') as file:
-    writer = csv.writer(file)
-    header_row = [
-        'participant_id',            # participant ID (combination of participant number and survey number)
-        'dialect',                   # dialect of participant
-        'response_id',               # ID assigned to a unique dialect-ma pairing
-        'prompt',                    # prompt in Dutch (ABN)
-        'translation',               # translation of prompt in dialect by participant
-        'prompt_manner_adverbial',   # prompt for the manner adverbial
-        'manner_adverbial'           # manner adverbial translated by the participant
-    ]
-    writer.writerow(header_row)
-    for adverbial in adverbials_list:
-        rows = []
-        for i in range(len(adverbial.examples)):
-            row = [
-                adverbial.participant_ids[i],
-                adverbial.dialect,
-                adverbial.id,
-                adverbial.translations[i],
-                adverbial.examples[i],
-                adverbial.roots[i],
-                adverbial.text
-            ]
-            rows.append(row)
-        writer.writerows(rows)
-
 
+def write_adverbials(adverbials, output_path, ndjson=False):
+    # Write the JSON data to a file, one adverbial at a time
+    # the first 50 adverbials are also written to the abridged file in the same pass
+    extension = '.ndjson' if ndjson else '.json'
+    with open(os.path.join(output_path, 'adverbials_questionnaire' + extension), 'w') as json_file, \
+            open(os.path.join(output_path, 'adverbials_questionnaire_abridged' + extension), 'w') as json_file_abridged:
+        with JsonWriter(json_file, list, default=obj_dict, indent=2, ndjson=ndjson) as writer, \
+                JsonWriter(json_file_abridged, list, default=obj_dict, indent=2, ndjson=ndjson) as writer_abridged:
+            for index, adverbial in enumerate(adverbials):
+                writer.write(adverbial)
+                if index < 50:
+                    writer_abridged.write(adverbial)
+
+
+def write_mas_to_check(adverbials, filepath):
+    # write a csv file to manually check for the correct MA: for Tess
+    with open(filepath, 'w') as file:
+        writer = csv.writer(file)
+        for adverbial in adverbials:
+            row = [adverbial.id, adverbial.examples[0], adverbial.text, '']
+            writer.writerow(row)
+
+
+def apply_checked_mas(adverbials, filepath):
+    # now that Tess has checked the MAs, read the csv file and update the adverbials
+    # an adverbial corrected to the text of another adverbial of the same dialect is merged into that one
+    with open(filepath, encoding='utf8') as file:
+        reader = csv.reader(file)
+        for row in reader:
+            adverbial_id = row[0]
+            adverbial_text = row[2]
+            adverbial_correction = row[3]
+            if adverbial_correction != '' and adverbial_id in adverbials.by_id:
+                merged_into = adverbials.correct(adverbial_id, adverbial_correction)
+                print('replaced {} with {}'.format(adverbial_text, adverbial_correction))
+                if merged_into is not None:
+                    print('merged {} into {}'.format(adverbial_id, merged_into.id))
+
+
+def write_adverbials_csv(adverbials, filepath):
+    # Save the final collection of Adverbials as a csv file:
+    with open(filepath, 'w', encoding='utf8') as file:
+        writer = csv.writer(file)
+        header_row = [
+            'participant_id',            # participant ID (combination of participant number and survey number)
+            'dialect',                   # dialect of participant
+            'response_id',               # ID assigned to a unique dialect-ma pairing
+            'prompt',                    # prompt in Dutch (ABN)
+            'translation',               # translation of prompt in dialect by participant
+            'prompt_manner_adverbial',   # prompt for the manner adverbial
+            'manner_adverbial'           # manner adverbial translated by the participant
+        ]
+        writer.writerow(header_row)
+        for adverbial in adverbials:
+            rows = []
+            for i in range(len(adverbial.examples)):
+                row = [
+                    adverbial.participant_ids[i],
+                    adverbial.dialect,
+                    adverbial.id,
+                    adverbial.translations[i],
+                    adverbial.examples[i],
+                    adverbial.roots[i],
+                    adverbial.text
+                ]
+                rows.append(row)
+            writer.writerows(rows)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default=DATA_PATH, help='questionnaire data in csv format')
+    parser.add_argument('--participants', default=PARTICIPANTS_PATH, help="participants' data in csv format")
+    parser.add_argument('--output', default=OUTPUT_PATH, help='output folder, also containing ma_positions.csv and checked_MAs.csv')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes detecting the MAs, all cores by default')
+    parser.add_argument('--ndjson', action='store_true', help='write newline-delimited JSON, one adverbial per line')
+    return parser.parse_args()
+
+
+def __main__():
+    args = parse_arguments()
+    translations = extract_translations(args.data, args.participants)
+    alignment_cache = AlignmentCache(CACHE_PATH)
+    detect_mas(translations, read_ma_positions(os.path.join(args.output, "ma_positions.csv")), args.workers, cache=alignment_cache)
+    alignment_cache.save()
+    print(alignment_cache)
+    prompt_translation_mas = collect_prompt_translation_mas(translations)
+
+    adverbials = group_adverbials(translations, IDs())
+    write_adverbials(adverbials, args.output, args.ndjson)
+    write_mas_to_check(adverbials, os.path.join(args.output, 'list_MAs_to_check'))
+    apply_checked_mas(adverbials, os.path.join(args.output, 'checked_MAs.csv'))
+    write_adverbials_csv(adverbials, os.path.join(args.output, 'dutch_adverbials_from_meertens.csv'))
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,152 @@
+import csv
+import random
+
+from dialect_hierarchy import DialectHierarchy
+from dialect_resolver import DialectResolver
+from read_data.read_data import (
+    Adverbial, IDs, apply_checked_mas, group_adverbials, match_participant_dialects, write_adverbials_csv
+)
+from records import TranslationAnswer
+
+WORDS = ['snel', 'vlug', 'rap', 'zacht', 'stil', 'hard']
+DIALECTS = ['Hollands', 'Brabants', 'Limburgs', 'Zeeuws']
+
+
+def participant(participant_id, dialect_columns, metadata):
+    return [participant_id, '9'] + [''] * 27 + dialect_columns + [metadata]
+
+
+def test_match_participant_dialects():
+    participants_data = [
+        ['id', 'lastpage'] + [''] * 27 + ['dialect', 'dialect_place', '[metadata:dialect]'],
+        participant('1', ['Het dialect van …', 'Kempen'], 'België; Nederfrankisch; Brabants; Kempisch + Hollands'),
+        participant('2', ['Hollands', ''], 'Nederland; hollands; Zuid-Hollandsch'),
+        participant('3', ['', ''], 'Nederland; Zeeuws'),
+    ]
+    hierarchy = DialectHierarchy({'Nederfrankisch': {'Brabants': {'Kempisch': {}}, 'Hollands': {'Zuid-Hollands': {}}}})
+    ids = hierarchy.ids
+    # the dialects are the most specific of the dialects resolved from the metadata
+    assert match_participant_dialects(participants_data, DialectResolver(hierarchy)) == ({
+        '19': 'Kempisch + Hollands', '29': 'Zuid-Hollands', '39': 'Geen Dialect'
+    }, {
+        '19': (ids['Nederfrankisch'], ids['Brabants'], ids['Kempisch'], ids['Hollands']),
+        '29': (ids['Hollands'], ids['Zuid-Hollands']), '39': ()
+    })
+    # or read from the dialect columns without a resolver
+    assert match_participant_dialects(participants_data) == ({
+        '19': 'Het dialect van … Kempen', '29': 'Hollands', '39': 'Geen Dialect'
+    }, {})
+
+
+def translation(index, ma, dialect):
+    return TranslationAnswer('D1Z{}'.format(index), 'prompt {}'.format(index), 'answer {}'.format(index), dialect,
+                             'p{}'.format(index), ma=ma, prompt_ma='root {}'.format(index))
+
+
+def random_translations(rng, count):
+    ## with some MAs that have several candidates
+    return [
+        translation(index, rng.sample(WORDS, 2) if rng.random() < 0.1 else rng.choice(WORDS), rng.choice(DIALECTS))
+        for index in range(count)
+    ]
+
+
+def reference_adverbials(translations, corrections):
+    ## grouped by str([MA, dialect]), and every correction applied by scanning all adverbials, as before
+    adverbials = {}
+    id_generator = IDs()
+    for answer in translations:
+        key = str([answer.ma, answer.dialect])
+        if key in adverbials:
+            adverbials[key].examples.append(answer.answer)
+            adverbials[key].translations.append(answer.prompt)
+            adverbials[key].roots.append(answer.prompt_ma)
+            adverbials[key].participant_ids.append(answer.participant_id)
+        else:
+            adverbials[key] = Adverbial(answer, id_generator.generate_id())
+    adverbials = list(adverbials.values())
+    for adverbial_id, correction in corrections:
+        for adverbial in adverbials:
+            if adverbial.id == adverbial_id and correction != '':
+                adverbial.text = correction
+    return adverbials
+
+
+def write_checked_mas(filepath, corrections):
+    with open(filepath, 'w', encoding='utf8', newline='') as file:
+        csv.writer(file).writerows([adverbial_id, '', '', correction] for adverbial_id, correction in corrections)
+
+
+def test_apply_checked_mas(tmp_path):
+    # corrections to a text no other adverbial of the dialect has give the same adverbials as the linear scan
+    rng = random.Random(0)
+    filepath = str(tmp_path / 'checked_MAs.csv')
+    for _ in range(20):
+        translations = random_translations(rng, rng.randint(1, 300))
+        corrections = [('Q-{}'.format(rng.randint(1, 40)), rng.choice(['', 'correction {}'.format(index)]))
+                       for index in range(rng.randint(0, 30))]
+        write_checked_mas(filepath, corrections)
+        adverbials = group_adverbials(translations, IDs())
+        apply_checked_mas(adverbials, filepath)
+        expected = reference_adverbials(translations, corrections)
+        assert [vars(adverbial) for adverbial in adverbials] == [vars(adverbial) for adverbial in expected]
+
+        for text in {adverbial.text for adverbial in expected} | {'other'}:
+            for dialect in DIALECTS:
+                assert adverbials.find(text, dialect) == \
+                    [adverbial for adverbial in adverbials if (adverbial.text, adverbial.dialect) == (text, dialect)]
+
+
+def test_correct_merges():
+    adverbials = group_adverbials([
+        translation(1, 'snel', 'Hollands'), translation(2, 'snell', 'Hollands'), translation(3, 'snel', 'Brabants'),
+        translation(4, 'rap', 'Hollands'), translation(5, 'snell', 'Hollands'),
+    ], IDs())
+    first, second, third, fourth = adverbials
+    assert [adverbial.id for adverbial in adverbials] == ['Q-1', 'Q-2', 'Q-3', 'Q-4']
+
+    # corrected to the text of an adverbial of the same dialect, its examples are added to that one
+    assert adverbials.correct('Q-2', 'snel') is first
+    assert list(adverbials) == [first, third, fourth]
+    assert first.examples == ['answer 1', 'answer 2', 'answer 5']
+    assert (first.translations, first.roots, first.participant_ids) == (
+        ['prompt 1', 'prompt 2', 'prompt 5'], ['root 1', 'root 2', 'root 5'], ['p1', 'p2', 'p5']
+    )
+    assert adverbials.by_id['Q-2'] is first
+    assert (adverbials.find('snel', 'Hollands'), adverbials.find('snell', 'Hollands')) == ([first], [])
+
+    # but not with an adverbial of another dialect
+    assert adverbials.correct('Q-3', 'rap') is None
+    assert adverbials.find('rap', 'Brabants') == [third]
+    assert adverbials.find('rap', 'Hollands') == [fourth]
+
+    # the adverbials merged into a merged adverbial move along
+    assert adverbials.correct('Q-1', 'rap') is fourth
+    assert list(adverbials) == [third, fourth]
+    assert fourth.examples == ['answer 4', 'answer 1', 'answer 2', 'answer 5']
+    assert adverbials.merged_ids == {'Q-4': ['Q-2', 'Q-1']}
+    assert [adverbials.by_id[adverbial_id] for adverbial_id in ['Q-1', 'Q-2', 'Q-3', 'Q-4']] == \
+        [fourth, fourth, third, fourth]
+
+    # and a later correction of a merged ID applies to the adverbial it became part of
+    assert adverbials.correct('Q-2', 'vlug') is None
+    assert fourth.text == 'vlug'
+    assert (adverbials.find('vlug', 'Hollands'), adverbials.find('rap', 'Hollands')) == ([fourth], [])
+    assert adverbials.find('rap', 'Brabants') == [third]
+
+
+def test_write_merged_adverbials_csv(tmp_path):
+    # the rows of a merged adverbial get the ID and text of the adverbial it was merged into
+    adverbials = group_adverbials([
+        translation(1, 'snell', 'Hollands'), translation(2, 'snel', 'Hollands'), translation(3, 'snell', 'Hollands'),
+    ], IDs())
+    checked_filepath = str(tmp_path / 'checked_MAs.csv')
+    write_checked_mas(checked_filepath, [('Q-1', 'snel'), ('Q-1', '')])
+    apply_checked_mas(adverbials, checked_filepath)
+    filepath = str(tmp_path / 'dutch_adverbials_from_meertens.csv')
+    write_adverbials_csv(adverbials, filepath)
+    with open(filepath, encoding='utf8') as file:
+        rows = list(csv.reader(file))[1:]
+    assert [(row[0], row[2], row[6]) for row in rows] == [
+        ('p2', 'Q-2', 'snel'), ('p1', 'Q-2', 'snel'), ('p3', 'Q-2', 'snel')
+    ]
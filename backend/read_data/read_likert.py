@@ -1,32 +1,21 @@
-from mima.settings import DATA_PATH_Q1, DATA_PATH_Q2, PARTICIPANTS_PATH_Q1, PARTICIPANTS_PATH_Q2, OUTPUT_PATH
-
-from read_questionnaire import extract_participant_metadata, merge_questionnaires
+from mima.settings import DIALECT_HIERARCHY_PATH
+from cache import pipeline_cache
+from json_writer import write_json
+from records import JudgmentItem, Response, intern, serialize_classes
+from read_questionnaire import (
+    QUESTIONNAIRE_SOURCES,
+    iter_csv,
+    map_questionnaires,
+    merge_questionnaires,
+    output_filepath,
+    read_participant_metadata,
+    report_conflicts,
+)
+import argparse
 import re
-import os
-import json
-import csv
-from dataclasses import dataclass, asdict
 from typing import Dict
 
 
-@dataclass
-class JudgmentItem:
-    main_question: str
-    main_question_id: str
-    sub_question: str
-    sub_question_id: str
-    sub_question_text_id: str
-    responses: list
-
-
-@dataclass
-class Response:
-    participant_id: str
-    dialects: str
-    country: str
-    score: int
-
-
 sub_questions: Dict[str, str] = {}
 
 
@@ -38,28 +27,6 @@ def get_sub_question_text_id(sub_question: str) -> str:
         return text_id
 
 
-def read_csv(filepath):
-    data = []
-    with open(filepath, encoding="utf8") as file:
-        reader = csv.reader(file)
-        for index, row in enumerate(reader):
-            data.append(row)
-    return data
-
-
-def get_dialects(data):
-    participants = {}
-    for participant in data[1:]:
-        if participant[29] == "Het dialect van …":
-            dialect = " ".join(participant[29:31])
-        elif participant[29] == "":
-            dialect = "Geen Dialect"
-        else:
-            dialect = participant[29]
-        participants["".join(participant[0:2])] = dialect.strip()
-    return participants
-
-
 def get_questions_and_ids(item):
     line = item.replace("...", "XXX")
     line = item.replace("\u2026", "XXX")
@@ -102,43 +69,86 @@ def get_judgment_items(line):
     return judgments, indices
 
 
-def get_responses(data, participant_dialects, participant_countries, indices, judgments, skip_list):
-    for line in data[1:]:
-        participant_id = "".join(line[0:2])
-        if participant_id in skip_list:
+def compile_judgment_plan(header, indices, judgments):
+    ## Resolve the judgment item of every Likert column once per file:
+    ## a list of (column index, judgment item)
+    return [(index, judgments[get_full_id(header[index])]) for index in indices]
+
+
+def add_responses(line, participant_id, dialects, country, judgment_plan, dialect_ids=()):
+    for index, judgment_item in judgment_plan:
+        judgment_item.responses.append(
+            Response(participant_id, dialects, country, line[index], dialect_ids)
+        )
+
+
+def get_responses(header, rows, participant_dialects, participant_countries, indices, judgments, skipped_participants, participant_dialect_ids=()):
+    judgment_plan = compile_judgment_plan(header, indices, judgments)
+    for line in rows:
+        participant_id = intern("".join(line[0:2]))
+        if participant_id in skipped_participants:
             print('skip', participant_id)
             continue
-        for index in indices:
-            score = line[index]
-            question_id = get_full_id(data[0][index])
-            judgments[question_id].responses.append(
-                Response(participant_id, participant_dialects[participant_id], participant_countries[participant_id], score)
-            )
+        add_responses(
+            line, participant_id, participant_dialects[participant_id], participant_countries[participant_id], judgment_plan,
+            participant_dialect_ids[participant_id] if participant_dialect_ids else ()
+        )
     return judgments
 
 
-# custom function to serialize data classes as dictionaries
-def serialize_classes(obj):
-    if isinstance(obj, JudgmentItem) or isinstance(obj, Response):
-        return asdict(obj)
-    return obj.__dict__
-
-def extract_likert_and_participant_data(data_path, participants_path):
-    data = read_csv(data_path)
-    participants_data = read_csv(participants_path)
-    participant_countries, participant_dialects, skip_list = extract_participant_metadata(participants_data)
-    judgment_items, judgment_indices = get_judgment_items(data[0])
+def read_likert_and_participant_data(data_path, participants_path):
+    participant_countries, participant_dialects, skipped_participants, participant_dialect_ids = read_participant_metadata(participants_path)
+    rows = iter_csv(data_path)
+    header = next(rows)
+    judgment_items, judgment_indices = get_judgment_items(header)
     judgment_items = get_responses(
-        data, participant_dialects, participant_countries, judgment_indices, judgment_items, skip_list
+        header, rows, participant_dialects, participant_countries, judgment_indices, judgment_items, skipped_participants,
+        participant_dialect_ids
     )
     return judgment_items
 
+def extract_likert_and_participant_data(data_path, participants_path):
+    return pipeline_cache.cached(
+        "judgments", [data_path, participants_path, DIALECT_HIERARCHY_PATH],
+        lambda: read_likert_and_participant_data(data_path, participants_path)
+    )
+
+
+def renumber_sub_question_text_ids(questionnaires):
+    ## Each worker process numbers the sub-question texts on its own;
+    ## renumber them in questionnaire order, so the IDs are the same as when reading them one after the other
+    sub_questions.clear()
+    for judgment_items in questionnaires:
+        for judgment_item in judgment_items.values():
+            judgment_item.sub_question_text_id = get_sub_question_text_id(judgment_item.sub_question)
+    return questionnaires
+
+
+def extract_likert_questionnaires(sources, max_workers=None):
+    ## Extract the judgment items of any number of (data, participants, additional data) path triples in parallel;
+    ## the additional data is not used for the judgments
+    questionnaires = map_questionnaires(
+        extract_likert_and_participant_data, [source[:2] for source in sources], max_workers
+    )
+    return renumber_sub_question_text_ids(questionnaires)
+
+
+def write_judgment_items(judgment_items, filepath, ndjson=False):
+    write_json(filepath, judgment_items.items(), default=serialize_classes, indent=4, ndjson=ndjson)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ndjson', action='store_true',
+                        help='write newline-delimited JSON, one entry per line')
+    return parser.parse_args()
+
+
 def __main__():
-    judgment_items_q1 = extract_likert_and_participant_data(DATA_PATH_Q1, PARTICIPANTS_PATH_Q1)
-    judgment_items_q2 = extract_likert_and_participant_data(DATA_PATH_Q2, PARTICIPANTS_PATH_Q2)
-    merged_judgment_items = merge_questionnaires(judgment_items_q1, judgment_items_q2)
-    with open(os.path.join(OUTPUT_PATH, "likert_scales_test.json"), "w") as file:
-        json.dump(merged_judgment_items, file, default=serialize_classes, indent=4)
+    args = parse_arguments()
+    merged_judgment_items, conflicts = merge_questionnaires(*extract_likert_questionnaires(QUESTIONNAIRE_SOURCES))
+    report_conflicts(conflicts)
+    write_judgment_items(merged_judgment_items, output_filepath("likert_scales_test", args.ndjson), args.ndjson)
 
 
 if __name__ == "__main__":
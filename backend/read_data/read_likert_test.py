@@ -0,0 +1,40 @@
+import sys
+
+import pytest
+
+from benchmark_column_plan import list_lookup_responses
+from read_likert import extract_likert_questionnaires, get_judgment_items, get_responses, parse_arguments
+from read_questionnaire_test import read_wave
+
+
+def test_get_responses(synthetic_sources):
+    # the column plan finds the same responses as parsing the key from the header for every row
+    for source in synthetic_sources:
+        header, rows, countries, dialects, skipped = read_wave(source)
+        expected, indices = get_judgment_items(header)
+        list_lookup_responses(header, rows, dialects, countries, indices, expected, skipped)
+
+        judgments, indices = get_judgment_items(header)
+        assert get_responses(header, rows, dialects, countries, indices, judgments, skipped) == expected
+        assert all(len(item.responses) == len(rows) - len(skipped) for item in judgments.values())
+
+
+def test_extract_likert_questionnaires(synthetic_sources):
+    questionnaires = extract_likert_questionnaires(synthetic_sources, max_workers=1)
+    assert extract_likert_questionnaires(synthetic_sources, max_workers=2) == questionnaires
+    # the sub-question texts have the same ID in every questionnaire
+    text_ids = {}
+    for judgment_items in questionnaires:
+        for judgment_item in judgment_items.values():
+            assert text_ids.setdefault(judgment_item.sub_question, judgment_item.sub_question_text_id) == \
+                judgment_item.sub_question_text_id
+    assert sorted(text_ids.values()) == ['ST000', 'ST001', 'ST002']
+
+
+def test_parse_arguments(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['read_likert.py', '--ndjson'])
+    assert parse_arguments().ndjson
+    # the options of read_questionnaire.py do not apply to the judgments
+    monkeypatch.setattr(sys, 'argv', ['read_likert.py', '--compact'])
+    with pytest.raises(SystemExit):
+        parse_arguments()
@@ -1,18 +1,38 @@
+import argparse
 import csv
+import gc
 import re
 import json
 import os
-from dataclasses import dataclass, asdict
-
-from mima.settings import DATA_PATH_Q1, DATA_PATH_Q2, ADDITIONAL_DATA_PATH_Q1, ADDITIONAL_DATA_PATH_Q2, PARTICIPANTS_PATH_Q1, PARTICIPANTS_PATH_Q2, OUTPUT_PATH
-
-def read_csv(filepath):
-    data = []
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from mima.settings import DATA_PATH_Q1, DATA_PATH_Q2, ADDITIONAL_DATA_PATH_Q1, ADDITIONAL_DATA_PATH_Q2, PARTICIPANTS_PATH_Q1, PARTICIPANTS_PATH_Q2, OUTPUT_PATH, DIALECT_HIERARCHY_PATH
+from cache import pipeline_cache
+from compact import compact_questionnaires
+from coverage import build_coverage, write_coverage
+from dialect_hierarchy import load_hierarchy
+from dialect_resolver import load_resolver, split_dialects
+from json_writer import write_json
+from records import Answer, Question, intern, serialize_classes
+from shards import write_shards
+
+## (data, participants, additional data) paths of every questionnaire, add new survey waves here
+QUESTIONNAIRE_SOURCES = [
+    (DATA_PATH_Q1, PARTICIPANTS_PATH_Q1, ADDITIONAL_DATA_PATH_Q1),
+    (DATA_PATH_Q2, PARTICIPANTS_PATH_Q2, ADDITIONAL_DATA_PATH_Q2),
+]
+
+def iter_csv(filepath):
+    ## Yield the rows one by one, so a large export never has to be held in memory as a whole
     with open(filepath, encoding='utf8') as file:
         reader = csv.reader(file)
-        for index, row in enumerate(reader):
-            data.append(row)
-    return data
+        for row in reader:
+            yield row
+
+def read_csv(filepath):
+    return list(iter_csv(filepath))
 
 def remove_periods(text):
     # Create a translation table mapping periods to None
@@ -30,52 +50,12 @@ def extract_prompt(question_string):
     else:
         return 'No prompt found'
 
-# Define a custom function to serialize data classes as dictionaries
-def serialize_classes(obj):
-    if isinstance(obj, Question) or isinstance(obj, Answer):
-        return asdict(obj)
-    return obj.__dict__
-
-@dataclass
-class Question:
-    tag: str
-    index: int
-    question: str
-    type: str = 'NA'
-    prompt: str = 'NA'
-    cleaned: bool = False
-    split_item: str = 'NA'  # same as the question but split morphologically with punctuation
-    chapter: str = 'NA'
-    subtags: list = None
-    en_translation: str = 'NA'
-    gloss: str = 'NA'
-    answers: list = None
-
-
-    def __str__(self) -> str:
-        return 'Question {}: {}'.format(self.tag, self.question)
-
-@dataclass
-class Answer:
-    tag: str
-    answer: str
-    dialect: str
-    country: str
-    participant_id: str
-
-@dataclass
-class Dialect:
-    dialect: str
-    speakers: list = None
-    translations: dict = None
-
-
-def create_questionnaire_items(data):
-    ## Create a Question object for each question and save them in a dictionary
+def create_questionnaire_items(header):
+    ## Create a Question object for each question (column in the header row) and save them in a dictionary
     questionnaire_items = {} #keys: question index
     translation_indices = []
 
-    for index, cell in enumerate(data[0]):
+    for index, cell in enumerate(header):
         first_word = cell.split()[0]
         if cell.endswith('[Vertaling]') and first_word == 'CLEANED':
             question = remove_periods(' '.join(cell.split()[2:]))
@@ -112,24 +92,27 @@ def create_questionnaire_items(data):
     return questionnaire_items, translation_indices
 
 
-def extract_participant_metadata(participants_data):
-    ## Create a dictionary with participant IDs as keys and their dialects as values
+def extract_participant_metadata(participants_data, resolver=None):
+    ## Create dictionaries with participant IDs as keys and their countries, dialects and
+    ## dialect hierarchy nodes (resolved with the DialectResolver, if given) as values
+    ## participants_data can be a list of rows or a (streaming) iterator over the rows
     participant_countries = {}
     participant_dialects = {}
-    skip_list = []
-    dialect_index = next((x for x in range(len(participants_data[0])) if participants_data[0][x] == '[metadata:dialect]'), None)
+    participant_dialect_ids = {}
+    skipped_participants = set()
+    rows = iter(participants_data)
+    header = next(rows)
+    dialect_index = next((x for x in range(len(header)) if header[x] == '[metadata:dialect]'), None)
     if dialect_index is None:
         raise ValueError("Couldn't find column header with '[metadata:dialect]' in the participants data")
-    separators = [';', '&', '+', ':']
-    pattern = '|'.join(map(re.escape, separators))
 
 
-    for participant in participants_data[1:]:
-        participant_id = ''.join(participant[0:2])
-        lang_tokens = [subdialect.strip() for subdialect in re.split(pattern, participant[dialect_index])]
+    for participant in rows:
+        participant_id = intern(''.join(participant[0:2]))
+        lang_tokens = split_dialects(participant[dialect_index])
 
         if 'UNDERSPECIFIED' in lang_tokens:
-            skip_list.append(participant_id)
+            skipped_participants.add(participant_id)
             continue  # skip participants with underspecified dialects
         country = []
         dialect = []
@@ -138,39 +121,51 @@ def extract_participant_metadata(participants_data):
                 country.append(token)
             else:
                 dialect.append(token)
-        participant_countries[participant_id] = country if country else ['NO COUNTRY']
-        participant_dialects[participant_id] = dialect if dialect[0] != '' else ['SKIP']
-    return participant_countries, participant_dialects, skip_list
+        # the same tuples are shared by all participants (and so all answers) with the same dialects
+        participant_countries[participant_id] = intern(country if country else ['NO COUNTRY'])
+        participant_dialects[participant_id] = intern(dialect if dialect[0] != '' else ['SKIP'])
+        participant_dialect_ids[participant_id] = intern(resolver.resolve_all(dialect)) if resolver else ()
+    return participant_countries, participant_dialects, skipped_participants, participant_dialect_ids
+
+
+def compile_translation_plan(questionnaire_items, translation_indices):
+    ## Resolve everything that is needed per translation cell once per file, instead of once per cell:
+    ## a list of (column index, question, index of the CLEANED column following it or None)
+    translation_plan = []
+    for index in sorted(translation_indices):
+        question = questionnaire_items[index]
+        next_item = questionnaire_items.get(index + 1)
+        cleaned_index = index + 1 if next_item is not None and next_item.cleaned else None
+        translation_plan.append((index, question, cleaned_index))
+    return translation_plan
+
+
+def add_answers(row, participant, translation_plan, country, dialect, dialect_ids=()):
+    ## Fill the answers for each question from a single data row of a participant
+    row_length = len(row)
+    for index, question, cleaned_index in translation_plan:
+        if index >= row_length:
+            break
+        cell = row[index]
+        # mark unattested answers for empty cells
+        # cleaned cells are skipped
+        if cell == '' and not question.cleaned:
+            answer = Answer(question.tag, answer='unattested', country=country, dialect=dialect, participant_id=participant, dialect_ids=dialect_ids)
+        elif cell != '':
+            # skip cells that have cleaned versions of them in the next line
+            if cleaned_index is not None and row[cleaned_index] != '':
+                continue
+            answer = Answer(question.tag, answer=cell, country=country, dialect=dialect, participant_id=participant, dialect_ids=dialect_ids)
+        else:
+            continue
 
+        if question.answers:
+            question.answers.append(answer)
+        else:
+            question.answers = [answer]
 
-def extract_answers(data, questionnaire_items, translation_indices, participant_countries, participant_dialects, skip_list):
-        ## Fill the answers for each question
-    for row in data[1:]:
-        participant = ''.join(row[0:2])
-        if participant in skip_list:
-            continue
-        for index, cell in enumerate(row):
-            question = questionnaire_items[index]
-            if index in translation_indices:
-                # mark unattested answers for empty cells
-                # cleaned cells are skipped
-                if cell == '' and not questionnaire_items[index].cleaned:
-                    answer = Answer(question.tag, answer='unattested', country=participant_countries[participant], dialect=participant_dialects[participant], participant_id=participant)
-                    if question.answers:
-                        question.answers.append(answer)
-                    else:
-                        question.answers = [answer]
-                elif cell != '':
-                    # skip cells that have cleaned versions of them in the next line
-                    if questionnaire_items[index+1].cleaned and row[index+1] != '':
-                        pass
-                    else:
-                        answer = Answer(question.tag, answer=cell, country=participant_countries[participant], dialect=participant_dialects[participant], participant_id=participant)
-                        if question.answers:
-                            question.answers.append(answer)
-                        else:
-                            question.answers = [answer]
 
+def collect_cleaned_translation_questions(questionnaire_items):
     ## Merge all the answers from the cleaned and uncleaned translation questions under a single cleaned translation question
     ## and save it in a cleaned_translation_questions_dict
     cleaned_translation_questions = {} ## dict where the keys are the question tag (e.g. 'D7Z3[SQ004]')
@@ -192,9 +187,25 @@ def extract_answers(data, questionnaire_items, translation_indices, participant_
     return cleaned_translation_questions
 
 
+def extract_answers(rows, questionnaire_items, translation_indices, participant_countries, participant_dialects, skipped_participants, participant_dialect_ids=()):
+    ## Fill the answers for each question
+    ## rows are the data rows (without the header); each row can be dropped once its answers are created
+    translation_plan = compile_translation_plan(questionnaire_items, translation_indices)
+    for row in rows:
+        participant = intern(''.join(row[0:2]))
+        if participant in skipped_participants:
+            continue
+        add_answers(row, participant, translation_plan, participant_countries[participant], participant_dialects[participant],
+                    participant_dialect_ids[participant] if participant_dialect_ids else ())
+
+    return collect_cleaned_translation_questions(questionnaire_items)
+
+
 def enrich_translation_questions(cleaned_translation_questions, additional_data):
     ## Go through the additional data and attach the necessary information to the cleaned_translation_questions
-    for entry in additional_data[1:]:
+    rows = iter(additional_data)
+    next(rows, None)  # skip the header
+    for entry in rows:
         ids = entry[0].split(';')
         split_item = entry[1]
         chapter = entry[2]
@@ -213,40 +224,139 @@ def enrich_translation_questions(cleaned_translation_questions, additional_data)
                 pass
     return cleaned_translation_questions
 
+def read_participant_metadata(participants_data_path, hierarchy_path=DIALECT_HIERARCHY_PATH):
+    return pipeline_cache.cached(
+        'participants', [participants_data_path, hierarchy_path],
+        lambda: extract_participant_metadata(iter_csv(participants_data_path), load_resolver(hierarchy_path)))
+
+
+def extract_cleaned_questionnaire(data_path, participants_data_path):
+    ## Stream the questionnaire: the header row builds the questions, the data rows are read one at a time
+    participant_countries, participant_dialects, skipped_participants, participant_dialect_ids = read_participant_metadata(participants_data_path)
+    rows = iter_csv(data_path)
+    questionnaire_items, translation_indices = create_questionnaire_items(next(rows))
+    return extract_answers(rows, questionnaire_items, translation_indices, participant_countries, participant_dialects, skipped_participants, participant_dialect_ids)
+
+
 def extract_enriched_cleaned_questionnaire(data_path, participants_data_path, additional_data_path):
-    data = read_csv(data_path)
-    participants_data = read_csv(participants_data_path)
-    additional_data = read_csv(additional_data_path)
-    questionnaire_items, translation_indices = create_questionnaire_items(data)
-    participant_countries, participant_dialects, skip_list = extract_participant_metadata(participants_data)
-    cleaned_translation_questions = extract_answers(data, questionnaire_items, translation_indices, participant_countries, participant_dialects, skip_list)
-    enriched_cleaned_translation_questions = enrich_translation_questions(cleaned_translation_questions, additional_data)
+    ## only the enrichment is done again when just the additional data changed
+    cleaned_translation_questions = pipeline_cache.cached(
+        'answers', [data_path, participants_data_path, DIALECT_HIERARCHY_PATH],
+        lambda: extract_cleaned_questionnaire(data_path, participants_data_path))
+    enriched_cleaned_translation_questions = enrich_translation_questions(cleaned_translation_questions, iter_csv(additional_data_path))
     return enriched_cleaned_translation_questions
 
 
-def merge_questionnaires(q1, q2):
+@contextmanager
+def gc_paused():
+    ## The records hold no reference cycles, but the cyclic garbage collector would scan all of them
+    ## again and again while millions are created (or unpickled from the worker processes)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def map_questionnaires(function, sources, max_workers=None):
+    ## Call function(*source) for every source, in a process pool if there is more than one;
+    ## the results are returned in the order of the sources
+    sources = list(sources)
+    # the results are pickled back from the workers, which only pays off if they run at the same time
+    max_workers = min(max_workers or os.cpu_count() or 1, len(sources))
+    with gc_paused():
+        if max_workers < 2:
+            return [function(*source) for source in sources]
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=gc.disable) as executor:
+            return list(executor.map(function, *zip(*sources)))
+
+
+def extract_questionnaires(sources, max_workers=None):
+    ## Extract the enriched cleaned translation questions of any number of
+    ## (data, participants, additional data) path triples in parallel
+    return map_questionnaires(extract_enriched_cleaned_questionnaire, sources, max_workers)
+
+
+@dataclass
+class MergeConflict:
+    key: str
+    sources: list  # positions of the questionnaires which all contain this key
+
+    def __str__(self) -> str:
+        return 'Overlapping key {} in questionnaires {}, left out'.format(
+            self.key, ', '.join(str(source + 1) for source in self.sources))
+
+
+def merge_questionnaires(*questionnaires):
+    ## Merge the questionnaires (dicts keyed by question ID) in order;
+    ## keys occurring in more than one questionnaire are left out and reported as conflicts
+    sources = {}
+    for position, questionnaire in enumerate(questionnaires):
+        for key in questionnaire:
+            sources.setdefault(key, []).append(position)
+
     merged_questionnaires = {}
-    for key in q1:
-        if key in q2:
-            print('Whoah overlap')
-            print(key)
-        else:
-            merged_questionnaires[key] = q1[key]
-    for key in q2:
-        if key in q1:
-            pass
+    conflicts = []
+    for key, positions in sources.items():
+        if len(positions) > 1:
+            conflicts.append(MergeConflict(key, positions))
         else:
-            merged_questionnaires[key] = q2[key]
-    return merged_questionnaires
+            merged_questionnaires[key] = questionnaires[positions[0]][key]
+    return merged_questionnaires, conflicts
 
-def __main__():
-    enriched_cleaned_translation_questions_q1 = extract_enriched_cleaned_questionnaire(DATA_PATH_Q1, PARTICIPANTS_PATH_Q1, ADDITIONAL_DATA_PATH_Q1)
-    enriched_cleaned_translation_questions_q2 = extract_enriched_cleaned_questionnaire(DATA_PATH_Q2, PARTICIPANTS_PATH_Q2, ADDITIONAL_DATA_PATH_Q2)
-    merged_questionnaires = merge_questionnaires(enriched_cleaned_translation_questions_q1, enriched_cleaned_translation_questions_q2)
 
-    ## dump as json
-    with open(os.path.join(OUTPUT_PATH, 'cleaned_translation_questions.json'), 'w') as file:
-        json.dump(merged_questionnaires, file, default=serialize_classes, indent=4)
+def report_conflicts(conflicts):
+    for conflict in conflicts:
+        print(conflict)
+
+
+def output_filepath(name, ndjson=False):
+    return os.path.join(OUTPUT_PATH, name + ('.ndjson' if ndjson else '.json'))
+
+
+def write_questionnaires(questionnaires, filepath, compact=False, ndjson=False):
+    ## dump as json, one question at a time
+    if compact:
+        with open(filepath, 'w') as file:
+            json.dump(compact_questionnaires(questionnaires), file, separators=(',', ':'))
+    else:
+        write_json(filepath, questionnaires.items(), default=serialize_classes, indent=4, ndjson=ndjson)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    output_format = parser.add_mutually_exclusive_group()
+    output_format.add_argument('--compact', action='store_true',
+                               help='write the participants, dialects and countries once and refer to them by index')
+    output_format.add_argument('--ndjson', action='store_true',
+                               help='write newline-delimited JSON, one entry per line')
+    parser.add_argument('--shards', action='store_true',
+                        help='also write the translation questions per chapter, with a manifest')
+    return parser.parse_args()
+
+
+def write_outputs(questionnaires, args):
+    name = 'cleaned_translation_questions'
+    write_questionnaires(questionnaires, output_filepath(name, args.ndjson), args.compact, args.ndjson)
+    if args.shards:
+        write_shards(
+            questionnaires,
+            os.path.join(OUTPUT_PATH, name),
+            lambda questions, filepath: write_questionnaires(questions, filepath, args.compact, args.ndjson),
+            '.ndjson' if args.ndjson else '.json')
+
+
+def __main__():
+    args = parse_arguments()
+    merged_questionnaires, conflicts = merge_questionnaires(*extract_questionnaires(QUESTIONNAIRE_SOURCES))
+    report_conflicts(conflicts)
+
+    write_outputs(merged_questionnaires, args)
+    # which dialects and participants answered each question, next to the translation questions
+    coverage = build_coverage(merged_questionnaires, load_hierarchy(DIALECT_HIERARCHY_PATH))
+    write_coverage(coverage, output_filepath('coverage'))
 
 if __name__ == "__main__":
     __main__()
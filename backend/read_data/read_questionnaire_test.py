@@ -0,0 +1,46 @@
+from benchmark_column_plan import list_lookup_answers
+from read_questionnaire import (
+    MergeConflict, collect_cleaned_translation_questions, create_questionnaire_items, extract_answers,
+    extract_participant_metadata, extract_questionnaires, iter_csv, merge_questionnaires, read_csv
+)
+
+
+def read_wave(source):
+    ## The header, the data rows and the participant metadata of a questionnaire, without resolving the dialects
+    data_path, participants_path, additional_data_path = source
+    header, *rows = read_csv(data_path)
+    countries, dialects, skipped, dialect_ids = extract_participant_metadata(iter_csv(participants_path))
+    return header, rows, countries, dialects, skipped
+
+
+def test_extract_answers(synthetic_sources):
+    # the column plan finds the same answers as looking up the question of every cell
+    for source in synthetic_sources:
+        header, rows, countries, dialects, skipped = read_wave(source)
+        questionnaire_items, translation_indices = create_questionnaire_items(header)
+        list_lookup_answers(rows, questionnaire_items, translation_indices, countries, dialects, skipped)
+        expected = collect_cleaned_translation_questions(questionnaire_items)
+
+        questions = extract_answers(rows, *create_questionnaire_items(header), countries, dialects, skipped)
+        assert questions == expected
+        assert any(answer.answer == 'unattested' for question in questions.values() for answer in question.answers)
+        assert not any(answer.participant_id in skipped for question in questions.values() for answer in question.answers)
+
+
+def test_extract_questionnaires(synthetic_sources):
+    questionnaires = extract_questionnaires(synthetic_sources, max_workers=1)
+    assert extract_questionnaires(synthetic_sources, max_workers=2) == questionnaires
+    assert all(question.chapter != 'NA' for questionnaire in questionnaires for question in questionnaire.values())
+
+
+def test_merge_questionnaires(synthetic_sources):
+    q1, q2 = extract_questionnaires(synthetic_sources, max_workers=1)
+    merged, conflicts = merge_questionnaires(q1, q2)
+    assert list(merged) == list(q1) + list(q2)
+    assert conflicts == []
+
+    # the questions of a questionnaire read twice are left out
+    merged, conflicts = merge_questionnaires(q1, q2, q1)
+    assert merged == q2
+    assert conflicts == [MergeConflict(key, [0, 2]) for key in q1]
+    assert str(conflicts[0]) == 'Overlapping key {} in questionnaires 1, 3, left out'.format(next(iter(q1)))
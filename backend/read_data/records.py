@@ -0,0 +1,132 @@
+"""
+Data model shared by read_questionnaire, read_likert and read_data.
+
+Every record uses __slots__ instead of a __dict__ per instance, and the values which
+repeat for every answer of a participant (participant ID, dialects, countries) are
+interned, so millions of answers share the same objects.
+"""
+import sys
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from operator import attrgetter
+from typing import Dict, Hashable
+
+
+def slotted(cls):
+    ## Recreate a dataclass with __slots__ for its fields (dataclass(slots=True) requires Python 3.10)
+    field_names = tuple(field.name for field in fields(cls))
+    namespace = dict(cls.__dict__)
+    for name in field_names:
+        # the defaults are already part of the generated __init__
+        namespace.pop(name, None)
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    namespace['__slots__'] = field_names
+    # pickle the fields as the arguments of the constructor, instead of a dict of the slots per instance
+    # (the results of the worker processes are pickled)
+    values = attrgetter(*field_names)
+    if len(field_names) == 1:
+        namespace['__reduce__'] = lambda self: (type(self), (values(self),))
+    else:
+        namespace['__reduce__'] = lambda self: (type(self), values(self))
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+class Interner:
+    """Returns a single shared instance for equal values.
+
+    Lists are stored as tuples, because only immutable values can be shared safely.
+    """
+
+    def __init__(self):
+        self.values: Dict[Hashable, Hashable] = {}
+
+    def __call__(self, value):
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, list):
+            value = tuple(self(item) for item in value)
+        return self.values.setdefault(value, value)
+
+
+intern = Interner()
+
+
+# Define a custom function to serialize data classes as dictionaries
+def serialize_classes(obj):
+    if is_dataclass(obj):
+        return asdict(obj)
+    return obj.__dict__
+
+
+@slotted
+@dataclass
+class Question:
+    tag: str
+    index: int
+    question: str
+    type: str = 'NA'
+    prompt: str = 'NA'
+    cleaned: bool = False
+    split_item: str = 'NA'  # same as the question but split morphologically with punctuation
+    chapter: str = 'NA'
+    subtags: list = None
+    en_translation: str = 'NA'
+    gloss: str = 'NA'
+    answers: list = None
+
+    def __str__(self) -> str:
+        return 'Question {}: {}'.format(self.tag, self.question)
+
+
+@slotted
+@dataclass
+class Answer:
+    tag: str
+    answer: str
+    dialect: tuple
+    country: tuple
+    participant_id: str
+    dialect_ids: tuple = ()  # nodes of the dialect hierarchy, see dialect_resolver
+
+
+@slotted
+@dataclass
+class TranslationAnswer:
+    """A single translation of a prompt, in which read_data looks for the manner adverbial."""
+    tag: str
+    prompt: str
+    answer: str
+    dialect: str
+    participant_id: str
+    ma: str = 'NA'
+    prompt_ma: str = 'NA'
+    dialect_ids: tuple = ()
+
+
+@slotted
+@dataclass
+class Dialect:
+    dialect: str
+    speakers: list = None
+    translations: dict = None
+
+
+@slotted
+@dataclass
+class JudgmentItem:
+    main_question: str
+    main_question_id: str
+    sub_question: str
+    sub_question_id: str
+    sub_question_text_id: str
+    responses: list
+
+
+@slotted
+@dataclass
+class Response:
+    participant_id: str
+    dialects: tuple
+    country: tuple
+    score: int
+    dialect_ids: tuple = ()
@@ -0,0 +1,74 @@
+"""
+Writes the translation questions in one file per chapter, next to a small manifest.
+
+The manifest lists every shard with its chapter, file and the ID, prompt, subtags and
+answer counts of its questions, and an index from each subtag to the questions having
+it. A client can read the manifest first and then only load the shards it needs.
+"""
+import json
+import os
+import re
+
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def shard_filename(chapter, used_filenames, extension):
+    slug = re.sub(r'[^\w-]+', '-', chapter.lower(), flags=re.UNICODE).strip('-') or 'na'
+    filename = slug + extension
+    suffix = 1
+    while filename in used_filenames:
+        suffix += 1
+        filename = '{}-{}{}'.format(slug, suffix, extension)
+    used_filenames.add(filename)
+    return filename
+
+
+def group_by_chapter(questionnaires):
+    ## {chapter: {tag: question}}, in the order in which the chapters first occur
+    chapters = {}
+    for tag, question in questionnaires.items():
+        chapters.setdefault(question.chapter, {})[tag] = question
+    return chapters
+
+
+def question_summary(tag, question):
+    return {
+        'id': tag,
+        'prompt': question.prompt,
+        'subtags': question.subtags or [],
+        'answers': len(question.answers),
+        'attested': sum(1 for answer in question.answers if answer.answer != 'unattested'),
+    }
+
+
+def write_shards(questionnaires, directory, write_questionnaires, extension='.json'):
+    ## write_questionnaires(questions, filepath) writes a single shard, in the same format as the complete file
+    os.makedirs(directory, exist_ok=True)
+    # a chapter called Manifest does not replace the manifest
+    used_filenames = {MANIFEST_FILENAME}
+    shards = []
+    subtags = {}
+    for chapter, questions in group_by_chapter(questionnaires).items():
+        filename = shard_filename(chapter, used_filenames, extension)
+        write_questionnaires(questions, os.path.join(directory, filename))
+
+        summaries = [question_summary(tag, question) for tag, question in questions.items()]
+        for summary in summaries:
+            for subtag in summary['subtags']:
+                subtags.setdefault(subtag, []).append(summary['id'])
+        shards.append({
+            'chapter': chapter,
+            'file': filename,
+            'answers': sum(summary['answers'] for summary in summaries),
+            'questions': summaries,
+        })
+
+    manifest = {'shards': shards, 'subtags': subtags}
+    with open(os.path.join(directory, MANIFEST_FILENAME), 'w') as file:
+        json.dump(manifest, file, indent=4)
+    return manifest
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILENAME)) as file:
+        return json.load(file)
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from compact import load_questionnaires
+from read_questionnaire import extract_questionnaires, write_questionnaires
+from records import Answer, Question
+from shards import MANIFEST_FILENAME, read_manifest, shard_filename, write_shards
+
+
+def question(tag, chapter, subtags, answers):
+    return Question(tag, 0, tag, prompt='prompt ' + tag, chapter=chapter, subtags=subtags, answers=[
+        Answer(tag, answer, ('Brabants',), ('Nederland',), 'p{}'.format(index), (1,))
+        for index, answer in enumerate(answers)
+    ])
+
+
+def test_shard_filename():
+    used_filenames = set()
+    assert shard_filename('Hoofdstuk 1: Bijwoorden', used_filenames, '.json') == 'hoofdstuk-1-bijwoorden.json'
+    assert shard_filename('hoofdstuk 1 / bijwoorden', used_filenames, '.json') == 'hoofdstuk-1-bijwoorden-2.json'
+    assert shard_filename('Één', used_filenames, '.ndjson') == 'één.ndjson'
+    assert shard_filename('?', used_filenames, '.json') == 'na.json'
+    assert used_filenames == {'hoofdstuk-1-bijwoorden.json', 'hoofdstuk-1-bijwoorden-2.json', 'één.ndjson', 'na.json'}
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_write_shards(tmp_path, compact):
+    questionnaires = {
+        'D1Z1[SQ001]': question('D1Z1[SQ001]', 'Hoofdstuk 1', ['snelheid', 'beweging'], ['hij loopt rap', 'unattested']),
+        'D2Z1[SQ001]': question('D2Z1[SQ001]', 'hoofdstuk-1', ['snelheid'], ['zij praat zacht']),
+        'D1Z2[SQ001]': question('D1Z2[SQ001]', 'Hoofdstuk 1', None, []),
+        'D3Z1[SQ001]': question('D3Z1[SQ001]', 'NA', ['geluid'], ['unattested']),
+        'D4Z1[SQ001]': question('D4Z1[SQ001]', 'Manifest', [], ['hij zei het']),
+    }
+    directory = str(tmp_path / 'shards')
+    manifest = write_shards(questionnaires, directory,
+                            lambda questions, filepath: write_questionnaires(questions, filepath, compact))
+    assert read_manifest(directory) == manifest
+    assert sorted(os.listdir(directory)) == \
+        sorted([MANIFEST_FILENAME, 'hoofdstuk-1.json', 'hoofdstuk-1-2.json', 'na.json', 'manifest-2.json'])
+    assert manifest == {
+        'shards': [{
+            'chapter': 'Hoofdstuk 1', 'file': 'hoofdstuk-1.json', 'answers': 2, 'questions': [
+                {'id': 'D1Z1[SQ001]', 'prompt': 'prompt D1Z1[SQ001]', 'subtags': ['snelheid', 'beweging'],
+                 'answers': 2, 'attested': 1},
+                {'id': 'D1Z2[SQ001]', 'prompt': 'prompt D1Z2[SQ001]', 'subtags': [], 'answers': 0, 'attested': 0},
+            ]
+        }, {
+            'chapter': 'hoofdstuk-1', 'file': 'hoofdstuk-1-2.json', 'answers': 1, 'questions': [
+                {'id': 'D2Z1[SQ001]', 'prompt': 'prompt D2Z1[SQ001]', 'subtags': ['snelheid'], 'answers': 1,
+                 'attested': 1},
+            ]
+        }, {
+            'chapter': 'NA', 'file': 'na.json', 'answers': 1, 'questions': [
+                {'id': 'D3Z1[SQ001]', 'prompt': 'prompt D3Z1[SQ001]', 'subtags': ['geluid'], 'answers': 1,
+                 'attested': 0},
+            ]
+        }, {
+            'chapter': 'Manifest', 'file': 'manifest-2.json', 'answers': 1, 'questions': [
+                {'id': 'D4Z1[SQ001]', 'prompt': 'prompt D4Z1[SQ001]', 'subtags': [], 'answers': 1, 'attested': 1},
+            ]
+        }],
+        'subtags': {'snelheid': ['D1Z1[SQ001]', 'D2Z1[SQ001]'], 'beweging': ['D1Z1[SQ001]'], 'geluid': ['D3Z1[SQ001]']}
+    }
+
+
+def test_read_shards(tmp_path, synthetic_sources):
+    # the shards listed in the manifest read back as the complete file
+    questionnaire = extract_questionnaires(synthetic_sources[:1], max_workers=1)[0]
+    filepath = str(tmp_path / 'cleaned_translation_questions.json')
+    write_questionnaires(questionnaire, filepath)
+    with open(filepath) as file:
+        expected = load_questionnaires(file)
+
+    for compact in [False, True]:
+        directory = str(tmp_path / 'shards-{}'.format(compact))
+        write_shards(questionnaire, directory,
+                     lambda questions, filepath: write_questionnaires(questions, filepath, compact))
+        manifest = read_manifest(directory)
+        assert len(manifest['shards']) > 1
+        questions = {}
+        for shard in manifest['shards']:
+            with open(os.path.join(directory, shard['file'])) as file:
+                shard_questions = load_questionnaires(file)
+            assert list(shard_questions) == [summary['id'] for summary in shard['questions']]
+            assert {question['chapter'] for question in shard_questions.values()} == {shard['chapter']}
+            assert shard['answers'] == sum(len(question['answers']) for question in shard_questions.values())
+            questions.update(shard_questions)
+        assert questions == expected
@@ -0,0 +1,230 @@
+"""
+Generates synthetic Meertens-style questionnaire exports, for benchmarking the readers
+without the real (private) survey data.
+
+The exports follow the same conventions as the real ones:
+- data.csv: one row per participant, translation columns ending with `[Vertaling]`
+  (optionally followed by a `CLEANED` column), `COMMENT` columns and `Invulzin` Likert columns
+- participants.csv: the participant metadata with a `[metadata:dialect]` column and
+  the 'Het dialect van …' columns (read by read_data.py only without a DialectResolver)
+- additional.csv: split items, chapters, subtags, translations and glosses
+- output/ma_positions.csv and output/checked_MAs.csv: the input of read_data.py
+- dialect_data.txt: the input of organize_dialects.py
+
+The dialects are taken from the dialect hierarchy. A scale of 1 corresponds to the size
+of a single real survey wave; the number of participants grows linearly with the scale.
+
+Usage: python synthetic.py DIRECTORY [--scale N] [--waves N] [--seed N]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+
+from mima.settings import DIALECT_HIERARCHY_PATH
+
+PARTICIPANTS_PER_SCALE = 200
+TRANSLATION_QUESTIONS = 120
+JUDGMENT_ITEMS = 60
+SUB_QUESTIONS = ['goed', 'twijfelachtig', 'fout']
+METADATA_COLUMNS = 29  # columns before 'Het dialect van …' in the participants data
+
+# Dutch prompts with the position of the manner adverbial (a word index or a start:end range)
+SENTENCES = [
+    ('Hij loopt snel naar huis', '2'),
+    ('Zij praat zacht tegen de kinderen', '2'),
+    ('Het kind eet langzaam zijn bord leeg', '3'),
+    ('De man werkt hard op het land', '3'),
+    ('Ze zingt mooi in het koor', '2'),
+    ('Jan rijdt voorzichtig door het dorp', '2'),
+    ('Hij schrijft netjes in zijn schrift', '2'),
+    ('De hond blaft luid naar de buren', '3'),
+    ('Zij antwoordde heel beleefd op de vraag', '2:4'),
+    ('Wij wachten rustig op de bus', '2'),
+    ('De vrouw lachte hardop om de grap', '2'),
+    ('Hij sloeg de deur met een klap dicht', '4:7'),
+]
+
+# spelling changes which make the translations look like dialects
+SOUND_CHANGES = [
+    ('oo', 'oa'), ('ij', 'ie'), ('ui', 'uu'), ('aa', 'oa'), ('ee', 'ie'),
+    ('en', 'e'), ('g', 'ch'), ('z', 's'), ('v', 'f'), ('ou', 'oe'),
+]
+
+COUNTRIES = ['Nederland', 'België']
+
+
+def dialect_paths(hierarchy, path=()):
+    for name, children in hierarchy.items():
+        if name in ['SKIP', 'UNDERSPECIFIED']:
+            continue
+        yield path + (name,)
+        yield from dialect_paths(children, path + (name,))
+
+
+def read_dialect_paths(hierarchy_path):
+    with open(hierarchy_path, encoding='utf8') as file:
+        return list(dialect_paths(json.load(file)))
+
+
+def dialectize(sentence, path, rng):
+    ## Apply the sound changes of this dialect, and now and then a spelling variation of the participant
+    changes = random.Random(' > '.join(path)).sample(SOUND_CHANGES, 3)
+    words = []
+    for word in sentence.split():
+        for source, target in changes:
+            word = word.replace(source, target)
+        if rng.random() < 0.05:
+            word = word + word[-1]
+        words.append(word)
+    return ' '.join(words)
+
+
+def question_tag(wave, index):
+    return 'D{}Z{}[SQ{:0>3}]'.format(wave * 100 + index // 10, index % 10, index % 7 + 1)
+
+
+def judgment_tag(wave, index):
+    return 'J{}Z{}[SQ{:0>3}]'.format(wave * 100 + index // len(SUB_QUESTIONS), index % 10, index % len(SUB_QUESTIONS) + 1)
+
+
+def create_header(wave):
+    header = ['id', 'lastpage', 'startlanguage']
+    for index in range(TRANSLATION_QUESTIONS):
+        tag = question_tag(wave, index)
+        sentence = SENTENCES[index % len(SENTENCES)][0]
+        cell = '{}. Vertaal de zin: [{}.] [Vertaling]'.format(tag, sentence)
+        header.append(cell)
+        if index % 2 == 0:
+            header.append('CLEANED ' + cell)
+        if index % 5 == 0:
+            header.append('COMMENT {}. Opmerking'.format(tag))
+    for index in range(JUDGMENT_ITEMS):
+        sentence = SENTENCES[index // len(SUB_QUESTIONS) % len(SENTENCES)][0]
+        header.append('{}. Invulzin {}. [{}]'.format(
+            judgment_tag(wave, index), sentence.replace(' ', ' … ', 1), SUB_QUESTIONS[index % len(SUB_QUESTIONS)]))
+    return header
+
+
+def create_participant(rng, paths):
+    if rng.random() < 0.03:
+        return 'UNDERSPECIFIED', None
+    path = rng.choice(paths)
+    tokens = list(path)
+    if rng.random() < 0.05:
+        tokens += ['+'] + list(rng.choice(paths))
+    if rng.random() < 0.7:
+        tokens = [rng.choice(COUNTRIES)] + tokens
+    return '; '.join(tokens).replace('; +; ', ' + '), path
+
+
+def write_wave(directory, wave, participants, rng, paths):
+    os.makedirs(directory, exist_ok=True)
+    header = create_header(wave)
+    with open(os.path.join(directory, 'participants.csv'), 'w', encoding='utf8', newline='') as participants_file, \
+            open(os.path.join(directory, 'data.csv'), 'w', encoding='utf8', newline='') as data_file:
+        participants_writer = csv.writer(participants_file)
+        participants_writer.writerow(
+            ['id', 'lastpage'] + ['metadata{}'.format(i) for i in range(2, METADATA_COLUMNS)]
+            + ['dialect', 'dialect_place', '[metadata:dialect]'])
+        data_writer = csv.writer(data_file)
+        data_writer.writerow(header)
+
+        for participant in range(participants):
+            participant_id = str(wave * 1000000 + participant)
+            metadata, path = create_participant(rng, paths)
+            # read by read_data.match_participant_dialects only without a DialectResolver
+            dialect_columns = ['Het dialect van …', path[-1]] if path else ['', '']
+            participants_writer.writerow(
+                [participant_id, '9'] + [''] * (METADATA_COLUMNS - 2) + dialect_columns + [metadata])
+
+            row = [participant_id, '9', 'nl']
+            for cell in header[3:]:
+                if 'Invulzin' in cell:
+                    row.append(rng.choice(['1', '2', '3', '4', '5', '5', '4', '']))
+                elif cell.startswith('CLEANED'):
+                    # the cleaned version is only there when the original needed fixing
+                    row.append(dialectize(cell.split('[')[-2].rstrip('.] '), path or ('',), rng) if rng.random() < 0.2 else '')
+                elif cell.endswith('[Vertaling]'):
+                    if rng.random() < 0.15:
+                        row.append('')
+                    else:
+                        sentence = cell.split('[')[-2].rstrip('.] ')
+                        answer = dialectize(sentence, path or ('',), rng)
+                        if rng.random() < 0.05:
+                            answer += ' | ' + dialectize(sentence, path or ('',), rng)
+                        row.append(answer)
+                else:
+                    row.append('zo zeggen wij het' if rng.random() < 0.02 else '')
+            data_writer.writerow(row)
+
+    with open(os.path.join(directory, 'additional.csv'), 'w', encoding='utf8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['ids', 'split_item', 'chapter', 'subtags', 'en_translation', 'gloss'])
+        for index in range(0, TRANSLATION_QUESTIONS, 2):
+            sentence = SENTENCES[index % len(SENTENCES)][0]
+            writer.writerow([
+                '{};{}'.format(question_tag(wave, index), question_tag(wave, index + 1)),
+                sentence.replace(' ', ' - ', 1),
+                'Hoofdstuk {}'.format(index // 20 + 1),
+                'tag{};tag{}'.format(index % 3, index % 4),
+                'Translation of: ' + sentence,
+                sentence.upper(),
+            ])
+
+
+def write_read_data_inputs(directory, rng):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'ma_positions.csv'), 'w', encoding='utf8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['id', 'prompt', 'position'])
+        for index, (sentence, position) in enumerate(SENTENCES):
+            writer.writerow([index, sentence, position])
+
+    with open(os.path.join(directory, 'checked_MAs.csv'), 'w', encoding='utf8', newline='') as file:
+        writer = csv.writer(file)
+        for index in range(1, 200, 3):
+            word = rng.choice(SENTENCES)[0].split()[2]
+            writer.writerow(['Q-{}'.format(index), '', word, word + 'e' if rng.random() < 0.3 else ''])
+
+
+def write_dialect_data(filepath, scale, rng, paths):
+    ## the dialects of the hierarchy, with new local varieties added for larger scales
+    lines = ['; '.join(path) for path in paths]
+    for index in range((scale - 1) * len(paths)):
+        lines.append('; '.join(rng.choice(paths) + ('Plaats {}'.format(index),)))
+    with open(filepath, 'w', encoding='utf8') as file:
+        for line in lines:
+            file.write(line + '\n')
+
+
+def generate(directory, scale=1, waves=2, seed=0, hierarchy_path=DIALECT_HIERARCHY_PATH):
+    ## Returns the (data, participants, additional data) paths of every wave
+    rng = random.Random(seed)
+    paths = read_dialect_paths(hierarchy_path)
+    sources = []
+    for wave in range(1, waves + 1):
+        wave_directory = os.path.join(directory, 'q{}'.format(wave))
+        write_wave(wave_directory, wave, PARTICIPANTS_PER_SCALE * scale, rng, paths)
+        sources.append(tuple(os.path.join(wave_directory, name)
+                             for name in ['data.csv', 'participants.csv', 'additional.csv']))
+    write_read_data_inputs(os.path.join(directory, 'output'), rng)
+    write_dialect_data(os.path.join(directory, 'dialect_data.txt'), scale, rng, paths)
+    return sources
+
+
+def __main__():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('directory')
+    parser.add_argument('--scale', type=int, default=1, help='multiplier for the number of participants')
+    parser.add_argument('--waves', type=int, default=2, help='number of questionnaires')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--hierarchy', default=DIALECT_HIERARCHY_PATH, help='dialect hierarchy to pick the dialects from')
+    args = parser.parse_args()
+    for source in generate(args.directory, args.scale, args.waves, args.seed, args.hierarchy):
+        print(', '.join(source))
+
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,229 @@
+"""
+Searches the translation questions with the filters of the frontend (see FilterService.applyFilters).
+
+The questions and answers written by read_questionnaire.py are loaded into an inverted
+index per field: every normalized word points to the texts containing it, and every
+trigram to the words containing it. A filter only runs its search expression on the
+texts which contain one of its words, instead of on every text.
+
+Filters have a field ('*' for all fields), any number of search expressions (content),
+and can require the whole text to be equal to one of them (onlyFullMatch); they are
+combined with 'and' or 'or' in the same way as in the frontend.
+"""
+from typing import Dict, Iterable, List, Optional, Set
+
+from read_data.dialect_hierarchy import DialectHierarchy
+
+from .expression import SearchExpression, normalize_needle, normalize_tokens, query_groups, remove_diacritics
+
+QUESTION_FIELDS = ['id', 'prompt', 'split_item', 'chapter', 'subtags', 'gloss', 'en_translation']
+ANSWER_FIELDS = ['answer', 'dialects', 'participantId', 'attestation']
+OPERATORS = ['and', 'or']
+
+
+class Filter:
+    def __init__(self, field: str, content: List[str], only_full_match: bool = False):
+        self.field = field
+        self.content = content
+        self.only_full_match = only_full_match
+
+    @property
+    def empty(self):
+        # as in the frontend, an empty (first) search expression matches everything
+        return not self.content or not self.content[0].strip()
+
+    def applies_to(self, field):
+        return self.field == '*' or self.field == field
+
+    @staticmethod
+    def from_json(data) -> 'Filter':
+        if not isinstance(data, dict) or not isinstance(data.get('field'), str):
+            raise ValueError('A filter should be an object with a field')
+        content = data.get('content', [])
+        if isinstance(content, str):
+            content = [content]
+        if not isinstance(content, list) or not all(isinstance(value, str) for value in content):
+            raise ValueError('The content of a filter should be a list of strings')
+        return Filter(data['field'], content, bool(data.get('onlyFullMatch', False)))
+
+
+class FieldIndex:
+    """The texts of a single field, with a word index and a trigram index of the words."""
+
+    def __init__(self):
+        self.owners: List[int] = []  # question or answer of every text
+        self.texts: List[str] = []
+        self.exact: Dict[str, List[int]] = {}  # text -> positions of that text
+        self.words: Dict[str, Set[int]] = {}  # normalized word -> positions of the texts with it
+        self.trigrams: Dict[str, Set[str]] = {}  # trigram -> words containing it
+
+    def add(self, owner: int, text: str):
+        position = len(self.texts)
+        self.owners.append(owner)
+        self.texts.append(text)
+        self.exact.setdefault(text, []).append(position)
+        for word in normalize_tokens(text):
+            if not word:
+                continue
+            try:
+                self.words[word].add(position)
+            except KeyError:
+                self.words[word] = {position}
+                for index in range(len(word) - 2):
+                    self.trigrams.setdefault(word[index:index + 3], set()).add(word)
+
+    def containing(self, needle: str) -> Set[int]:
+        ## The positions of the texts with a word containing the (normalized) needle
+        if len(needle) < 3:
+            words = [word for word in self.words if needle in word]
+        else:
+            candidates = None
+            for index in range(len(needle) - 2):
+                found = self.trigrams.get(needle[index:index + 3], set())
+                candidates = found if candidates is None else candidates & found
+                if not candidates:
+                    return set()
+            words = [word for word in candidates if needle in word]
+        positions = set()
+        for word in words:
+            positions |= self.words[word]
+        return positions
+
+    def search(self, content: Iterable[str], only_full_match: bool) -> Set[int]:
+        ## The positions of the texts matching any of the search expressions
+        positions = set()
+        for query in content:
+            if only_full_match:
+                positions.update(self.exact.get(query, []))
+                continue
+            groups = [[normalize_needle(word) for word in group] for group in query_groups(query)]
+            candidates = set()
+            for needles in groups:
+                # a word without any characters to search for never matches
+                if all(needles):
+                    candidates |= set.intersection(*(self.containing(remove_diacritics(needle)) for needle in needles))
+            if '&' not in query and '"' not in query and all(
+                    needles[0] == remove_diacritics(needles[0]) for needles in groups):
+                # any of the words matches: the index has found exactly those texts
+                positions |= candidates
+                continue
+            # the diacritics of a needle have to match, and & and phrases need the positions of the words
+            expression = SearchExpression(query)
+            positions.update(
+                position for position in candidates - positions
+                if expression.search(self.texts[position]))
+        return positions
+
+
+class SearchEngine:
+    def __init__(self, questions: Dict[str, dict], hierarchy: Optional[DialectHierarchy] = None):
+        self.ids: List[str] = []
+        self.answer_questions: List[int] = []  # question of every answer
+        self.has_subtags: Set[int] = set()
+        self.fields = {field: FieldIndex() for field in QUESTION_FIELDS + ANSWER_FIELDS}
+        # the dialects of the answers which aren't the parent of another dialect of the same answer
+        self.end_dialects: Set[int] = set()
+
+        for question_index, (tag, question) in enumerate(questions.items()):
+            self.ids.append(question.get('tag', tag))
+            for field in QUESTION_FIELDS:
+                if field == 'id':
+                    self.fields['id'].add(question_index, self.ids[-1])
+                elif field == 'subtags':
+                    for subtag in question.get('subtags') or []:
+                        self.has_subtags.add(question_index)
+                        self.fields['subtags'].add(question_index, subtag)
+                else:
+                    self.fields[field].add(question_index, question.get(field) or '')
+            for answer in question.get('answers') or []:
+                self.add_answer(question_index, answer, hierarchy)
+
+    def add_answer(self, question_index, answer, hierarchy):
+        ## An answer with several translations (separated by |) is a separate answer for each of them,
+        ## as in the frontend; an unattested answer has no text
+        dialects = answer.get('dialect') or []
+        for example in answer['answer'].split('|'):
+            answer_index = len(self.answer_questions)
+            self.answer_questions.append(question_index)
+            unattested = example == 'unattested'
+            self.fields['answer'].add(answer_index, '' if unattested else example)
+            self.fields['participantId'].add(answer_index, answer.get('participant_id') or '')
+            self.fields['attestation'].add(answer_index, 'unattested' if unattested else 'attested')
+            for dialect in dialects:
+                if hierarchy is not None and is_end_dialect(hierarchy, dialect, dialects):
+                    self.end_dialects.add(len(self.fields['dialects'].texts))
+                self.fields['dialects'].add(answer_index, dialect)
+
+    def question_matches(self, filter: Filter) -> Set[int]:
+        ## The questions matching the filter on one of their own fields
+        fields = [field for field in QUESTION_FIELDS if filter.applies_to(field)]
+        if filter.empty:
+            if any(field != 'subtags' for field in fields):
+                return set(range(len(self.ids)))
+            return set(self.has_subtags) if fields else set()
+        questions = set()
+        for field in fields:
+            index = self.fields[field]
+            questions.update(index.owners[position] for position in index.search(filter.content, filter.only_full_match))
+        return questions
+
+    def answer_matches(self, filter: Filter) -> Set[int]:
+        ## The answers matching the filter on one of their fields; a filter on the dialects
+        ## only matches the most specific dialects of an answer
+        answers = set()
+        for field in ANSWER_FIELDS:
+            if not filter.applies_to(field):
+                continue
+            index = self.fields[field]
+            if filter.empty:
+                if field != 'dialects':
+                    # every answer has this field
+                    return set(range(len(self.answer_questions)))
+                positions = range(len(index.texts))
+            else:
+                positions = index.search(filter.content, filter.only_full_match)
+            if field == 'dialects' and filter.field == 'dialects':
+                positions = self.end_dialects.intersection(positions)
+            answers.update(index.owners[position] for position in positions)
+        return answers
+
+    def search(self, filters: List[Filter], operator: str = 'or') -> List[str]:
+        ## The IDs of the matching questions, in their original order
+        if operator not in OPERATORS:
+            raise ValueError('Unknown operator: {}'.format(operator))
+        if not filters:
+            return list(self.ids)
+
+        question_matches = [self.question_matches(filter) for filter in filters]
+        answer_filters = [filter for filter in filters if any(filter.applies_to(field) for field in ANSWER_FIELDS)]
+        answer_matches = [self.answer_matches(filter) for filter in answer_filters]
+
+        if operator == 'or':
+            matched = set().union(*question_matches)
+            for answers in answer_matches:
+                matched.update(self.answer_questions[answer] for answer in answers)
+        else:
+            # all the filters should match: on the question itself, or the filters on the answers
+            # all on the same answer
+            matched = set.intersection(*question_matches)
+            if answer_matches:
+                complete = {self.answer_questions[answer] for answer in set.intersection(*answer_matches)}
+                other_matches = [
+                    questions for filter, questions in zip(filters, question_matches)
+                    if filter not in answer_filters
+                ]
+                if other_matches:
+                    complete &= set.intersection(*other_matches)
+                matched |= complete
+        return [self.ids[question] for question in sorted(matched)]
+
+
+def is_end_dialect(hierarchy: DialectHierarchy, name: str, dialects: List[str]) -> bool:
+    ## Is the dialect known, and none of the other dialects one of its sub-dialects?
+    node = hierarchy.ids.get(name)
+    if node is None:
+        return False
+    return not any(
+        other != name and other in hierarchy.ids and node in hierarchy.ancestors(hierarchy.ids[other])
+        for other in dialects
+    )
@@ -0,0 +1,101 @@
+import pytest
+
+from read_data.dialect_hierarchy import DialectHierarchy
+
+from .engine import Filter, SearchEngine, is_end_dialect
+
+HIERARCHY = DialectHierarchy({'Nederfrankisch': {'Brabants': {'Noord-Brabants': {}}, 'Hollands': {}}})
+
+QUESTIONS = {
+    'D1Z1[SQ001]': {
+        'prompt': 'Hij loopt snel naar huis',
+        'chapter': 'Hoofdstuk 1',
+        'subtags': ['snel'],
+        'answers': [
+            {'answer': 'Hij loapt snel noar huus', 'participant_id': 'p1', 'dialect': ['Brabants']},
+            {'answer': 'unattested', 'participant_id': 'p2', 'dialect': ['Hollands']},
+        ]
+    },
+    'D1Z2[SQ002]': {
+        'prompt': 'Zij praat zacht',
+        'chapter': 'Hoofdstuk 1',
+        'answers': [
+            {'answer': 'Zie proat zacht|Zij praot zachjes', 'participant_id': 'p1',
+             'dialect': ['Brabants', 'Noord-Brabants']},
+        ]
+    },
+    'D2Z1[SQ001]': {
+        'prompt': 'De kat slaapt',
+        'chapter': 'Hoofdstuk 2',
+        'answers': []
+    },
+}
+
+
+@pytest.fixture
+def engine():
+    return SearchEngine(QUESTIONS, HIERARCHY)
+
+
+def search(engine, *filters, operator='or'):
+    return engine.search([Filter(*filter) for filter in filters], operator)
+
+
+def test_no_filters(engine):
+    assert engine.search([]) == list(QUESTIONS)
+    assert search(engine, ('prompt', [''])) == list(QUESTIONS)
+
+
+def test_question_fields(engine):
+    assert search(engine, ('prompt', ['snel'])) == ['D1Z1[SQ001]']
+    assert search(engine, ('chapter', ['"hoofdstuk 1"'])) == ['D1Z1[SQ001]', 'D1Z2[SQ002]']
+    assert search(engine, ('subtags', ['snel'])) == ['D1Z1[SQ001]']
+    assert search(engine, ('id', ['D2Z1'])) == ['D2Z1[SQ001]']
+    assert search(engine, ('prompt', ['kat & snel'])) == []
+
+
+def test_answer_fields(engine):
+    # every translation of an answer is searched as a separate answer
+    assert search(engine, ('answer', ['zachjes'])) == ['D1Z2[SQ002]']
+    assert search(engine, ('*', ['huus', 'slaapt'])) == ['D1Z1[SQ001]', 'D2Z1[SQ001]']
+    assert search(engine, ('attestation', ['unattested'])) == ['D1Z1[SQ001]']
+    assert search(engine, ('participantId', ['p1'])) == ['D1Z1[SQ001]', 'D1Z2[SQ002]']
+
+
+def test_only_full_match(engine):
+    assert search(engine, ('answer', ['Zij praot zachjes'], True)) == ['D1Z2[SQ002]']
+    assert search(engine, ('answer', ['zij praot zachjes'], True)) == []
+    assert search(engine, ('answer', ['x', ''], True)) == ['D1Z1[SQ001]']
+    assert search(engine, ('prompt', ['Zij praat'], True)) == []
+
+
+def test_operators(engine):
+    assert search(engine, ('answer', ['proat']), ('participantId', ['p1']), operator='and') == ['D1Z2[SQ002]']
+    # the filters on the answers should match the same answer
+    assert search(engine, ('answer', ['noar']), ('participantId', ['p2']), operator='and') == []
+    assert search(engine, ('answer', ['noar']), ('participantId', ['p2']), operator='or') == ['D1Z1[SQ001]']
+    assert search(engine, ('chapter', ['2']), ('prompt', ['kat']), operator='and') == ['D2Z1[SQ001]']
+    with pytest.raises(ValueError):
+        search(engine, ('prompt', ['kat']), operator='xor')
+
+
+def test_dialects(engine):
+    # a filter on the dialects only matches the most specific dialects of an answer
+    assert search(engine, ('dialects', ['Noord-Brabants'])) == ['D1Z2[SQ002]']
+    assert search(engine, ('dialects', ['Brabants'], True)) == ['D1Z1[SQ001]']
+    assert search(engine, ('*', ['Brabants'], True)) == ['D1Z1[SQ001]', 'D1Z2[SQ002]']
+
+
+def test_is_end_dialect():
+    assert is_end_dialect(HIERARCHY, 'Noord-Brabants', ['Brabants', 'Noord-Brabants'])
+    assert not is_end_dialect(HIERARCHY, 'Brabants', ['Brabants', 'Noord-Brabants'])
+    assert is_end_dialect(HIERARCHY, 'Brabants', ['Brabants', 'Hollands'])
+    assert not is_end_dialect(HIERARCHY, 'Utrechts', ['Utrechts'])
+
+
+def test_filter_from_json():
+    filter = Filter.from_json({'field': 'answer', 'content': 'snel', 'onlyFullMatch': True})
+    assert (filter.field, filter.content, filter.only_full_match) == ('answer', ['snel'], True)
+    for data in [['answer'], {'content': ['snel']}, {'field': 'answer', 'content': [1]}]:
+        with pytest.raises(ValueError):
+            Filter.from_json(data)
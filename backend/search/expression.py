@@ -0,0 +1,203 @@
+"""
+The search expressions of the frontend (frontend/src/app/models/search-expression.ts), in Python.
+
+An expression consists of words (any of them can match), words combined with & (all of
+them should match) and phrases between quotes. Matching is case-insensitive, ignores
+diacritics in the text and skips over the characters in IGNORE_CHARACTERS.
+"""
+import re
+import unicodedata
+from typing import List, Tuple
+
+IGNORE_CHARACTERS = "-'.,()"
+ignore_pattern = re.compile(r"[\-'\.\,\(\)\s]")
+query_pattern = re.compile(r'(\s+|(?=&)|(?<=&))')
+
+Match = Tuple[int, int]
+
+
+def remove_diacritics(text: str) -> str:
+    return ''.join(char for char in unicodedata.normalize('NFD', text) if not '\u0300' <= char <= '\u036f')
+
+
+def normalize_needle(needle: str) -> str:
+    return ignore_pattern.sub('', needle).lower()
+
+
+def normalize_tokens(text: str) -> List[str]:
+    ## The words of a text as they are compared to a (normalized) needle: a needle never
+    ## matches across whitespace, and the ignored characters are skipped
+    return [
+        remove_diacritics(ignore_pattern.sub('', token).lower())
+        for token in text.split()
+    ]
+
+
+def normalize_text(text: str) -> str:
+    ## The words of normalize_tokens as a single text, e.g. to store in the database: a normalized
+    ## needle (without diacritics) is found in it as a substring wherever search_single would find it
+    return ' '.join(token for token in normalize_tokens(text) if token)
+
+
+def search_single(haystack: str, needle: str) -> List[Match]:
+    ## The matches of a single word in the text, as (start, end) positions
+    haystack_index = 0
+    needle_index = 0
+    start = 0
+    matches = []
+    needle = normalize_needle(needle)
+
+    while haystack_index < len(haystack):
+        character = haystack[haystack_index].lower()
+        if character in IGNORE_CHARACTERS:
+            if start == haystack_index:
+                start += 1  # don't highlight leading characters
+            haystack_index += 1
+        elif needle_index < len(needle) and (
+                character == needle[needle_index] or remove_diacritics(character) == needle[needle_index]):
+            needle_index += 1
+            haystack_index += 1
+
+            if needle_index == len(needle):
+                matches.append((start, haystack_index))
+                start = haystack_index
+                needle_index = 0
+        else:
+            # no match, move one character ahead from the last starting point
+            haystack_index = start + 1
+            start = haystack_index
+            needle_index = 0
+
+    return matches
+
+
+def query_groups(query: str) -> List[List[str]]:
+    ## The words of an expression in groups, without the operators and quotation marks:
+    ## a text can only match if it contains all the words of one of the groups
+    ## (words combined with & or in the same phrase are a group)
+    groups: List[List[str]] = []
+    joined = False
+    phrase = None  # None outside of a phrase, otherwise whether the phrase has a word yet
+    for part in split_query(query):
+        if part == '&':
+            joined = True
+            continue
+        if part.startswith('"'):
+            phrase = False if phrase is None else None
+        word = part.replace('"', '')
+        if word:
+            if groups and (joined or phrase):
+                groups[-1].append(word)
+            else:
+                groups.append([word])
+            if phrase is not None:
+                phrase = True
+            joined = False
+        if part[1:].endswith('"'):
+            phrase = False if phrase is None else None
+    return groups
+
+
+def split_query(query: str) -> List[str]:
+    # & is always a separate part, e.g. 'apple&mango &banana& peach& berry'
+    return [part for part in query_pattern.split(query) if part and not part.isspace()]
+
+
+class SearchExpression:
+    def __init__(self, query: str):
+        self.query_parts = split_query(query)
+
+    def init(self):
+        self.current: List[Match] = []
+        self.and_ = False
+        self.reject_and = False
+        self.phrases = None
+        self.start_of_phrase = False
+
+    def close_phrases(self):
+        if len(self.phrases) == 0:
+            self.reject_and = True
+
+        for phrase in self.phrases:
+            self.current.extend(phrase)
+
+        self.and_ = False
+        self.phrases = None
+
+    def continue_phrases(self, matches: List[Match]):
+        if not matches:
+            # no match, abort all phrases
+            self.phrases = []
+            return
+        updated_phrases = []
+        for phrase in self.phrases:
+            end = phrase[-1][1]
+            for match in matches:
+                # this match should be a continuation of a phrase
+                if match[0] - 3 < end:
+                    updated_phrases.append(phrase + [match])
+        self.phrases = updated_phrases
+
+    def handle_phrase_marker(self):
+        if self.phrases is None:
+            self.phrases = []
+            self.start_of_phrase = True
+        else:
+            self.close_phrases()
+
+    def push_current(self, result: List[Match]):
+        if not self.reject_and:
+            result.extend(self.current)
+
+        self.current = []
+        self.reject_and = False
+
+    def match_word(self, word: str, haystack: str):
+        part_matches = search_single(haystack, word)
+        if self.phrases is not None:
+            if self.start_of_phrase:
+                if part_matches:
+                    self.phrases.append(part_matches)
+            else:
+                self.continue_phrases(part_matches)
+        else:
+            if self.and_ and not part_matches:
+                self.reject_and = True
+            else:
+                self.current.extend(part_matches)
+            self.and_ = False
+
+        self.start_of_phrase = False
+
+    def search(self, haystack: str) -> List[Match]:
+        self.init()
+        result: List[Match] = []
+
+        for part in self.query_parts:
+            if part == '&':
+                self.and_ = True
+                if not self.current:
+                    self.reject_and = True
+                continue
+
+            if not self.and_:
+                self.push_current(result)
+
+            if part.startswith('"'):
+                self.handle_phrase_marker()
+
+            word = part.replace('"', '')
+            if word:
+                self.match_word(word, haystack)
+
+            # the quotation mark can also be affixed at the end of a part, e.g.: this is" a valid query"
+            if part[1:].endswith('"'):
+                self.handle_phrase_marker()
+
+        if self.phrases:
+            self.close_phrases()
+
+        if not self.reject_and:
+            result.extend(self.current)
+
+        return result
@@ -0,0 +1,71 @@
+import random
+
+from .expression import (
+    SearchExpression, normalize_needle, normalize_text, normalize_tokens, query_groups, remove_diacritics, search_single,
+    split_query
+)
+
+
+def test_remove_diacritics():
+    assert remove_diacritics('één café') == 'een cafe'
+    assert remove_diacritics('Ärger') == 'Arger'
+
+
+def test_normalize_text():
+    assert normalize_text("Hij lóópt, (snel)  naar-huis") == 'hij loopt snel naarhuis'
+    assert normalize_tokens("'t Kind  -") == ['t', 'kind', '']
+    assert normalize_text("'t Kind  -") == 't kind'
+    assert normalize_text(' - ') == ''
+
+
+def test_search_single():
+    assert search_single('Hij lóópt snel', 'loopt') == [(4, 9)]
+    # the ignored characters are skipped, in the text and in the needle
+    assert search_single('naar-huis', 'naarhuis') == [(0, 9)]
+    assert search_single('naarhuis', "naar-huis") == [(0, 8)]
+    assert search_single('(snel) snel', 'snel') == [(1, 5), (7, 11)]
+    assert search_single('Hij loopt', 'rent') == []
+
+
+def test_split_query():
+    assert split_query('apple&mango &banana& peach& berry') == [
+        'apple', '&', 'mango', '&', 'banana', '&', 'peach', '&', 'berry'
+    ]
+    assert split_query('  "de kat"  ') == ['"de', 'kat"']
+
+
+def test_query_groups():
+    assert query_groups('apple&mango "de kat" peer') == [['apple', 'mango'], ['de', 'kat'], ['peer']]
+    assert query_groups('"kat" hond') == [['kat'], ['hond']]
+    assert query_groups('"" &') == []
+
+
+def test_search_expression():
+    assert SearchExpression('kat hond').search('de hond') == [(3, 7)]
+    assert SearchExpression('snel & huis').search('hij loopt snel naar huis') == [(10, 14), (20, 24)]
+    assert SearchExpression('snel & huis').search('hij loopt snel') == []
+    assert SearchExpression('"snel naar"').search('snel naar huis') == [(0, 4), (5, 9)]
+    assert SearchExpression('"snel huis"').search('snel naar huis') == []
+
+
+def test_search_expression_diacritics():
+    # diacritics in the text are ignored, but those of the needle have to match
+    assert SearchExpression('loopt').search('hij lóópt') == [(4, 9)]
+    assert SearchExpression('lóópt').search('hij loopt') == []
+    assert SearchExpression('lóópt').search('hij lóópt') == [(4, 9)]
+
+
+def test_normalized_text_contains_matches():
+    # the database and the inverted index look up a normalized needle in the normalized words of a text:
+    # that should find exactly the texts in which search_single finds the needle
+    rng = random.Random(0)
+    alphabet = "abé -'.,()"
+    for _ in range(5000):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randrange(10)))
+        needle = ''.join(rng.choice('abe-') for _ in range(rng.randrange(1, 4)))
+        normalized = remove_diacritics(normalize_needle(needle))
+        if not normalized:
+            continue
+        expected = bool(search_single(text, needle))
+        assert any(normalized in token for token in normalize_tokens(text)) == expected, (text, needle)
+        assert (normalized in normalize_text(text)) == expected, (text, needle)
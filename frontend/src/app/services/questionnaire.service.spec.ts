@@ -16,4 +16,86 @@ describe('QuestionnaireService', () => {
     it('should be created', () => {
         expect(service).toBeTruthy();
     });
+
+    it('should expand the compact format', () => {
+        const compact = {
+            format: 'compact',
+            version: 2,
+            names: ['Brabants', 'Nederland', 'Kempisch'],
+            participants: [['17', [0], [1], [3, 7]], ['18', [2, 0], [], []]],
+            questions: {
+                'D1Z1[SQ001]': {
+                    tag: 'D1Z1[SQ001]',
+                    question: 'Ik loop snel',
+                    answers: [[0, 'ik loop rap'], [1, 'unattested', 'D1Z1']]
+                }
+            }
+        };
+
+        expect(service.expandCompact(compact)).toEqual({
+            'D1Z1[SQ001]': {
+                tag: 'D1Z1[SQ001]',
+                question: 'Ik loop snel',
+                answers: [{
+                    tag: 'D1Z1[SQ001]',
+                    answer: 'ik loop rap',
+                    participant_id: '17',
+                    dialect: ['Brabants'],
+                    country: ['Nederland'],
+                    dialect_ids: [3, 7]
+                }, {
+                    tag: 'D1Z1',
+                    answer: 'unattested',
+                    participant_id: '18',
+                    dialect: ['Kempisch', 'Brabants'],
+                    country: [],
+                    dialect_ids: []
+                }]
+            }
+        });
+    });
+
+    it('should expand version 1 of the compact format', () => {
+        // without the dialect node IDs
+        const compact = {
+            format: 'compact',
+            version: 1,
+            names: ['Brabants', 'Nederland'],
+            participants: [['17', [0], [1]]],
+            questions: {
+                'D1Z1[SQ001]': {
+                    tag: 'D1Z1[SQ001]',
+                    question: 'Ik loop snel',
+                    answers: [[0, 'ik loop rap']]
+                }
+            }
+        };
+
+        expect(service.expandCompact(compact)).toEqual({
+            'D1Z1[SQ001]': {
+                tag: 'D1Z1[SQ001]',
+                question: 'Ik loop snel',
+                answers: [{
+                    tag: 'D1Z1[SQ001]',
+                    answer: 'ik loop rap',
+                    participant_id: '17',
+                    dialect: ['Brabants'],
+                    country: ['Nederland'],
+                    dialect_ids: []
+                }]
+            }
+        });
+    });
+
+    it('should not expand other versions of the compact format', () => {
+        const compact = {
+            format: 'compact',
+            version: 3,
+            names: [],
+            participants: [],
+            questions: {}
+        };
+
+        expect(() => service.expandCompact(compact)).toThrowError(/version: 3/);
+    });
 });
@@ -10,6 +10,10 @@ import { FilterWorkerService } from './filter-worker.service';
 import { VisibilityService } from './visibility.service';
 import { DialectLookup, EndDialects } from '../models/dialect';
 
+/**
+ * Versions of the compact format (see backend/read_data/compact.py) which can be expanded
+ */
+const compactVersions = [1, 2];
 
 @Injectable({
     providedIn: 'root'
@@ -75,6 +79,10 @@ export class QuestionnaireService extends VisibilityService<QuestionnaireItemCom
     convertToQuestionnaire(response: Object) {
         const questions: Question[] = [];
 
+        if (response['format'] === 'compact') {
+            response = this.expandCompact(response);
+        }
+
         for (const [tag, entry] of Object.entries(response)) {
             const answers: Answer[] = [];
             for (const subentry of entry['answers']) {
@@ -111,6 +119,42 @@ export class QuestionnaireService extends VisibilityService<QuestionnaireItemCom
         return questions;
     }
 
+    /**
+     * Expands the compact output of read_questionnaire (participants, dialects and countries
+     * written once and referred to by index) to the regular format.
+     * Version 1 has no dialect node IDs in the participants table.
+     * @param response compact object derived from a json file
+     * @returns the questions keyed by tag, with the answers as in the regular format
+     */
+    expandCompact(response: Object): Object {
+        if (!compactVersions.includes(response['version'])) {
+            throw new Error(`Unsupported compact format version: ${response['version']}`);
+        }
+
+        const names: string[] = response['names'];
+        const participants = (response['participants'] as [string, number[], number[], number[]?][]).map(
+            ([participantId, dialects, countries, dialectIds]) => ({
+                participant_id: participantId,
+                dialect: dialects.map(index => names[index]),
+                country: countries.map(index => names[index]),
+                dialect_ids: dialectIds ?? []
+            }));
+
+        const questions = {};
+        for (const [tag, entry] of Object.entries(response['questions'])) {
+            questions[tag] = {
+                ...entry,
+                answers: (entry['answers'] as [number, string, string?][]).map(
+                    ([participantIndex, answer, answerTag]) => ({
+                        tag: answerTag ?? entry['tag'],
+                        answer,
+                        ...participants[participantIndex]
+                    }))
+            };
+        }
+        return questions;
+    }
+
     *getAnswers(questions: Iterable<Question>): Iterable<Answer> {
         for (const question of questions) {
             if (!question.answers) {
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
+from bisect import insort
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, FrozenSet, Optional, Tuple
 import re
 import json
 
@@ -12,13 +13,6 @@ class Dialect:
     parents: List["Dialect"]
     name: str
 
-    # number of levels
-    def granularity(self) -> int:
-        if self.parents:
-            return max(parent.granularity() + 1 for parent in self.parents)
-        else:
-            return 1
-
     def __str__(self) -> str:
         return (
             self.name
@@ -27,26 +21,108 @@ class Dialect:
         )
 
 
-# lookup from the end leaf of a dialect to a Dialect object
-# this will also contain intermediate steps, this way
-# a dialect can also be matched if it underspecified
-# (or differently said, with a varying level of granularity)
-lookup: Dict[str, Dialect] = {}
+class DialectGraph:
+    """Index of the dialects as a graph, in which a dialect can have several parents.
 
+    Every dialect is numbered in the order it is added, and the children of every dialect
+    are kept in that order. Its depth and the sets of its ancestors and descendants (as
+    bitsets of those numbers) are computed once and cached, so "is X under Y" is a single
+    bit test. The caches are cleared when the parents of a dialect change.
+    """
 
-# check if the parent is a known (grand)parent of this dialect
-def validate_parent(child: Dialect, parent: Dialect) -> bool:
-    if not child.parents:
-        return parent == None
+    def __init__(self):
+        # lookup from the end leaf of a dialect to a Dialect object
+        # this will also contain intermediate steps, this way
+        # a dialect can also be matched if it underspecified
+        # (or differently said, with a varying level of granularity)
+        self.lookup: Dict[str, Dialect] = {}
+        self.ids: Dict[str, int] = {}
+        self.dialects: List[Dialect] = []
+        self.children: List[List[int]] = []
+        self._depths: Dict[int, int] = {}
+        self._ancestors: Dict[int, int] = {}
+        self._descendants: Dict[int, int] = {}
+
+    def add(self, dialect: Dialect) -> int:
+        node = self.ids[dialect.name] = len(self.dialects)
+        self.lookup[dialect.name] = dialect
+        self.dialects.append(dialect)
+        self.children.append([])
+        self._link(node, dialect.parents)
+        self._descendants.clear()
+        return node
+
+    def _link(self, node: int, parents: Optional[List[Dialect]]) -> None:
+        # a dialect is a child of each of its parents once
+        for parent in {self.ids[parent.name] for parent in parents or []}:
+            insort(self.children[parent], node)
+
+    def set_parents(self, dialect: Dialect, parents: Optional[List[Dialect]]) -> None:
+        node = self.ids[dialect.name]
+        for parent in {self.ids[parent.name] for parent in dialect.parents or []}:
+            self.children[parent].remove(node)
+        dialect.parents = parents
+        self._link(node, parents)
+        self._depths.clear()
+        self._ancestors.clear()
+        self._descendants.clear()
+
+    def depth(self, dialect: Dialect) -> int:
+        # number of levels, following the longest path to a top dialect
+        node = self.ids[dialect.name]
+        try:
+            return self._depths[node]
+        except KeyError:
+            pass
+        self._depths[node] = max((self.depth(parent) + 1 for parent in dialect.parents or []), default=1)
+        return self._depths[node]
+
+    def ancestors(self, dialect: Dialect) -> int:
+        # bitset of the dialect itself and all its (grand)parents
+        node = self.ids[dialect.name]
+        try:
+            return self._ancestors[node]
+        except KeyError:
+            pass
+        bits = 1 << node
+        for parent in dialect.parents or []:
+            bits |= self.ancestors(parent)
+        self._ancestors[node] = bits
+        return bits
+
+    def descendants(self, dialect: Dialect) -> int:
+        # bitset of the dialect itself and all the dialects below it
+        node = self.ids[dialect.name]
+        try:
+            return self._descendants[node]
+        except KeyError:
+            pass
+        bits = 1 << node
+        for child in self.children[node]:
+            bits |= self.descendants(self.dialects[child])
+        self._descendants[node] = bits
+        return bits
+
+    def is_under(self, dialect: Dialect, ancestor: Dialect) -> bool:
+        # is the ancestor a (grand)parent of the dialect (or the dialect itself)?
+        return bool(self.ancestors(dialect) >> self.ids[ancestor.name] & 1)
 
-    if [parent] == child.parents:
+    def below(self, dialect: Dialect) -> List[Dialect]:
+        # the dialect and all the dialects under it, e.g. to filter on a dialect at any level of granularity
+        bits = self.descendants(dialect)
+        return [other for node, other in enumerate(self.dialects) if bits >> node & 1]
+
+
+# check if the parent is a known (grand)parent of this dialect
+def validate_parent(child: Dialect, parent: Optional[Dialect], graph: DialectGraph) -> bool:
+    if parent is None:
+        # a dialect can always be given without its parents
         return True
 
-    # is it a parent of the dialect's parent?
-    return validate_parent(child.parents[0], parent)
+    return parent is not child and graph.is_under(child, parent)
 
 
-def parse_dialect(text: str) -> Dialect:
+def parse_dialect(text: str, graph: DialectGraph) -> Dialect:
     len_text = len(text)
     # text = text.replace("UNDERSPECIFIED", "").replace(":", "")
     # if len(text) != len_text:
@@ -57,16 +133,17 @@ def parse_dialect(text: str) -> Dialect:
 
     for level in levels:
         try:
-            dialect = lookup[level]
-            if not validate_parent(dialect, parent):
+            dialect = graph.lookup[level]
+            if not validate_parent(dialect, parent, graph):
                 # higher granularity?
                 print(
                     f"Inconsistent parent for dialect {level};\nexpected '{dialect.parents[0]}'\ngot '{parent}'.\nText={text}"
                 )
-                granularity = 1 if parent == None else (parent.granularity() + 1)
-                existing_granularity = dialect.granularity()
-                if granularity > existing_granularity:
-                    dialect.parent = parent
+                granularity = 1 if parent == None else (graph.depth(parent) + 1)
+                existing_granularity = graph.depth(dialect)
+                # a dialect cannot be moved below itself
+                if granularity > existing_granularity and not graph.is_under(parent, dialect):
+                    graph.set_parents(dialect, [parent])
                     print(
                         f"Higher granularity {granularity} vs {existing_granularity}. Using this instead."
                     )
@@ -79,51 +156,74 @@ def parse_dialect(text: str) -> Dialect:
                     # )
         except KeyError:
             dialect = Dialect([parent] if parent else None, level)
-            lookup[level] = dialect
+            graph.add(dialect)
         parent = dialect
+    return dialect
 
 
-def parse_dialects(line: str) -> Iterable[Dialect]:
+def parse_dialects(line: str, graph: DialectGraph) -> Iterable[Dialect]:
     for part in re.split(r"[\+\&]", line):
         try:
-            yield parse_dialect(part)
+            yield parse_dialect(part, graph)
         except:
             print(f"Problem parsing {line}")
             raise
 
 
-# TODO: dummy target, replace with assigning the dialect to the right
-parsed = []
-
-with open("dialect_data.txt") as f:
-    for line in f.readlines():
-        parsed.append((line, list(parse_dialects(line))))
-
 Hierarchy = Dict[str, "Hierarchy"]
 
 
-def construct_hierarchy(
-    dialects: Iterable[Dialect], parent: Optional[Dialect] = None
-) -> Hierarchy:
-    tree: Hierarchy = {}
-    matched: List[Dialect] = []
-    unmatched: List[Dialect] = []
-
-    for dialect in dialects:
-        if (
-            not dialect.parents
-            and parent == None
-            or dialect.parents
-            and parent in dialect.parents
-        ):
-            matched.append(dialect)
-        else:
-            unmatched.append(dialect)
+class HierarchyBuilder:
+    """Builds the hierarchy and the roadmap from the dialects in its graph.
 
-    for dialect in matched:
-        tree[dialect.name] = construct_hierarchy(unmatched, dialect)
+    The tree and the roadmap are built together in a single depth-first pass over the
+    children of every dialect, in the order the dialects were added. A dialect is placed
+    under each of its parents, except below another of its parents on the same path:
+    it is then already placed higher up, as a sibling of an ancestor.
 
-    return tree
+    Lines appended to the dialect data can be parsed with update(), after which build()
+    gives the same result as reading the whole file again.
+    """
+
+    def __init__(self, dialects: Iterable[Dialect] = (), graph: Optional[DialectGraph] = None):
+        self.graph = DialectGraph() if graph is None else graph
+        self.offset = 0
+        for dialect in dialects:
+            self.graph.add(dialect)
+
+    def update(self, filepath: str) -> None:
+        # parse the lines added to the dialect data since the last update
+        with open(filepath) as f:
+            f.seek(self.offset)
+            lines = f.readlines()
+            self.offset = f.tell()
+        for line in lines:
+            list(parse_dialects(line, self.graph))
+
+    def build(self) -> Tuple[Hierarchy, Dict[str, str]]:
+        # returns the hierarchy and the roadmap: the path to every dialect name
+        graph = self.graph
+        roadmap: Dict[str, str] = {}
+
+        def subtree(node: int, path: str, above: FrozenSet[str]) -> Hierarchy:
+            # above: the names of the dialects on the path to this one
+            name = graph.dialects[node].name
+            tree: Hierarchy = {}
+            for child_node in graph.children[node]:
+                child = graph.dialects[child_node]
+                if any(parent.name in above for parent in child.parents):
+                    continue
+                child_path = path + ">" + child.name
+                tree[child.name] = subtree(child_node, child_path, above | {name})
+                roadmap[child.name] = child_path
+            return tree
+
+        hierarchy: Hierarchy = {}
+        for node, dialect in enumerate(graph.dialects):
+            if not dialect.parents:
+                hierarchy[dialect.name] = subtree(node, dialect.name, frozenset())
+                roadmap[dialect.name] = dialect.name
+        return hierarchy, roadmap
 
 
 def merge_children(hierarchy: Hierarchy, dialect: str, children: Hierarchy) -> None:
@@ -133,11 +233,12 @@ def merge_children(hierarchy: Hierarchy, dialect: str, children: Hierarchy) -> N
         hierarchy[dialect] = children
 
 
-def transition_dialects(hierarchy: Hierarchy) -> Hierarchy:
+def transition_dialects(hierarchy: Hierarchy, graph: DialectGraph) -> Hierarchy:
     """Splits transition dialects into two dialects; with the underlying children getting two parents
 
     Args:
         hierarchy (Hierarchy): hierarchy to parse the top nodes from
+        graph (DialectGraph): the dialects of the hierarchy
 
     Returns:
         Hierarchy: the updated hierarchy
@@ -151,9 +252,9 @@ def transition_dialects(hierarchy: Hierarchy) -> Hierarchy:
                 merge_children(updated, dialect, children)
 
             # update the Dialect data in the lookup
-            del lookup[name]
+            del graph.lookup[name]
             for child in children:
-                lookup[child].parents = [lookup[p] for p in dialects]
+                graph.set_parents(graph.lookup[child], [graph.lookup[p] for p in dialects])
         else:
             # nothing to see here, move along
             merge_children(updated, name, children)
@@ -169,10 +270,12 @@ def print_hierarchy(tree: dict, indent: int = 0):
             print(key)
         print_hierarchy(tree[key], indent + 1)
 
-def create_roadmap(hierarchy, incoming_path="", roadmap={}):
+def create_roadmap(hierarchy, incoming_path="", roadmap=None):
     """
     roadmap is a dict with dialect names as keys and paths as values
     """
+    if roadmap is None:
+        roadmap = {}
     for key in hierarchy.keys():
         if not incoming_path:
             path = key
@@ -188,15 +291,23 @@ def create_roadmap(hierarchy, incoming_path="", roadmap={}):
         
 
 
-# Hierarchy contains the information using the dialect names (as string)
-# Use this name in the lookup to retrieve the Dialect object
-hierarchy = construct_hierarchy(lookup.values())
-# hierarchy = transition_dialects(hierarchy)
-roadmap = create_roadmap(hierarchy)
+def __main__():
+    builder = HierarchyBuilder()
+    builder.update("dialect_data.txt")
+
+    # Hierarchy contains the information using the dialect names (as string)
+    # Use this name in the lookup to retrieve the Dialect object
+    hierarchy, roadmap = builder.build()
+    # hierarchy = transition_dialects(hierarchy, builder.graph)
+    # roadmap = create_roadmap(hierarchy)
+
+    with open("dialect_roadmap.json", "w") as f:
+        f.write(json.dumps(roadmap, indent=4))
+
+    with open("dialect_hierarchy.json", "w") as f:
+        f.write(json.dumps(hierarchy, indent=4))
+    print_hierarchy(hierarchy)
 
-with open("dialect_roadmap.json", "w") as f:
-    f.write(json.dumps(roadmap, indent=4))
 
-with open("dialect_hierarchy.json", "w") as f:
-    f.write(json.dumps(hierarchy, indent=4))
-print_hierarchy(hierarchy)
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,145 @@
+import json
+import os
+import random
+
+from organize_dialects import (
+    Dialect, DialectGraph, HierarchyBuilder, create_roadmap, parse_dialects, validate_parent
+)
+
+REPOSITORY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def random_graph(rng, count):
+    ## dialects with up to three parents each, all added before them
+    graph = DialectGraph()
+    for index in range(count):
+        parents = [rng.choice(graph.dialects) for _ in range(rng.choice([0, 0, 1, 1, 2, 3]))] if index else []
+        graph.add(Dialect(parents or None, 'd{}'.format(index)))
+    return graph
+
+
+def ancestors(dialect):
+    found = {dialect.name}
+    for parent in dialect.parents or []:
+        found |= ancestors(parent)
+    return found
+
+
+def depth(dialect):
+    return max((depth(parent) + 1 for parent in dialect.parents or []), default=1)
+
+
+def test_parse_dialects():
+    graph = DialectGraph()
+    brabants, hollands = parse_dialects('Nederfrankisch; Brabants; Noord-Brabants + Nederfrankisch; Hollands', graph)
+    assert str(brabants) == 'Nederfrankisch > Brabants > Noord-Brabants'
+    assert str(hollands) == 'Nederfrankisch > Hollands'
+    assert list(graph.lookup) == ['Nederfrankisch', 'Brabants', 'Noord-Brabants', 'Hollands']
+    assert (graph.depth(brabants), graph.depth(hollands)) == (3, 2)
+    assert validate_parent(brabants, graph.lookup['Nederfrankisch'], graph)
+    assert validate_parent(brabants, None, graph)
+    assert not validate_parent(brabants, hollands, graph)
+    assert not validate_parent(brabants, brabants, graph)
+
+
+def test_parse_more_specific_parent():
+    # a dialect given with a longer path moves there
+    graph = DialectGraph()
+    list(parse_dialects('Nederfrankisch; Kempisch', graph))
+    list(parse_dialects('Nederfrankisch; Brabants; Kempisch', graph))
+    kempisch = graph.lookup['Kempisch']
+    assert str(kempisch) == 'Nederfrankisch > Brabants > Kempisch'
+    assert graph.depth(kempisch) == 3
+    assert graph.is_under(kempisch, graph.lookup['Brabants'])
+    # in the order the dialects were added
+    assert graph.below(graph.lookup['Brabants']) == [kempisch, graph.lookup['Brabants']]
+    # but not with a shorter path, nor below itself
+    list(parse_dialects('Nederfrankisch; Kempisch', graph))
+    list(parse_dialects('Kempisch; Valkenswaards', graph))
+    list(parse_dialects('Nederfrankisch; Valkenswaards; Brabants', graph))
+    assert str(graph.lookup['Brabants']) == 'Nederfrankisch > Brabants'
+    assert str(kempisch) == 'Nederfrankisch > Brabants > Kempisch'
+
+
+def test_graph():
+    # the ancestors, descendants and depths of the graph are the same as following the parents of every dialect
+    rng = random.Random(0)
+    for _ in range(50):
+        graph = random_graph(rng, rng.randint(1, 40))
+        for dialect in graph.dialects:
+            assert graph.depth(dialect) == depth(dialect)
+            assert [other.name for other in graph.below(dialect)] == [
+                other.name for other in graph.dialects if dialect.name in ancestors(other)
+            ]
+            for other in graph.dialects:
+                assert graph.is_under(dialect, other) == (other.name in ancestors(dialect))
+
+
+def test_set_parents():
+    graph = DialectGraph()
+    top, middle, bottom = Dialect(None, 'top'), Dialect(None, 'middle'), Dialect(None, 'bottom')
+    for dialect in [top, middle, bottom]:
+        graph.add(dialect)
+    graph.set_parents(bottom, [middle])
+    assert (graph.depth(bottom), graph.is_under(bottom, top), graph.below(top)) == (2, False, [top])
+    # the cached depths, ancestors and descendants are updated
+    graph.set_parents(middle, [top])
+    assert (graph.depth(bottom), graph.is_under(bottom, top), graph.below(top)) == (3, True, [top, middle, bottom])
+    graph.set_parents(bottom, None)
+    assert (graph.depth(bottom), graph.is_under(bottom, top), graph.below(top)) == (1, False, [top, middle])
+    assert graph.children == [[1], [], []]
+
+
+def test_build():
+    top = Dialect(None, 'top')
+    middle = Dialect([top], 'middle')
+    # placed under the top dialect, but not again under the middle one below it
+    bottom = Dialect([middle, top], 'bottom')
+    hierarchy, roadmap = HierarchyBuilder([top, middle, bottom, Dialect(None, 'other')]).build()
+    assert hierarchy == {'top': {'middle': {}, 'bottom': {}}, 'other': {}}
+    assert roadmap == {'middle': 'top>middle', 'bottom': 'top>bottom', 'top': 'top', 'other': 'other'}
+
+
+def test_build_dialect_data():
+    # the hierarchy of the backend is built from the dialect data
+    builder = HierarchyBuilder()
+    builder.update(os.path.join(REPOSITORY_DIR, 'dialect_data.txt'))
+    hierarchy, roadmap = builder.build()
+    with open(os.path.join(REPOSITORY_DIR, 'dialect_hierarchy.json'), encoding='utf8') as file:
+        assert hierarchy == json.load(file)
+    assert roadmap == create_roadmap(hierarchy)
+
+
+def dialect_lines(hierarchy, path=()):
+    ## every path of the hierarchy, as a line of the dialect data
+    for name, children in hierarchy.items():
+        yield '; '.join(path + (name,))
+        yield from dialect_lines(children, path + (name,))
+
+
+def test_update(tmp_path):
+    # reading the lines added since the last update gives the same result as reading the whole file at once
+    with open(os.path.join(REPOSITORY_DIR, 'dialect_data.txt'), encoding='utf8') as file:
+        lines = file.readlines()
+    with open(os.path.join(REPOSITORY_DIR, 'dialect_hierarchy.json'), encoding='utf8') as file:
+        paths = list(dialect_lines(json.load(file)))
+    # with local varieties added under random dialects
+    rng = random.Random(0)
+    lines += ['{}; Plaats {}\n'.format(rng.choice(paths), index) for index in range(300)]
+    filepath = str(tmp_path / 'dialect_data.txt')
+    with open(filepath, 'w', encoding='utf8') as file:
+        file.writelines(lines)
+    builder = HierarchyBuilder()
+    builder.update(filepath)
+    expected = builder.build()
+    assert len(expected[1]) == len(builder.graph.lookup)
+
+    partial_filepath = str(tmp_path / 'partial.txt')
+    open(partial_filepath, 'w').close()
+    builder = HierarchyBuilder()
+    for start in range(0, len(lines), 37):
+        with open(partial_filepath, 'a', encoding='utf8') as file:
+            file.writelines(lines[start:start + 37])
+        builder.update(partial_filepath)
+    # in the same order as well
+    assert json.dumps(builder.build()) == json.dumps(expected)